@@ -0,0 +1,255 @@
+import argparse
+import json
+import math
+import random
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# Сравнение результатов бенчмарков двух ревизий — гейт для релиза:
+#
+#   python -m benchmarks.compare bench-base.json bench-head.json
+#   python -m benchmarks.compare micro-base.json micro-head.json --latency-tolerance 0.05
+#
+# Понимает JSON benchmarks.http_bench (маршруты) и benchmarks.micro_bench
+# (случаи). Регрессия засчитывается, только если изменение больше допуска
+# и статистически значимо: p95 маршрута — по бутстрепу сырых выборок,
+# время микробенчмарка — по U-критерию Манна-Уитни на раундах. Число
+# SQL-запросов и аллокации детерминированы и сравниваются с допуском
+# напрямую. Код выхода: 0 — гейт пройден, 1 — есть регрессии
+#
+# Оба прогона нужно делать на одной машине без фоновой нагрузки, базу —
+# пересоздавать генератором; микробенчмарки лучше гонять с --rounds 10
+
+PASS, FAIL, WARN = "ok", "REGRESSION", "warn"
+
+# параметры прогона, при расхождении которых сравнение некорректно
+COMPARABLE_META = ("concurrency", "duration_s", "workers", "mix", "rounds", "scale")
+
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def bootstrap_lower_bound(base: list, head: list, q: float, alpha: float, resamples: int, seed: int):
+    # нижняя граница одностороннего (1 - alpha) интервала для относительного
+    # изменения перцентиля; > 0 — head значимо медленнее base
+    rng = random.Random(seed)
+    changes = []
+    for _ in range(resamples):
+        base_q = percentile(sorted(rng.choices(base, k=len(base))), q)
+        head_q = percentile(sorted(rng.choices(head, k=len(head))), q)
+        changes.append(head_q / base_q - 1 if base_q else 0.0)
+    changes.sort()
+    return changes[int(alpha * resamples)]
+
+
+@lru_cache(maxsize=None)
+def _u_distribution(n1: int, n2: int) -> tuple:
+    # число перестановок с данным U (без связей) — для точного p-value
+    # на маленьких выборках вроде 5 раундов микробенчмарка
+    counts = [[[0] * (n1 * n2 + 1) for _ in range(n2 + 1)] for _ in range(n1 + 1)]
+    for i in range(n1 + 1):
+        for j in range(n2 + 1):
+            if i == 0 or j == 0:
+                counts[i][j][0] = 1
+                continue
+            for u in range(i * j + 1):
+                counts[i][j][u] = (counts[i - 1][j][u - j] if u >= j else 0) + counts[i][j - 1][u]
+    return tuple(counts[n1][n2])
+
+
+def mann_whitney_greater(base: list, head: list) -> float:
+    # p-value одностороннего критерия «head больше base»
+    n1, n2 = len(head), len(base)
+    if not n1 or not n2:
+        return 1.0
+    ranked = sorted([(value, 0) for value in head] + [(value, 1) for value in base])
+    ranks = [0.0] * len(ranked)
+    tie_sum = 0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_sum += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    u = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 0) - n1 * (n1 + 1) / 2
+
+    if n1 + n2 <= 30 and not tie_sum:
+        distribution = _u_distribution(n1, n2)
+        return sum(distribution[math.ceil(u):]) / sum(distribution)
+
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n1 + n2 + 1) - tie_sum / ((n1 + n2) * (n1 + n2 - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def relative(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return after / before - 1
+
+
+class Gate:
+    def __init__(self, args):
+        self.args = args
+        self.rows = []
+        self.warnings = []
+
+    @property
+    def failed(self) -> bool:
+        return any(row[-1] == FAIL for row in self.rows)
+
+    def add(self, name, metric, before, after, change, verdict, note=""):
+        self.rows.append((name, metric, before, after, change, note, verdict))
+
+    def check_meta(self, base: dict, head: dict):
+        for key in COMPARABLE_META:
+            if base.get(key) != head.get(key):
+                self.warnings.append(f"{key} differs: {base.get(key)!r} vs {head.get(key)!r}")
+
+    def compare_routes(self, base: dict, head: dict):
+        args = self.args
+        for route in sorted(set(base) | set(head)):
+            if route not in head:
+                self.warnings.append(f"{route} is missing from the new run")
+                continue
+            if route not in base:
+                self.warnings.append(f"{route} is new, nothing to compare with")
+                continue
+            before, after = base[route], head[route]
+
+            if min(before["count"], after["count"]) < args.min_count:
+                self.warnings.append(
+                    f"{route}: too few requests ({before['count']}/{after['count']}) for p95"
+                )
+            else:
+                p95_before, p95_after = before["latency_ms"]["p95"], after["latency_ms"]["p95"]
+                change = relative(p95_before, p95_after)
+                verdict, note = PASS, ""
+                if change is not None and change > args.latency_tolerance:
+                    # бутстреп только там, где точечная оценка уже за допуском
+                    lower = bootstrap_lower_bound(
+                        before["samples_ms"], after["samples_ms"], 0.95,
+                        args.alpha, args.resamples, args.seed
+                    )
+                    note = f"CI low {lower:+.1%}"
+                    verdict = FAIL if lower > 0 else WARN
+                self.add(route, "p95 ms", p95_before, p95_after, change, verdict, note)
+
+            statements_before = before["statements"]["mean"]
+            statements_after = after["statements"]["mean"]
+            if statements_before is not None and statements_after is not None:
+                delta = statements_after - statements_before
+                self.add(
+                    route, "sql/req", statements_before, statements_after,
+                    relative(statements_before, statements_after),
+                    FAIL if delta > args.statements_tolerance else PASS,
+                    f"{delta:+.2f}" if delta else ""
+                )
+
+            error_rate_before = before["errors"] / before["count"] if before["count"] else 0.0
+            error_rate_after = after["errors"] / after["count"] if after["count"] else 0.0
+            if error_rate_after > error_rate_before + args.error_tolerance:
+                self.add(
+                    route, "errors", before["errors"], after["errors"], None, FAIL,
+                    f"{error_rate_before:.1%} -> {error_rate_after:.1%}"
+                )
+
+    def compare_cases(self, base: dict, head: dict):
+        args = self.args
+        for name in sorted(set(base) | set(head)):
+            if name not in head or name not in base:
+                self.warnings.append(f"{name} is only present in one of the runs")
+                continue
+            before, after = base[name], head[name]
+
+            change = relative(before["best_us"], after["best_us"])
+            verdict, note = PASS, ""
+            if change is not None and change > args.latency_tolerance:
+                p_value = mann_whitney_greater(before["rounds_us"], after["rounds_us"])
+                note = f"p={p_value:.3f}"
+                verdict = FAIL if p_value < args.alpha else WARN
+            self.add(name, "best us", before["best_us"], after["best_us"], change, verdict, note)
+
+            change = relative(before["alloc_peak_bytes"], after["alloc_peak_bytes"])
+            self.add(
+                name, "alloc B", before["alloc_peak_bytes"], after["alloc_peak_bytes"], change,
+                FAIL if change is not None and change > args.alloc_tolerance else PASS
+            )
+
+    def print_table(self):
+        rows = self.rows if not self.args.only_changes else [
+            row for row in self.rows if row[-1] != PASS
+        ]
+        width = max([len(row[0]) for row in rows] + [10])
+        print(f"{'name':<{width}} {'metric':<8} {'base':>10} {'head':>10} {'change':>8}  verdict")
+        for name, metric, before, after, change, note, verdict in rows:
+            change_text = "" if change is None else f"{change:+.1%}"
+            print(
+                f"{name:<{width}} {metric:<8} {format_value(before):>10} {format_value(after):>10} "
+                f"{change_text:>8}  {verdict}{'  ' + note if note else ''}"
+            )
+        for warning in self.warnings:
+            print(f"warning: {warning}")
+
+
+def format_value(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def load(path: str) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark results and fail on regressions")
+    parser.add_argument("base", help="JSON from the baseline revision")
+    parser.add_argument("head", help="JSON from the revision under test")
+    parser.add_argument("--latency-tolerance", type=float, default=0.10,
+                        help="allowed relative growth of p95 / best time")
+    parser.add_argument("--statements-tolerance", type=float, default=0.5,
+                        help="allowed growth of mean SQL statements per request")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.10,
+                        help="allowed relative growth of peak allocation per call")
+    parser.add_argument("--error-tolerance", type=float, default=0.01,
+                        help="allowed growth of the error rate")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level")
+    parser.add_argument("--resamples", type=int, default=1000, help="bootstrap resamples for p95")
+    parser.add_argument("--min-count", type=int, default=30, help="minimum requests to judge p95")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only-changes", action="store_true", help="print only flagged rows")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    gate = Gate(args)
+    gate.check_meta(base.get("meta", {}), head.get("meta", {}))
+    if "routes" in base and "routes" in head:
+        gate.compare_routes(base["routes"], head["routes"])
+    elif "cases" in base and "cases" in head:
+        gate.compare_cases(base["cases"], head["cases"])
+    else:
+        parser.error("both files must come from the same benchmark (http_bench or micro_bench)")
+
+    print(f"base: {base.get('meta', {}).get('commit', args.base)}  "
+          f"head: {head.get('meta', {}).get('commit', args.head)}\n")
+    gate.print_table()
+    print("\nFAIL" if gate.failed else "\nPASS")
+    sys.exit(1 if gate.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
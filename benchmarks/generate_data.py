@@ -0,0 +1,370 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Детерминированный генератор тестовых данных: один и тот же seed и масштаб
+# дают побайтно одинаковые строки (id, тексты, даты), поэтому бенчмарки
+# на разных машинах стартуют из одного состояния. Загрузка — COPY через asyncpg
+#
+#   python -m benchmarks.generate_data --scale medium --seed 42 --truncate
+
+SCALES = {
+    "small": {
+        "modules": 10, "disciplines": 120, "teachers": 150,
+        "users": 2_000, "reviews": 20_000
+    },
+    "medium": {
+        "modules": 25, "disciplines": 500, "teachers": 600,
+        "users": 20_000, "reviews": 200_000
+    },
+    "large": {
+        "modules": 40, "disciplines": 1_200, "teachers": 1_500,
+        "users": 80_000, "reviews": 800_000
+    },
+}
+
+# все пользователи получают этот пароль — хеш считается один раз
+DEFAULT_PASSWORD = "Benchmark1"
+EPOCH = datetime(2023, 9, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 2 * 365 * 24 * 3600
+
+TABLES = (
+    "complaints", "review_votes", "reviews", "favorites", "sessions",
+    "password_reset_tokens", "teacher_disciplines", "teachers",
+    "disciplines", "modules", "user_roles", "users"
+)
+
+MALE_NAMES = (
+    "Александр", "Алексей", "Андрей", "Артём", "Владимир", "Дмитрий", "Евгений",
+    "Иван", "Илья", "Кирилл", "Максим", "Михаил", "Никита", "Николай", "Павел",
+    "Роман", "Сергей", "Степан", "Тимофей", "Юрий"
+)
+FEMALE_NAMES = (
+    "Александра", "Алина", "Анастасия", "Анна", "Валерия", "Вера", "Дарья",
+    "Екатерина", "Елена", "Ирина", "Ксения", "Мария", "Наталья", "Ольга",
+    "Полина", "Светлана", "София", "Татьяна", "Юлия", "Яна"
+)
+SURNAMES = (
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов",
+    "Михайлов", "Новиков", "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев",
+    "Семёнов", "Егоров", "Павлов", "Козлов", "Степанов", "Николаев", "Орлов",
+    "Андреев", "Макаров", "Никитин", "Захаров", "Зайцев", "Соловьёв", "Борисов"
+)
+PATRONYMIC_ROOTS = (
+    "Александров", "Алексеев", "Андреев", "Владимиров", "Дмитриев", "Евгеньев",
+    "Иванов", "Михайлов", "Николаев", "Павлов", "Сергеев", "Юрьев"
+)
+MODULE_TOPICS = (
+    "Программирование", "Математика", "Физика", "Экономика", "Иностранные языки",
+    "Философия", "Анализ данных", "Информационная безопасность", "Менеджмент",
+    "Дизайн", "История", "Право", "Химия", "Биология", "Инженерная графика"
+)
+DISCIPLINE_PREFIXES = (
+    "Основы", "Введение в", "Практикум по", "Теория", "Методы", "Современные проблемы",
+    "Прикладные задачи", "Спецкурс по", "Семинар по", "Лаборатория"
+)
+DISCIPLINE_SUBJECTS = (
+    "алгоритмов", "баз данных", "веб-разработки", "машинного обучения",
+    "линейной алгебры", "математического анализа", "теории вероятностей",
+    "микроэкономики", "английского языка", "операционных систем", "компьютерных сетей",
+    "статистики", "проектной деятельности", "дискретной математики", "криптографии",
+    "бухгалтерского учёта", "логики", "мобильной разработки", "обработки сигналов"
+)
+# только мужской род — глаголы и прилагательные ниже согласованы с ним
+REVIEW_OPENERS = (
+    "Курс", "Предмет", "Материал", "Экзамен", "Семинар", "Формат занятий",
+    "Объём заданий", "Подход преподавателя", "Лекционный курс", "Практикум"
+)
+REVIEW_VERBS = (
+    "оказался", "был", "показался", "получился", "остался", "стал"
+)
+REVIEW_ADJECTIVES = (
+    "полезным", "интересным", "сложным", "понятным", "скучным", "насыщенным",
+    "структурированным", "запутанным", "лёгким", "актуальным", "перегруженным",
+    "практичным", "однообразным", "увлекательным"
+)
+REVIEW_TAILS = (
+    "много практики и разборов задач",
+    "преподаватель отвечает на вопросы после пар",
+    "дедлайны по лабораторным довольно жёсткие",
+    "презентации стоит скачать заранее",
+    "на экзамене спрашивают по всем темам",
+    "без подготовки к семинарам будет тяжело",
+    "есть интересные проекты в команде",
+    "теория местами устарела",
+    "оценки ставят справедливо",
+    "рекомендую тем, кто хочет разобраться в теме",
+    "лекции можно смотреть в записи",
+    "контрольные сложнее, чем задания на практике",
+    "хорошая подготовка к следующим курсам",
+    "объём домашних заданий большой"
+)
+
+
+def random_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def random_moment(rng: random.Random) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(PERIOD_SECONDS))
+
+
+# совместим с werkzeug.check_password_hash; соль из seed — хеш тоже детерминирован
+def password_hash(rng: random.Random, password: str) -> str:
+    salt = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(16))
+    iterations = 600_000
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
+    return f"pbkdf2:sha256:{iterations}${salt}${digest.hex()}"
+
+
+def person(rng: random.Random):
+    female = rng.random() < 0.5
+    first_name = rng.choice(FEMALE_NAMES if female else MALE_NAMES)
+    surname = rng.choice(SURNAMES) + ("а" if female else "")
+    patronymic = None
+    if rng.random() < 0.9:
+        patronymic = rng.choice(PATRONYMIC_ROOTS) + ("на" if female else "ич")
+    return first_name, surname, patronymic
+
+
+def review_text(rng: random.Random) -> str:
+    sentences = []
+    for _ in range(rng.randint(1, 5)):
+        sentence = (
+            f"{rng.choice(REVIEW_OPENERS)} {rng.choice(REVIEW_VERBS)} "
+            f"{rng.choice(REVIEW_ADJECTIVES)}, {rng.choice(REVIEW_TAILS)}."
+        )
+        sentences.append(sentence)
+    return " ".join(sentences)
+
+
+# популярность по закону Ципфа: несколько дисциплин собирают большую часть отзывов
+def zipf_weights(count: int, exponent: float = 0.9):
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class Dataset:
+    def __init__(self, seed: int, sizes: dict):
+        self.rng = random.Random(seed)
+        self.sizes = sizes
+        self.module_ids = []
+        self.discipline_ids = []
+        self.teacher_ids = []
+        self.user_ids = []
+        self.teachers_by_discipline = {}
+        self.review_ids = []
+
+    def modules(self):
+        rows = []
+        for index in range(self.sizes["modules"]):
+            module_id = random_uuid(self.rng)
+            self.module_ids.append(module_id)
+            topic = MODULE_TOPICS[index % len(MODULE_TOPICS)]
+            rows.append((module_id, f"Модуль {index + 1}. {topic}", random_moment(self.rng)))
+        return rows
+
+    def disciplines(self):
+        rows = []
+        formats = ("online", "traditional", "mixed")
+        for index in range(self.sizes["disciplines"]):
+            discipline_id = random_uuid(self.rng)
+            self.discipline_ids.append(discipline_id)
+            name = (
+                f"{self.rng.choice(DISCIPLINE_PREFIXES)} "
+                f"{self.rng.choice(DISCIPLINE_SUBJECTS)} {index + 1}"
+            )
+            rows.append((
+                discipline_id, name, self.rng.choice(formats),
+                review_text(self.rng) if self.rng.random() < 0.7 else None,
+                f"https://modeus.example.com/{index + 1}" if self.rng.random() < 0.5 else None,
+                None, self.rng.choice(self.module_ids)
+            ))
+        return rows
+
+    def teachers(self):
+        rows = []
+        for _ in range(self.sizes["teachers"]):
+            teacher_id = random_uuid(self.rng)
+            self.teacher_ids.append(teacher_id)
+            rows.append((teacher_id, *person(self.rng)))
+        return rows
+
+    def teacher_disciplines(self):
+        rows = []
+        for discipline_id in self.discipline_ids:
+            teachers = self.rng.sample(self.teacher_ids, self.rng.randint(1, 4))
+            self.teachers_by_discipline[discipline_id] = teachers
+            for teacher_id in teachers:
+                rows.append((random_uuid(self.rng), teacher_id, discipline_id))
+        return rows
+
+    def users(self):
+        rows = []
+        hashed = password_hash(self.rng, DEFAULT_PASSWORD)
+        for index in range(self.sizes["users"]):
+            user_id = random_uuid(self.rng)
+            self.user_ids.append(user_id)
+            rows.append((user_id, *person(self.rng), f"user{index + 1}@example.com", hashed))
+        return rows
+
+    def user_roles(self, role_ids: dict):
+        rows = []
+        for index, user_id in enumerate(self.user_ids):
+            role = "admin" if index < max(1, len(self.user_ids) // 1000) else "user"
+            rows.append((random_uuid(self.rng), user_id, role_ids[role]))
+        return rows
+
+    def sessions(self):
+        rows = []
+        for user_id in self.user_ids:
+            if self.rng.random() < 0.1:
+                rows.append((random_uuid(self.rng), str(random_uuid(self.rng)), user_id))
+        return rows
+
+    def favorites(self):
+        rows = []
+        weights = zipf_weights(len(self.discipline_ids))
+        for user_id in self.user_ids:
+            count = self.rng.choices((0, 1, 2, 3, 5), (40, 25, 15, 12, 8))[0]
+            chosen = set(self.rng.choices(self.discipline_ids, cum_weights=weights, k=count))
+            for discipline_id in chosen:
+                rows.append((random_uuid(self.rng), user_id, discipline_id))
+        return rows
+
+    def reviews(self):
+        weights = zipf_weights(len(self.discipline_ids))
+        for _ in range(self.sizes["reviews"]):
+            review_id = random_uuid(self.rng)
+            self.review_ids.append(review_id)
+            discipline_id = self.rng.choices(self.discipline_ids, cum_weights=weights)[0]
+            teachers = self.teachers_by_discipline[discipline_id]
+
+            roll = self.rng.random()
+            if roll < 0.85:
+                status, score = "published", self.rng.uniform(0.0, 0.3)
+            elif roll < 0.95:
+                status, score = "pending", self.rng.uniform(0.3, 0.8)
+            else:
+                status, score = "rejected", self.rng.uniform(0.8, 1.0)
+
+            anonymous = self.rng.random() < 0.3
+            yield (
+                review_id, review_text(self.rng), self.rng.choices((1, 2, 3, 4, 5), (5, 8, 20, 35, 32))[0],
+                round(score, 4), status, anonymous, random_moment(self.rng),
+                None if anonymous else self.rng.choice(self.user_ids),
+                discipline_id, self.rng.choice(teachers), self.rng.choice(teachers)
+            )
+
+    def review_votes(self):
+        for review_id in self.review_ids:
+            count = min(int(self.rng.expovariate(1 / 3)), len(self.user_ids))
+            for user_id in self.rng.sample(self.user_ids, count):
+                vote = "like" if self.rng.random() < 0.7 else "dislike"
+                yield (random_uuid(self.rng), vote, user_id, review_id)
+
+    def complaints(self):
+        for review_id in self.review_ids:
+            if self.rng.random() < 0.01:
+                yield (
+                    random_uuid(self.rng), review_id, self.rng.choice(self.user_ids),
+                    random_moment(self.rng), self.rng.random() < 0.5
+                )
+
+
+async def copy(conn: asyncpg.Connection, table: str, columns: tuple, records) -> int:
+    started = time.perf_counter()
+    result = await conn.copy_records_to_table(table, records=records, columns=columns)
+    count = int(result.split()[-1])
+    print(f"  {table:<22} {count:>9} rows  {time.perf_counter() - started:6.2f}s")
+    return count
+
+
+async def generate(seed: int, sizes: dict, truncate: bool):
+    conn = await asyncpg.connect(
+        user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"), port=os.getenv("DB_PORT"),
+        database=os.getenv("DB_NAME")
+    )
+    try:
+        if truncate:
+            await conn.execute(f"TRUNCATE {', '.join(TABLES)} CASCADE")
+        elif await conn.fetchval("SELECT EXISTS (SELECT 1 FROM users)"):
+            raise SystemExit("Database is not empty, run with --truncate")
+
+        role_ids = {
+            row["name"]: row["id"] for row in await conn.fetch("SELECT id, name::text FROM roles")
+        }
+        if "user" not in role_ids or "admin" not in role_ids:
+            raise SystemExit("Roles are missing, start the app once or run init_db")
+
+        data = Dataset(seed, sizes)
+        started = time.perf_counter()
+        print(f"Generating dataset (seed={seed}, {sizes})")
+
+        async with conn.transaction():
+            await copy(conn, "modules", ("id", "name", "created_at"), data.modules())
+            await copy(
+                conn, "disciplines",
+                ("id", "name", "format", "description", "modeus_link", "presentation_link", "module_id"),
+                data.disciplines()
+            )
+            await copy(conn, "teachers", ("id", "first_name", "surname", "patronymic"), data.teachers())
+            await copy(conn, "teacher_disciplines", ("id", "teacher_id", "discipline_id"), data.teacher_disciplines())
+            await copy(
+                conn, "users",
+                ("id", "first_name", "surname", "patronymic", "email", "password"),
+                data.users()
+            )
+            await copy(conn, "user_roles", ("id", "user_id", "role_id"), data.user_roles(role_ids))
+            await copy(conn, "sessions", ("id", "session", "user_id"), data.sessions())
+            await copy(conn, "favorites", ("id", "user_id", "discipline_id"), data.favorites())
+            await copy(
+                conn, "reviews",
+                ("id", "comment", "grade", "offensive_score", "status", "is_anonymous",
+                 "created_at", "user_id", "discipline_id", "lector_id", "practic_id"),
+                data.reviews()
+            )
+            await copy(conn, "review_votes", ("id", "vote", "user_id", "review_id"), data.review_votes())
+            await copy(conn, "complaints", ("id", "review_id", "user_id", "created_at", "resolved"), data.complaints())
+
+        await conn.execute(f"ANALYZE {', '.join(TABLES)}")
+        print(f"Done in {time.perf_counter() - started:.1f}s, password for all users: {DEFAULT_PASSWORD}")
+    finally:
+        await conn.close()
+
+    if truncate:
+        # TRUNCATE удалил и супер-админа — восстанавливаем его штатным кодом
+        from init_db import init_db
+        from database import engine
+        await init_db()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic dataset for load testing")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"override number of {name}")
+    parser.add_argument("--truncate", action="store_true", help="wipe existing data first")
+    args = parser.parse_args()
+
+    sizes = {
+        name: getattr(args, name) if getattr(args, name) is not None else count
+        for name, count in SCALES[args.scale].items()
+    }
+    asyncio.run(generate(args.seed, sizes, args.truncate))
+
+
+if __name__ == "__main__":
+    main()
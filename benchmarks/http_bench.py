@@ -0,0 +1,678 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+import asyncpg
+import httpx
+from dotenv import load_dotenv
+
+from benchmarks.generate_data import DEFAULT_PASSWORD
+
+load_dotenv()
+
+# Нагрузочный прогон всего HTTP API. Поднимает uvicorn с приложением (или
+# бьёт в уже запущенный --url), набирает id из базы, заполненной
+# benchmarks.generate_data, и гоняет смесь сценариев виртуальными
+# пользователями. Результат — JSON с перцентилями по каждому маршруту,
+# который сравнивается между коммитами
+#
+#   python -m benchmarks.generate_data --scale medium --truncate
+#   python -m benchmarks.http_bench --concurrency 32 --duration 60 \
+#       --app-env REVIEWS_JSON_AGG=true --output bench-json-agg.json
+#
+# Сценарии создают отзывы и голоса — для сравнимых прогонов база
+# пересоздаётся генератором перед каждым запуском
+
+ROOT = Path(__file__).resolve().parent.parent
+READY_PATH = "/api/admin/public/modules/get"
+SQL_COUNT = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+DEFAULT_MIX = {
+    "anonymous_browsing": 10,
+    "logged_in_voting": 6,
+    "review_submission_burst": 2,
+    "admin_moderation": 1,
+    "coverage_sweep": 1,
+}
+
+REVIEW_PHRASES = (
+    "Курс понравился, много практики и понятные объяснения.",
+    "Материал полезный, но лекции иногда затянуты.",
+    "Хорошая подача, задания помогают разобраться в теме.",
+    "Преподаватель всегда отвечает на вопросы, рекомендую.",
+    "Сложно, но интересно, к экзамену нужно готовиться заранее.",
+)
+
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RouteStats:
+    __slots__ = ("latencies", "statements", "errors", "statuses")
+
+    def __init__(self):
+        self.latencies = []
+        self.statements = []
+        self.errors = 0
+        self.statuses = Counter()
+
+    def summary(self, elapsed: float, rng: random.Random, sample_size: int) -> dict:
+        ordered = sorted(self.latencies)
+        statements = sorted(self.statements)
+        count = len(ordered)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "statuses": {str(code): n for code, n in sorted(self.statuses.items())},
+            "throughput_rps": round(count / elapsed, 3) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(ordered, 0.50), 3),
+                "p95": round(percentile(ordered, 0.95), 3),
+                "p99": round(percentile(ordered, 0.99), 3),
+                "mean": round(sum(ordered) / count, 3) if count else 0.0,
+                "max": round(ordered[-1], 3) if count else 0.0,
+            },
+            "statements": {
+                "mean": round(sum(statements) / len(statements), 3) if statements else None,
+                "p95": percentile(statements, 0.95) if statements else None,
+                "max": statements[-1] if statements else None,
+            },
+            # сырая выборка задержек для проверки значимости при сравнении
+            "samples_ms": [
+                round(value, 3)
+                for value in (rng.sample(ordered, sample_size) if count > sample_size else ordered)
+            ],
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.routes: dict[str, RouteStats] = {}
+        self.scenarios = Counter()
+        self.recording = False
+        self.started = 0.0
+        self.stopped = 0.0
+
+    def start(self):
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.stopped = time.perf_counter()
+
+    def record(self, route: str, elapsed_ms: float, status: int, ok: bool, statements):
+        if not self.recording:
+            return
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.latencies.append(elapsed_ms)
+        stats.statuses[status] += 1
+        if not ok:
+            stats.errors += 1
+        if statements is not None:
+            stats.statements.append(statements)
+
+
+class BenchData:
+    def __init__(self, disciplines, users, reviews):
+        # disciplines: [(discipline_id, [teacher_id, ...]), ...]
+        self.disciplines = disciplines
+        self.users = users
+        self.reviews = reviews
+
+    @classmethod
+    async def load(cls, limit: int):
+        conn = await asyncpg.connect(
+            user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
+            host=os.getenv("DB_HOST"), port=os.getenv("DB_PORT"),
+            database=os.getenv("DB_NAME")
+        )
+        try:
+            disciplines = [
+                (str(row["id"]), [str(teacher_id) for teacher_id in row["teachers"]])
+                for row in await conn.fetch(
+                    "SELECT td.discipline_id AS id, array_agg(td.teacher_id ORDER BY td.teacher_id) AS teachers "
+                    "FROM teacher_disciplines td GROUP BY td.discipline_id "
+                    "ORDER BY td.discipline_id LIMIT $1", limit
+                )
+            ]
+            users = [
+                row["email"] for row in await conn.fetch(
+                    "SELECT u.email FROM users u "
+                    "JOIN user_roles ur ON ur.user_id = u.id JOIN roles r ON r.id = ur.role_id "
+                    "WHERE r.name::text = 'user' AND u.email LIKE 'user%@example.com' "
+                    "ORDER BY u.email LIMIT $1", limit
+                )
+            ]
+            reviews = [
+                str(row["id"]) for row in await conn.fetch(
+                    "SELECT id FROM reviews WHERE status::text = 'published' "
+                    "ORDER BY created_at DESC, id LIMIT $1", limit
+                )
+            ]
+        finally:
+            await conn.close()
+
+        if not disciplines or not users or not reviews:
+            raise SystemExit("Database is empty, run python -m benchmarks.generate_data first")
+        return cls(disciplines, users, reviews)
+
+
+class VirtualUser:
+    def __init__(self, index: int, args, data: BenchData, recorder: Recorder):
+        self.index = index
+        self.args = args
+        self.data = data
+        self.recorder = recorder
+        self.rng = random.Random(args.seed * 100_003 + index)
+        self.email = data.users[index % len(data.users)]
+        self.clients: dict[str, httpx.AsyncClient] = {}
+
+    def new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.args.url, timeout=self.args.timeout,
+            limits=httpx.Limits(max_connections=2, max_keepalive_connections=2)
+        )
+
+    async def client(self, role: str) -> httpx.AsyncClient:
+        # у каждого виртуального пользователя свои cookie: анонимная,
+        # пользовательская и админская сессии не смешиваются
+        if role in self.clients:
+            return self.clients[role]
+        client = self.new_client()
+        self.clients[role] = client
+        if role == "user":
+            await self.login(client, self.email, DEFAULT_PASSWORD)
+        elif role == "admin":
+            await self.login(client, os.getenv("ADMIN_EMAIL"), os.getenv("ADMIN_PASSWORD"))
+        return client
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.aclose()
+
+    async def call(
+            self, client: httpx.AsyncClient, method: str, route: str,
+            expected=(200,), params=None, json=None, headers=None, **path
+    ):
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                method, route.format(**path), params=params, json=json, headers=headers
+            )
+        except httpx.HTTPError:
+            self.recorder.record(
+                f"{method} {route}", (time.perf_counter() - started) * 1000, 0, False, None
+            )
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        match = SQL_COUNT.search(response.headers.get("server-timing", ""))
+        self.recorder.record(
+            f"{method} {route}", elapsed_ms, response.status_code,
+            response.status_code in expected, int(match.group(1)) if match else None
+        )
+        if response.status_code not in expected or not response.content:
+            return None
+        if response.headers.get("content-type", "").startswith("application/json"):
+            return response.json()
+        return response.text
+
+    async def login(self, client: httpx.AsyncClient, email: str, password: str):
+        return await self.call(
+            client, "POST", "/api/users/authorization",
+            json={"email": email, "password": password}
+        )
+
+    def pick_discipline(self):
+        # первые дисциплины чаще — как и в сгенерированных отзывах
+        count = len(self.data.disciplines)
+        return self.data.disciplines[min(int(self.rng.paretovariate(1.2)) - 1, count - 1)]
+
+    def review_payload(self):
+        discipline_id, teachers = self.pick_discipline()
+        return {
+            "discipline_id": discipline_id,
+            "grade": self.rng.randint(1, 5),
+            "lector_id": self.rng.choice(teachers),
+            "practic_id": self.rng.choice(teachers),
+            "comment": self.rng.choice(REVIEW_PHRASES),
+            "is_anonymous": self.rng.random() < 0.2,
+        }
+
+    async def anonymous_browsing(self):
+        client = await self.client("anonymous")
+        await self.call(client, "GET", READY_PATH)
+        await self.call(
+            client, "GET", "/api/disciplines/search",
+            params={
+                "page": self.rng.randint(1, 5),
+                "sort_by": self.rng.choice(("rating", "reviews", "latest")),
+                "sort_order": self.rng.choice(("asc", "desc")),
+                "with_total": self.rng.random() < 0.5,
+            }
+        )
+        discipline_id, _ = self.pick_discipline()
+        await self.call(client, "GET", "/api/disciplines/discipline/{id}", id=discipline_id)
+        await self.call(
+            client, "GET", "/api/teachers/discipline/{id}/get-by-discipline", id=discipline_id
+        )
+        await self.call(
+            client, "GET", "/api/reviews",
+            params={"discipline_id": discipline_id, "sort_by": self.rng.choice(("date", "likes"))}
+        )
+        if self.rng.random() < 0.3:
+            await self.call(client, "GET", "/api/disciplines/get")
+            await self.call(client, "GET", "/api/teachers/get", params={"page": self.rng.randint(1, 3)})
+
+    async def logged_in_voting(self):
+        client = await self.client("user")
+        await self.call(client, "GET", "/api/users/authorization/check")
+        discipline_id, _ = self.pick_discipline()
+        await self.call(client, "GET", "/api/reviews", params={"discipline_id": discipline_id})
+        for review_id in self.rng.sample(self.data.reviews, min(3, len(self.data.reviews))):
+            await self.call(
+                client, "POST", "/api/reviews/review/vote",
+                json={"id": review_id, "vote": self.rng.choice(("like", "dislike"))}
+            )
+        await self.call(client, "GET", "/api/disciplines/favorite/my")
+        await self.call(client, "GET", "/api/reviews/my")
+
+    async def review_submission_burst(self):
+        client = await self.client("user")
+        for _ in range(self.rng.randint(3, 6)):
+            await self.call(client, "POST", "/api/reviews/add", json=self.review_payload())
+
+    async def admin_moderation(self):
+        client = await self.client("admin")
+        pending = await self.call(
+            client, "GET", "/api/reviews/review/admin/moderation", params={"page_size": 10}
+        )
+        for review in (pending or {}).get("data", [])[:3]:
+            await self.call(
+                client, "PATCH", "/api/reviews/review/admin/status/edit", expected=(200, 404),
+                json={"id": review["id"], "status": self.rng.choice(("published", "rejected"))}
+            )
+        complaints = await self.call(
+            client, "GET", "/api/reviews/admin/complaints/get", params={"page_size": 10}
+        )
+        for review in (complaints or {}).get("data", [])[:2]:
+            # параллельный модератор мог успеть раньше — 404 ожидаем
+            await self.call(
+                client, "POST", "/api/reviews/admin/complaints/complaint/review/resolve",
+                expected=(201, 404), json={"id": review["id"], "action": "dismiss"}
+            )
+
+    async def coverage_sweep(self):
+        # проходит по всем остальным маршрутам, создавая и удаляя свои сущности
+        admin = await self.client("admin")
+        client = self.new_client()
+        try:
+            await self._sweep(admin, client)
+        finally:
+            await client.aclose()
+
+    async def _sweep(self, admin: httpx.AsyncClient, client: httpx.AsyncClient):
+        tag = uuid.UUID(int=self.rng.getrandbits(128)).hex[:12]
+        email = f"bench-{tag}@example.com"
+        user = await self.call(
+            client, "POST", "/api/users/registration",
+            json={
+                "email": email, "first_name": "Бенч", "surname": "Нагрузочный",
+                "patronymic": "", "password": DEFAULT_PASSWORD
+            }
+        )
+        if not user:
+            return
+        user_id = user["id"]
+        await self.login(client, email, DEFAULT_PASSWORD)
+        await self.call(client, "GET", "/api/users/authorization/check")
+        await self.call(
+            client, "PATCH", "/api/users/user/edit", json={"id": user_id, "first_name": "Бенчмарк"}
+        )
+        await self.call(
+            client, "PATCH", "/api/users/user/edit/password",
+            json={"id": user_id, "old_password": DEFAULT_PASSWORD, "new_password": DEFAULT_PASSWORD}
+        )
+
+        review = await self.call(client, "POST", "/api/reviews/add", json=self.review_payload())
+        discipline_id, _ = self.pick_discipline()
+        await self.call(
+            client, "POST", "/api/disciplines/favorite/add", expected=(200, 400),
+            json={"id": discipline_id}
+        )
+        await self.call(
+            client, "DELETE", "/api/disciplines/favorite/remove", expected=(200, 404),
+            json={"id": discipline_id}
+        )
+        if review:
+            review_id = review["id"]
+            await self.call(
+                client, "PATCH", "/api/reviews/review/edit", json={"id": review_id, "grade": 4}
+            )
+            await self.call(
+                admin, "POST", "/api/reviews/review/complaint/add", expected=(201,),
+                json={"id": review_id}
+            )
+            await self.call(admin, "GET", "/api/reviews/admin/complaints/get")
+            await self.call(
+                admin, "POST", "/api/reviews/admin/complaints/complaint/review/resolve",
+                expected=(201,), json={"id": review_id, "action": "dismiss"}
+            )
+            await self.call(
+                admin, "PATCH", "/api/reviews/review/admin/status/edit",
+                json={"id": review_id, "status": "published"}
+            )
+            await self.call(client, "DELETE", "/api/reviews/review/delete", json={"id": review_id})
+
+        module = await self.call(admin, "POST", "/api/admin/module/add", json={"name": f"Бенч {tag}"})
+        if module:
+            await self.call(
+                admin, "PATCH", "/api/admin/module/update",
+                json={"id": module["id"], "new_name": f"Бенч {tag} (2)"}
+            )
+            discipline = await self.call(
+                admin, "POST", "/api/disciplines/admin/discipline/create",
+                json={"name": f"Бенч {tag}", "format": "онлайн", "module_id": module["id"]}
+            )
+            teacher = await self.call(
+                admin, "POST", "/api/teachers/admin/teacher/create",
+                json={"first_name": "Бенч", "surname": tag, "patronymic": "Тестович"}
+            )
+            if teacher:
+                await self.call(
+                    admin, "PATCH", "/api/teachers/admin/teacher/update",
+                    json={"id": teacher["id"], "first_name": "Бенчмарк"}
+                )
+            if discipline:
+                await self.call(
+                    admin, "PATCH", "/api/disciplines/admin/discipline/update",
+                    json={"id": discipline["id"], "description": "Нагрузочный тест"}
+                )
+            if discipline and teacher:
+                await self.call(
+                    admin, "POST", "/api/teachers/admin/teacher/discipline/appoint",
+                    json={"id": teacher["id"], "discipline_ids": [discipline["id"]]}
+                )
+                await self.call(
+                    admin, "DELETE", "/api/teachers/admin/teacher/discipline/remove",
+                    json={"id": teacher["id"], "discipline_id": discipline["id"]}
+                )
+            if teacher:
+                await self.call(
+                    admin, "DELETE", "/api/teachers/admin/teacher/delete", json={"id": teacher["id"]}
+                )
+            if discipline:
+                await self.call(
+                    admin, "DELETE", "/api/disciplines/admin/discipline/delete",
+                    json={"id": discipline["id"]}
+                )
+            await self.call(admin, "DELETE", "/api/admin/module/delete", json={"id": module["id"]})
+
+        await self.call(admin, "PATCH", "/api/admin/add", json={"id": user_id})
+        await self.call(admin, "GET", "/api/admin/admins")
+        await self.call(admin, "PATCH", "/api/admin/remove", json={"id": user_id})
+        await self.call(admin, "GET", "/api/users/", params={"search": "Бенч"})
+        await self.call(admin, "GET", "/api/users/user/{id}", id=user_id)
+        await self.call(admin, "GET", "/api/admin/metrics/routes")
+        await self.call(admin, "GET", "/api/admin/metrics/event-loop/blocks")
+        await self.call(admin, "GET", "/api/admin/metrics/slow-queries")
+        await self.call(admin, "GET", "/api/admin/metrics/swear-prefilter")
+        policy = await self.call(admin, "GET", "/api/admin/moderation-policy")
+        if policy:
+            # та же политика ещё раз: версия не меняется, отзывы не устаревают
+            await self.call(
+                admin, "PUT", "/api/admin/moderation-policy", expected=(200, 409),
+                json={field: policy[field] for field in (
+                    "pending_threshold", "rejected_threshold", "prefilter_mode", "prefilter_obscene_score"
+                )}
+            )
+        # профилировщик сам замедляет остальные запросы — только по флагу
+        if self.args.include_profile:
+            await self.call(
+                admin, "GET", "/api/admin/profile", expected=(200, 409),
+                params={"seconds": 0.2, "interval_ms": 10}
+            )
+
+        metrics_token = os.getenv("METRICS_TOKEN")
+        # без токена вне development /metrics закрыт
+        await self.call(
+            client, "GET", "/metrics", expected=(200,) if metrics_token else (200, 404),
+            headers={"Authorization": f"Bearer {metrics_token}"} if metrics_token else None
+        )
+        # почта не отправляется: неизвестный email и неверный токен — 400
+        await self.call(
+            client, "POST", "/api/users/forgot-password", expected=(400,),
+            json={"email": f"missing-{tag}@example.com"}
+        )
+        await self.call(
+            client, "POST", "/api/users/reset-password", expected=(400,),
+            json={"token": tag, "new_password": DEFAULT_PASSWORD}
+        )
+        await self.call(client, "POST", "/api/users/user/logout")
+        await self.call(admin, "DELETE", "/api/users/admin/user/{id}/delete", id=user_id)
+
+    async def run(self, scenarios: list, weights: list, deadline: float):
+        try:
+            while time.perf_counter() < deadline:
+                scenario = self.rng.choices(scenarios, weights)[0]
+                await getattr(self, scenario)()
+                if self.recorder.recording:
+                    self.recorder.scenarios[scenario] += 1
+        finally:
+            await self.close()
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_env(values: list) -> dict:
+    # все виртуальные пользователи идут с одного IP — без этого прогон
+    # мерил бы ответы 429; контроль допуска при 32 пользователях на один
+    # воркер отбрасывает списки с 503, и p95 не сравнить с прогонами до него.
+    # --app-env RATE_LIMIT_ENABLED=True / ADMISSION_ENABLED=True возвращают их
+    overrides = {"RATE_LIMIT_ENABLED": "False", "ADMISSION_ENABLED": "False"}
+    for item in values:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--app-env expects KEY=VALUE, got {item!r}")
+        overrides[key] = value
+    return overrides
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def start_server(args, app_env: dict) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", args.host, "--port", str(args.port),
+        "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(command, cwd=ROOT, env={**os.environ, **app_env})
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+async def wait_ready(url: str, timeout: float, server=None):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2) as client:
+        while time.perf_counter() < deadline:
+            if server is not None and server.poll() is not None:
+                raise SystemExit(f"Server exited with code {server.returncode}")
+            try:
+                if (await client.get(READY_PATH)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise SystemExit(f"Server at {url} is not ready after {timeout:.0f}s")
+
+
+async def api_routes(url: str) -> list:
+    async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+        schema = (await client.get("/openapi.json")).json()
+    routes = [
+        f"{method.upper()} {path}"
+        for path, methods in schema["paths"].items()
+        for method in methods
+    ]
+    # /metrics скрыт из схемы, но тоже входит в routers/
+    return sorted(routes + ["GET /metrics"])
+
+
+async def run_benchmark(args, app_env: dict) -> dict:
+    data = await BenchData.load(args.sample_ids)
+    known_routes = await api_routes(args.url)
+    recorder = Recorder()
+    mix = args.mix
+    scenarios = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in scenarios]
+
+    deadline = time.perf_counter() + args.warmup + args.duration
+    users = [VirtualUser(index, args, data, recorder) for index in range(args.concurrency)]
+    tasks = [asyncio.create_task(user.run(scenarios, weights, deadline)) for user in users]
+
+    print(f"Warming up for {args.warmup:.0f}s with {args.concurrency} virtual users")
+    await asyncio.sleep(args.warmup)
+    recorder.start()
+    print(f"Measuring for {args.duration:.0f}s")
+    await asyncio.sleep(args.duration)
+    recorder.stop()
+    # сценарии дорабатывают текущий шаг, но в статистику уже не попадают
+    await asyncio.gather(*tasks)
+
+    elapsed = recorder.stopped - recorder.started
+    rng = random.Random(args.seed)
+    routes = {
+        route: recorder.routes[route].summary(elapsed, rng, args.samples)
+        for route in sorted(recorder.routes)
+    }
+    total = sum(stats["count"] for stats in routes.values())
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "url": args.url,
+            "workers": args.workers if args.boot else None,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+            "app_env": app_env,
+        },
+        "totals": {
+            "requests": total,
+            "errors": sum(stats["errors"] for stats in routes.values()),
+            "throughput_rps": round(total / elapsed, 3) if elapsed else 0.0,
+            "scenarios": dict(recorder.scenarios),
+        },
+        "routes": routes,
+        "not_covered": [route for route in known_routes if route not in routes],
+    }
+
+
+def print_report(result: dict):
+    print(f"\n{'route':<62} {'count':>7} {'err':>5} {'rps':>8} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'sql':>5}")
+    for route, stats in result["routes"].items():
+        latency = stats["latency_ms"]
+        sql = stats["statements"]["mean"]
+        print(
+            f"{route:<62} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+            f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} "
+            f"{'-' if sql is None else f'{sql:.1f}':>5}"
+        )
+    totals = result["totals"]
+    print(f"\n{totals['requests']} requests, {totals['errors']} errors, "
+          f"{totals['throughput_rps']:.1f} req/s")
+    if result["not_covered"]:
+        print("Not covered: " + ", ".join(result["not_covered"]))
+
+
+async def main_async(args):
+    app_env = parse_env(args.app_env)
+    server = None
+    if args.boot:
+        args.url = f"http://{args.host}:{args.port}"
+        server = start_server(args, app_env)
+    try:
+        await wait_ready(args.url, args.startup_timeout, server)
+        result = await run_benchmark(args, app_env)
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    print_report(result)
+    output = Path(args.output or f"bench-{result['meta']['commit']}.json")
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end HTTP benchmark with per-route percentiles")
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--app-env", action="append", default=[], metavar="KEY=VALUE",
+        help="environment override for the started app, can be repeated"
+    )
+    parser.add_argument("--concurrency", type=int, default=32, help="number of virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="unmeasured seconds before the run")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+        help="scenario weights, e.g. anonymous_browsing=10,admin_moderation=0"
+    )
+    parser.add_argument("--include-profile", action="store_true", help="also hit /api/admin/profile")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout, seconds")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--sample-ids", type=int, default=2000, help="ids of each kind taken from the DB")
+    parser.add_argument("--samples", type=int, default=2000, help="raw latencies kept per route")
+    parser.add_argument("--output", help="JSON file (default bench-<commit>.json)")
+    args = parser.parse_args()
+    args.boot = args.url is None
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Отчёт о стоимости импорта при старте воркера: запускает чистый
+# интерпретатор с -X importtime, импортирует модуль (по умолчанию main) и
+# агрегирует время по пакетам верхнего уровня и модулям проекта
+#
+#   python -m benchmarks.import_time
+#   python -m benchmarks.import_time --module service.review_discipline_service --model
+
+ROOT = Path(__file__).resolve().parent.parent
+PROJECT_PACKAGES = {
+    "main", "database", "init_db", "models", "routers", "service",
+    "monitoring", "response_models"
+}
+
+PROBE = """
+import resource, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter() - started
+rss_import = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+model = None
+if {model}:
+    from service.swear_model import get_swear_checker
+    started = time.perf_counter()
+    get_swear_checker()
+    model = time.perf_counter() - started
+print(imported, rss_import, model, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    # строки вида "import time:  self [us] | cumulative | name", вложенность — отступом
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        modules.append({
+            "name": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return modules
+
+
+def run_probe(module: str, model: bool) -> tuple:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, model=model)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise SystemExit(result.stderr[-2000:])
+    imported, rss_import, model_seconds, rss_total = result.stdout.split()[-4:]
+    return (
+        parse_importtime(result.stderr), float(imported), int(rss_import),
+        None if model_seconds == "None" else float(model_seconds), int(rss_total)
+    )
+
+
+def build_report(modules: list, imported: float, rss_import: int, model_seconds, rss_total: int) -> dict:
+    packages = defaultdict(lambda: {"self_us": 0, "modules": 0})
+    for module in modules:
+        package = packages[module["name"].split(".")[0]]
+        package["self_us"] += module["self_us"]
+        package["modules"] += 1
+
+    project = [
+        module for module in modules
+        if module["name"].split(".")[0] in PROJECT_PACKAGES
+    ]
+    return {
+        "import_seconds": round(imported, 3),
+        "modules_imported": len(modules),
+        # ru_maxrss в Linux — килобайты
+        "max_rss_mb_after_import": round(rss_import / 1024, 1),
+        "swear_model_load_seconds": None if model_seconds is None else round(model_seconds, 3),
+        "max_rss_mb_after_model": round(rss_total / 1024, 1) if model_seconds is not None else None,
+        "packages": dict(sorted(packages.items(), key=lambda item: -item[1]["self_us"])),
+        "project_modules": sorted(project, key=lambda module: -module["cumulative_us"]),
+    }
+
+
+def print_report(report: dict, top: int):
+    print(f"Import: {report['import_seconds']:.3f}s, {report['modules_imported']} modules, "
+          f"max RSS {report['max_rss_mb_after_import']} MB")
+    if report["swear_model_load_seconds"] is not None:
+        print(f"Swear model load: {report['swear_model_load_seconds']:.3f}s, "
+              f"max RSS {report['max_rss_mb_after_model']} MB")
+
+    print(f"\n{'package (self time of all its modules)':<48} {'ms':>9} {'modules':>8}")
+    for name, package in list(report["packages"].items())[:top]:
+        print(f"{name:<48} {package['self_us'] / 1000:>9.1f} {package['modules']:>8}")
+
+    print(f"\n{'project module (cumulative)':<48} {'ms':>9} {'self ms':>8}")
+    for module in report["project_modules"][:top]:
+        print(f"{module['name']:<48} {module['cumulative_us'] / 1000:>9.1f} "
+              f"{module['self_us'] / 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report what each module costs at startup")
+    parser.add_argument("--module", default="main", help="module to import")
+    parser.add_argument("--model", action="store_true", help="also load the swear model")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="write the full report as JSON")
+    args = parser.parse_args()
+
+    report = build_report(*run_probe(args.module, args.model))
+    print_report(report, args.top)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID
+
+from models import (
+    Complaint, Discipline, DisciplineFormatEnum, Favorite, Module, ReviewDiscipline,
+    ReviewStatusEnum, ReviewVote, Role, RoleEnum, Teacher, TeacherDiscipline,
+    User, UserRole, VoteTypeEnum
+)
+from service.discipline_service import sort_disciplines
+
+# Микробенчмарки DTO-билдеров и сортировки: стоимость на строку умножается на
+# размер страницы и каталога. Объектные графы собираются в памяти без БД
+# (transient-объекты, ленивые связи не срабатывают), каждый случай
+# прогоняется фиксированное число итераций, в отчёт идёт лучший из раундов
+#
+#   python -m benchmarks.micro_bench --output micro-base.json
+#   python -m benchmarks.micro_bench --baseline micro-base.json --threshold 0.1
+#
+# sort_disciplines сортирует в SQL, поэтому меряется построение ORDER BY
+# вместе с ключом кеша запроса — то, что выполняется на каждый запрос
+
+EPOCH = datetime(2024, 9, 1, tzinfo=timezone.utc)
+
+
+def make_uuid(kind: int, index: int) -> UUID:
+    return UUID(int=(kind << 96) | index)
+
+
+def make_module(index: int = 0) -> Module:
+    return Module(id=make_uuid(1, index), name=f"Модуль {index}")
+
+
+def make_teacher(index: int) -> Teacher:
+    return Teacher(
+        id=make_uuid(2, index), first_name="Иван", surname=f"Иванов{index}", patronymic="Петрович"
+    )
+
+
+def make_user(index: int, role: Role = None) -> User:
+    user = User(
+        id=make_uuid(3, index), first_name="Анна", surname=f"Смирнова{index}",
+        patronymic="Сергеевна", email=f"user{index}@example.com"
+    )
+    if role is not None:
+        user.user_roles = [UserRole(id=make_uuid(4, index), role=role)]
+    return user
+
+
+def make_discipline(index: int = 0, module: Module = None) -> Discipline:
+    return Discipline(
+        id=make_uuid(5, index), name=f"Основы алгоритмов {index}",
+        format=DisciplineFormatEnum.mixed, description="Описание дисциплины " * 10,
+        modeus_link="https://modeus.example.com/d", presentation_link=None,
+        module=module or make_module()
+    )
+
+
+def make_review(
+        index: int, discipline: Discipline, author: User,
+        lector: Teacher, practic: Teacher, votes: int = 0, complaints: int = 0
+) -> ReviewDiscipline:
+    review = ReviewDiscipline(
+        id=make_uuid(6, index), comment="Курс понравился, много практики. " * 4,
+        grade=index % 5 + 1, offensive_score=0.01, is_anonymous=index % 7 == 0,
+        created_at=EPOCH + timedelta(hours=index),
+        status=ReviewStatusEnum.published if index % 10 else ReviewStatusEnum.pending,
+        user_id=author.id, author=author, discipline_id=discipline.id,
+        lector_id=lector.id, lector=lector, practic_id=practic.id, practic=practic
+    )
+    # отзыв добавляется в discipline.reviews через back_populates
+    review.discipline = discipline
+    review.votes = [
+        ReviewVote(
+            id=make_uuid(7, index * 10_000 + n), user_id=make_uuid(3, n),
+            vote=VoteTypeEnum.like if n % 3 else VoteTypeEnum.dislike
+        )
+        for n in range(votes)
+    ]
+    review.complaints = [
+        Complaint(id=make_uuid(8, index * 100 + n), user_id=make_uuid(3, n), resolved=n % 2 == 0)
+        for n in range(complaints)
+    ]
+    return review
+
+
+ReviewRow = namedtuple("ReviewRow", (
+    "id", "grade", "comment", "status", "user_id", "is_anonymous",
+    "author_first_name", "author_surname", "author_patronymic",
+    "discipline_id", "discipline_name", "module_id", "module_name",
+    "lector_id", "lector_first_name", "lector_surname", "lector_patronymic",
+    "practic_id", "practic_first_name", "practic_surname", "practic_patronymic",
+    "offensive_score", "likes", "dislikes", "user_vote", "complaints_count", "created_at"
+))
+DisciplineRow = namedtuple("DisciplineRow", (
+    "id", "name", "format", "description", "modeus_link", "presentation_link",
+    "module_id", "module_name", "avg_rating", "review_count", "favorites_count", "is_favorite"
+))
+TeacherRow = namedtuple("TeacherRow", ("id", "first_name", "surname", "patronymic"))
+UserRow = namedtuple("UserRow", ("id", "first_name", "surname", "patronymic", "email", "role"))
+
+
+def review_rows(count: int) -> list:
+    # строки проекции ведут себя как Row: доступ к полям по атрибутам
+    return [
+        ReviewRow(
+            make_uuid(6, n), n % 5 + 1, "Курс понравился, много практики. " * 4,
+            ReviewStatusEnum.published, make_uuid(3, n), n % 7 == 0,
+            "Анна", "Смирнова", "Сергеевна", make_uuid(5, 0), "Основы алгоритмов",
+            make_uuid(1, 0), "Модуль", make_uuid(2, 0), "Иван", "Иванов", "Петрович",
+            make_uuid(2, 1), "Пётр", "Петров", None, 0.01, n % 40, n % 9,
+            VoteTypeEnum.like if n % 2 else None, n % 3, EPOCH + timedelta(hours=n)
+        )
+        for n in range(count)
+    ]
+
+
+def discipline_rows(count: int) -> list:
+    return [
+        DisciplineRow(
+            make_uuid(5, n), f"Основы алгоритмов {n}", DisciplineFormatEnum.online,
+            "Описание дисциплины " * 10, "https://modeus.example.com/d", None,
+            make_uuid(1, n % 20), "Модуль", 3.8571, 140, 12, n % 5 == 0
+        )
+        for n in range(count)
+    ]
+
+
+def build_cases() -> dict:
+    module = make_module()
+    lector, practic = make_teacher(0), make_teacher(1)
+    user_role = Role(id=1, name=RoleEnum.user)
+    author = make_user(0, user_role)
+
+    # отзыв с 500 голосами; user_vote ищется у последнего проголосовавшего
+    voted = make_review(0, make_discipline(1, module), author, lector, practic, votes=500, complaints=5)
+    last_voter = str(make_uuid(3, 499))
+
+    # дисциплина с 2 000 отзывов и 300 добавлениями в избранное
+    popular = make_discipline(2, module)
+    for n in range(2_000):
+        make_review(1_000 + n, popular, author, lector, practic, votes=0)
+    popular.favorites = [
+        Favorite(id=make_uuid(9, n), user_id=make_uuid(3, n), discipline_id=popular.id)
+        for n in range(300)
+    ]
+    favorite_user = str(make_uuid(3, 299))
+
+    # страница отзывов по 40 штук с голосами, как при selectinload
+    page = [
+        make_review(10_000 + n, make_discipline(3, module), author, lector, practic, votes=25, complaints=1)
+        for n in range(40)
+    ]
+
+    teacher = make_teacher(2)
+    teacher.teacher_disciplines = [
+        TeacherDiscipline(id=make_uuid(10, n), discipline=make_discipline(100 + n, module))
+        for n in range(30)
+    ]
+    users = [make_user(100 + n, user_role) for n in range(20)]
+
+    review_page_rows = review_rows(40)
+    discipline_page_rows = discipline_rows(20)
+    teacher_page_rows = [TeacherRow(make_uuid(2, n), "Иван", f"Иванов{n}", "Петрович") for n in range(20)]
+    user_page_rows = [
+        UserRow(make_uuid(3, n), "Анна", f"Смирнова{n}", "Сергеевна", f"user{n}@example.com", RoleEnum.user)
+        for n in range(20)
+    ]
+
+    projection = Discipline.get_projection(favorite_user)
+    sort_variants = [
+        (sort_by, sort_order)
+        for sort_by in ("rating", "reviews", "latest")
+        for sort_order in ("asc", "desc")
+    ]
+
+    def sort_all():
+        for sort_by, sort_order in sort_variants:
+            sort_disciplines(projection, sort_by, sort_order)._generate_cache_key()
+
+    # имя: (функция, итераций в раунде, описание)
+    return {
+        "review.get_dto[500 votes]": (
+            voted.get_dto, 2_000, "review with 500 votes and 5 complaints"
+        ),
+        "review.dto_with_user_vote_info[500 votes]": (
+            lambda: voted.dto_with_user_vote_info(last_voter), 2_000,
+            "same review, current user voted last"
+        ),
+        "review.get_dto[page 40x25 votes]": (
+            lambda: [review.get_dto() for review in page], 200, "40 reviews with 25 votes each"
+        ),
+        "review.row_to_dto[page 40]": (
+            lambda: [ReviewDiscipline.row_to_dto(row) for row in review_page_rows], 2_000,
+            "40 projection rows"
+        ),
+        "discipline.get_dto[2000 reviews]": (
+            lambda: popular.get_dto(favorite_user), 200,
+            "discipline with 2000 reviews and 300 favorites"
+        ),
+        "discipline.row_to_dto[page 20]": (
+            lambda: [Discipline.row_to_dto(row) for row in discipline_page_rows], 5_000,
+            "20 projection rows"
+        ),
+        "teacher.get_dto[30 disciplines]": (
+            teacher.get_dto, 5_000, "teacher assigned to 30 disciplines"
+        ),
+        "teacher.row_to_dto[page 20]": (
+            lambda: [Teacher.row_to_dto(row) for row in teacher_page_rows], 10_000, "20 projection rows"
+        ),
+        "user.get_dto[page 20]": (
+            lambda: [user.get_dto() for user in users], 5_000, "20 users with a role"
+        ),
+        "user.row_to_dto[page 20]": (
+            lambda: [User.row_to_dto(row) for row in user_page_rows], 10_000, "20 projection rows"
+        ),
+        "sort_disciplines[6 variants]": (
+            sort_all, 500, "ORDER BY on the projection plus statement cache key"
+        ),
+    }
+
+
+def measure(func, iterations: int, rounds: int) -> dict:
+    func()
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            timings.append((time.perf_counter() - started) / iterations * 1e6)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # пиковая аллокация одного вызова — отдельным проходом, tracemalloc
+    # сильно замедляет код и исказил бы время
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        alloc_peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "best_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+        "rounds_us": [round(value, 3) for value in timings],
+        "alloc_peak_bytes": alloc_peak,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        change = current["best_us"] / previous["best_us"] - 1
+        current["change_vs_baseline"] = round(change, 4)
+        if change > threshold:
+            regressions.append((name, previous["best_us"], current["best_us"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for DTO builders and sorting helpers")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+    parser.add_argument("--filter", help="run only cases whose name contains this substring")
+    parser.add_argument("--baseline", help="JSON from a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown of best time")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<44} {'best, us':>11} {'median, us':>11} {'peak alloc':>11}")
+    for name, (func, iterations, description) in build_cases().items():
+        if args.filter and args.filter not in name:
+            continue
+        result = measure(func, max(1, int(iterations * args.scale)), args.rounds)
+        result["description"] = description
+        results[name] = result
+        print(f"{name:<44} {result['best_us']:>11.2f} {result['median_us']:>11.2f} "
+              f"{result['alloc_peak_bytes']:>11}")
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline["cases"], args.threshold)
+
+    if args.output:
+        payload = {
+            "meta": {
+                "python": sys.version.split()[0],
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "rounds": args.rounds,
+                "scale": args.scale,
+            },
+            "cases": results,
+        }
+        Path(args.output).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: {before:.2f}us -> {after:.2f}us ({change:+.1%})")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
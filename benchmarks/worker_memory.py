@@ -0,0 +1,223 @@
+import argparse
+import gc
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+# Замер памяти воркеров: uvicorn --workers (spawn, каждый воркер грузит
+# модель сам) против pre-fork из prefork.py (модель грузится в мастере до
+# fork). Память берётся из /proc/<pid>/smaps_rollup: PSS делит общие
+# страницы между процессами, поэтому сумма PSS — реальная память группы
+#
+#   python -m benchmarks.worker_memory --workers 4 --reviews 50
+#   python -m benchmarks.worker_memory --workers 4 --model-only   # без БД
+#
+# Полный режим поднимает приложение дважды и требует Postgres с данными;
+# --reviews создаёт анонимные отзывы, чтобы модель поработала в воркерах
+
+ROOT = Path(__file__).resolve().parent.parent
+READY_PATH = "/api/admin/public/modules/get"
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+TEXTS = ["Курс понравился, много практики", "Лекции скучные, но полезные"] * 10
+
+
+def memory(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            key, _, rest = line.partition(":")
+            if key in FIELDS:
+                values[key] = int(rest.split()[0])
+    return {
+        "rss": values["Rss"] / 1024,
+        "pss": values["Pss"] / 1024,
+        "shared": (values["Shared_Clean"] + values["Shared_Dirty"]) / 1024,
+        "private": (values["Private_Clean"] + values["Private_Dirty"]) / 1024,
+    }
+
+
+def descendants(root: int) -> list:
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                # имя процесса в скобках может содержать пробелы
+                parents[int(entry)] = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    found, queue = [], [root]
+    while queue:
+        pid = queue.pop()
+        children = sorted(child for child, parent in parents.items() if parent == pid)
+        found.extend(children)
+        queue.extend(children)
+    return found
+
+
+def report(title: str, root: int) -> dict:
+    print(f"\n{title}")
+    print(f"{'process':<16} {'RSS, MB':>9} {'PSS, MB':>9} {'shared':>9} {'private':>9}")
+    totals = {"pss": 0.0, "workers": 0, "worker_pss": 0.0}
+    for pid in [root] + descendants(root):
+        try:
+            usage = memory(pid)
+        except OSError:
+            continue
+        name = "master" if pid == root else "worker"
+        totals["pss"] += usage["pss"]
+        if pid != root:
+            totals["workers"] += 1
+            totals["worker_pss"] += usage["pss"]
+        print(f"{f'{name} {pid}':<16} {usage['rss']:>9.1f} {usage['pss']:>9.1f} "
+              f"{usage['shared']:>9.1f} {usage['private']:>9.1f}")
+    print(f"{'total PSS':<16} {'':>9} {totals['pss']:>9.1f}")
+    return totals
+
+
+def _model_worker(ready_fd: int):
+    from service.swear_model import get_swear_checker
+
+    checker = get_swear_checker()
+    # несколько предсказаний — как у воркера под нагрузкой
+    for _ in range(20):
+        checker.predict_proba(TEXTS)
+    os.write(ready_fd, b"1")
+    signal.pause()
+
+
+def model_master(workers: int, prefork: bool):
+    # без приложения и БД: тот же путь загрузки модели, что в prefork.py
+    read_fd, write_fd = os.pipe()
+    if prefork:
+        from service.swear_model import get_swear_checker
+        get_swear_checker()
+        gc.collect()
+        gc.freeze()
+
+    for _ in range(workers):
+        if prefork:
+            if os.fork() == 0:
+                _model_worker(write_fd)
+                os._exit(0)
+        else:
+            # чистый интерпретатор — как spawn в uvicorn --workers
+            subprocess.Popen(
+                [sys.executable, "-c",
+                 f"from benchmarks.worker_memory import _model_worker; _model_worker({write_fd})"],
+                cwd=ROOT, pass_fds=(write_fd,)
+            )
+    for _ in range(workers):
+        os.read(read_fd, 1)
+    print("ready", flush=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: os.killpg(0, signal.SIGKILL))
+    signal.pause()
+
+
+def start_model_only(workers: int, prefork: bool) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-c",
+         f"from benchmarks.worker_memory import model_master; model_master({workers}, {prefork})"],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True, start_new_session=True
+    )
+    if process.stdout.readline().strip() != "ready":
+        raise SystemExit("Model workers failed to start")
+    return process
+
+
+def start_app(workers: int, prefork: bool, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ, "APP_HOST": "127.0.0.1", "APP_PORT": str(port),
+        "APP_WORKERS": str(workers), "APP_RELOAD": "False", "APP_LOG_LEVEL": "warning",
+        "APP_PREFORK": str(prefork),
+    }
+    if prefork:
+        command = [sys.executable, "main.py"]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ]
+    return subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True)
+
+
+def drive_app(port: int, reviews: int, timeout: float):
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    with httpx.Client(base_url=url, timeout=30) as client:
+        while True:
+            try:
+                if client.get(READY_PATH).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"App on port {port} is not ready after {timeout:.0f}s")
+            time.sleep(0.5)
+
+        for _ in range(50):
+            client.get("/api/disciplines/search")
+            client.get("/api/reviews")
+        teachers = [
+            teacher for teacher in client.get("/api/teachers/get", params={"size": 100}).json()["data"]
+            if teacher["disciplines"]
+        ]
+        for index in range(reviews if teachers else 0):
+            teacher = teachers[index % len(teachers)]
+            client.post("/api/reviews/add", json={
+                "discipline_id": teacher["disciplines"][0]["id"], "grade": 5,
+                "lector_id": teacher["id"], "practic_id": teacher["id"],
+                "comment": TEXTS[index % 2], "is_anonymous": True,
+            })
+    # дать воркерам закончить фоновые задачи и gc
+    time.sleep(2)
+
+
+def stop(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def measure(args, prefork: bool) -> dict:
+    mode = "pre-fork" if prefork else ("separate processes" if args.model_only else "uvicorn --workers")
+    if args.model_only:
+        process = start_model_only(args.workers, prefork)
+    else:
+        process = start_app(args.workers, prefork, args.port)
+    try:
+        if not args.model_only:
+            drive_app(args.port, args.reviews, args.startup_timeout)
+        return report(f"{'model only' if args.model_only else 'app'}, {mode}, {args.workers} workers", process.pid)
+    finally:
+        stop(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare worker memory with and without pre-fork")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model-only", action="store_true", help="measure only the swear model, no app or DB")
+    parser.add_argument("--reviews", type=int, default=0, help="anonymous reviews to post before measuring")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    separate = measure(args, prefork=False)
+    shared = measure(args, prefork=True)
+    saved = separate["pss"] - shared["pss"]
+    print(f"\nTotal PSS: {separate['pss']:.1f} MB -> {shared['pss']:.1f} MB, "
+          f"saved {saved:.1f} MB ({saved / args.workers:.1f} MB per worker)")
+
+
+if __name__ == "__main__":
+    main()
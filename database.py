@@ -4,8 +4,9 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker
 )
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, relationship as orm_relationship
 from dotenv import load_dotenv
+from monitoring import InstrumentedQueuePool
 
 load_dotenv()
 
@@ -16,9 +17,17 @@ DATABASE_URL = (
     f"/{os.getenv('DB_NAME')}"
 )
 
+# Строгий режим: ленивая подгрузка связи, которой нужен запрос в БД,
+# падает с InvalidRequestError вместо скрытого N+1 (или MissingGreenlet
+# в asyncio). Каскады при flush и попадания в identity map работают
+STRICT_LOADING = os.getenv(
+    "SQLALCHEMY_STRICT_LOADING", str(os.getenv("ENV") == "development")
+).lower() == "true"
+
 engine = create_async_engine(
     DATABASE_URL,
     echo=os.getenv("ENV") == "development",
+    poolclass=InstrumentedQueuePool,
     pool_size=20,
     max_overflow=10,
     pool_pre_ping=True,
@@ -27,6 +36,13 @@ engine = create_async_engine(
 
 Base = declarative_base()
 
+
+def relationship(*args, **kwargs):
+    if STRICT_LOADING:
+        kwargs.setdefault("lazy", "raise_on_sql")
+    return orm_relationship(*args, **kwargs)
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
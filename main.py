@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import uvicorn
@@ -5,13 +6,30 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 
-from database import engine, Base
-from routers import routes
+from database import engine, Base, AsyncSessionLocal
+from routers import routes, metrics_router
 from init_db import init_db
+from service.swear_model import get_swear_checker
+from service import swear_cache, moderation_policy, near_duplicates
+from service.admission import AdmissionMiddleware
+from monitoring import (
+    RequestMetricsMiddleware, install_sql_instrumentation,
+    monitor_event_loop_lag, blocking_detector, slow_query_log
+)
 
 
 load_dotenv()
 
+install_sql_instrumentation(
+    engine, budget_mode=os.getenv("QUERY_BUDGET_MODE", "log").lower()
+)
+
+slow_query_threshold_ms = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+if slow_query_threshold_ms > 0:
+    slow_query_log.threshold = slow_query_threshold_ms / 1000
+    slow_query_log.explain_sample_rate = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0"))
+    slow_query_log.install(engine)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -21,7 +39,34 @@ async def lifespan(app: FastAPI):
 
     await init_db()
 
+    # оценки прошлой версии модели в таблице кеша больше не найдутся
+    if swear_cache.PERSISTENT:
+        async with AsyncSessionLocal() as db:
+            await swear_cache.purge_stale(db)
+
+    async with AsyncSessionLocal() as db:
+        await moderation_policy.refresh(db)
+    policy_watcher = asyncio.create_task(moderation_policy.watch(AsyncSessionLocal))
+    duplicate_index = asyncio.create_task(near_duplicates.watch(AsyncSessionLocal))
+
+    # без прогрева модель загрузится на первом отзыве и заблокирует event loop
+    if os.getenv("SWEAR_MODEL_WARMUP", "True").lower() == "true":
+        await asyncio.to_thread(get_swear_checker)
+
+    lag_monitor = asyncio.create_task(
+        monitor_event_loop_lag(float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5")))
+    )
+
+    block_threshold_ms = float(os.getenv("EVENT_LOOP_BLOCK_THRESHOLD_MS", "100"))
+    if block_threshold_ms > 0:
+        blocking_detector.threshold = block_threshold_ms / 1000
+        blocking_detector.start(asyncio.get_running_loop())
+
     yield
+    blocking_detector.stop()
+    lag_monitor.cancel()
+    policy_watcher.cancel()
+    duplicate_index.cancel()
     await engine.dispose()
 
 
@@ -31,6 +76,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# внутри CORS: ответы 503 тоже получают CORS-заголовки
+app.add_middleware(AdmissionMiddleware, router=app.router)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=['http://localhost:5173'],
@@ -39,16 +87,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    RequestMetricsMiddleware,
+    server_timing=os.getenv("SERVER_TIMING", "True").lower() == "true"
+)
+
 
 for router in routes:
     app.include_router(router, prefix="/api")
 
+app.include_router(metrics_router)
+
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=os.getenv("APP_HOST"),
-        port=int(os.getenv("APP_PORT")),
-        reload=os.getenv("APP_RELOAD", "False").lower() == "true",
-        log_level=os.getenv("APP_LOG_LEVEL", "info").lower()
-    )
+    workers = int(os.getenv("APP_WORKERS", "1"))
+    if workers > 1 and os.getenv("APP_PREFORK", "True").lower() == "true":
+        # модель и кеш SQL загружаются в мастере и делятся воркерами
+        from prefork import serve_prefork
+        serve_prefork(
+            app,
+            host=os.getenv("APP_HOST"),
+            port=int(os.getenv("APP_PORT")),
+            workers=workers,
+            log_level=os.getenv("APP_LOG_LEVEL", "info").lower()
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=os.getenv("APP_HOST"),
+            port=int(os.getenv("APP_PORT")),
+            workers=workers,
+            reload=os.getenv("APP_RELOAD", "False").lower() == "true",
+            log_level=os.getenv("APP_LOG_LEVEL", "info").lower()
+        )
@@ -1,12 +1,12 @@
+from typing import Optional
 from sqlalchemy import (
     Column, Boolean, ForeignKey, DateTime, func, select
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, joinedload, selectinload
-from database import Base
+from database import Base, relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
-from models import Discipline, ReviewDiscipline
+from models import ReviewDiscipline
 
 
 class Complaint(Base):
@@ -39,20 +39,10 @@ class Complaint(Base):
         return result.scalar_one_or_none()
 
     @classmethod
-    def get_reviews_with_pending_complaints(cls):
+    def get_reviews_with_pending_complaints(cls, user_id: Optional[str] = None):
         return (
-            select(ReviewDiscipline)
-            .join(cls)
-            .options(
-                joinedload(ReviewDiscipline.author),
-                joinedload(ReviewDiscipline.lector),
-                joinedload(ReviewDiscipline.practic),
-                joinedload(ReviewDiscipline.discipline).joinedload(Discipline.module),
-                selectinload(ReviewDiscipline.votes),
-                selectinload(ReviewDiscipline.complaints)
-            )
-            .where(cls.resolved == False)
-            .distinct()
+            ReviewDiscipline.get_projection(user_id)
+            .where(ReviewDiscipline.complaints.any(cls.resolved == False))
         )
 
     @classmethod
@@ -1,8 +1,10 @@
 from typing import Optional
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, select, func
+from sqlalchemy import (
+    Column, String, Text, Enum, ForeignKey, select, func, exists, false
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, selectinload
-from database import Base
+from sqlalchemy.orm import selectinload
+from database import Base, relationship
 from uuid import uuid4
 import enum
 from models import Module
@@ -54,15 +56,62 @@ class Discipline(Base):
             selectinload(cls.module)
         )
 
+    @classmethod
+    def get_projection(cls, user_id: Optional[str] = None):
+        # Агрегаты считаются в БД — отзывы и избранное в Python не загружаются
+        from models import ReviewDiscipline, ReviewStatusEnum, Favorite
+
+        review_stats = (
+            select(
+                ReviewDiscipline.discipline_id,
+                func.avg(ReviewDiscipline.grade).label("avg_rating"),
+                func.count(ReviewDiscipline.grade).label("review_count"),
+                func.max(ReviewDiscipline.created_at).label("latest_review_at")
+            )
+            .where(ReviewDiscipline.status == ReviewStatusEnum.published)
+            .group_by(ReviewDiscipline.discipline_id)
+            .subquery()
+        )
+
+        favorites_count = (
+            select(func.count(Favorite.id))
+            .where(Favorite.discipline_id == cls.id)
+            .correlate(cls)
+            .scalar_subquery()
+        )
+
+        is_favorite = false()
+        if user_id:
+            is_favorite = exists().where(
+                Favorite.discipline_id == cls.id,
+                Favorite.user_id == user_id
+            ).correlate(cls)
+
+        return (
+            select(
+                cls.id, cls.name, cls.format, cls.description,
+                cls.modeus_link, cls.presentation_link,
+                Module.id.label("module_id"),
+                Module.name.label("module_name"),
+                func.coalesce(review_stats.c.avg_rating, 0).label("avg_rating"),
+                func.coalesce(review_stats.c.review_count, 0).label("review_count"),
+                review_stats.c.latest_review_at,
+                favorites_count.label("favorites_count"),
+                is_favorite.label("is_favorite")
+            )
+            .join(Module, Module.id == cls.module_id)
+            .outerjoin(review_stats, review_stats.c.discipline_id == cls.id)
+        )
+
     @classmethod
     def apply_filters(cls, query, name_search, module_search, format_filter):
         if name_search:
             query = query.where(cls.name.ilike(f"%{name_search}%"))
         if module_search:
             # добавить strip
-            query = query.join(Module).where(
+            query = query.where(cls.module.has(
                 func.lower(Module.name) == module_search.lower().strip()
-            )
+            ))
         if format_filter:
             format_mapping = {
                 "онлайн": DisciplineFormatEnum.online,
@@ -80,7 +129,7 @@ class Discipline(Base):
         from models import Favorite
 
         return (
-            cls.get_joined_data()
+            cls.get_projection(user_id)
             .join(Favorite, Favorite.discipline_id == cls.id)
             .where(Favorite.user_id == user_id)
         )
@@ -123,3 +172,22 @@ class Discipline(Base):
             "favorites_count": favorites_count,
             "is_favorite": is_favorite
         }
+
+    @staticmethod
+    def row_to_dto(row):
+        return {
+            "id": str(row.id),
+            "name": row.name,
+            "format": row.format.value if row.format else None,
+            "description": row.description,
+            "modeus_link": row.modeus_link,
+            "presentation_link": row.presentation_link,
+            "module": {
+                "id": str(row.module_id),
+                "name": row.module_name
+            },
+            "avg_rating": round(float(row.avg_rating), 1),
+            "review_count": row.review_count,
+            "favorites_count": row.favorites_count or 0,
+            "is_favorite": bool(row.is_favorite)
+        }
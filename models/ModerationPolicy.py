@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, CheckConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from database import Base
+
+
+class ModerationPolicy(Base):
+    __tablename__ = "moderation_policies"
+
+    # действует последняя запись, старые остаются историей
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pending_threshold = Column(Float, nullable=False)
+    rejected_threshold = Column(Float, nullable=False)
+    prefilter_mode = Column(String(10), nullable=False)
+    prefilter_obscene_score = Column(Float, nullable=False)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint(
+            "pending_threshold >= 0 AND pending_threshold <= rejected_threshold AND rejected_threshold <= 1",
+            name="check_policy_thresholds"
+        ),
+    )
@@ -1,9 +1,8 @@
 import uuid
 from sqlalchemy import Column, String, DateTime, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, relationship
 
 
 class Module(Base):
@@ -1,7 +1,6 @@
 from uuid import uuid4
-from database import Base
+from database import Base, relationship
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
 from sqlalchemy import Column, DateTime, String, ForeignKey
 
 
@@ -0,0 +1,13 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, String
+from database import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    # без WAL: ведра не жалко потерять при сбое, зато запись дешёвая
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String(128), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
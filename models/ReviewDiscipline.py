@@ -1,17 +1,22 @@
 from typing import Optional
 from uuid import uuid4
 from sqlalchemy import (
-    Column, ForeignKey, Text, Integer, select,
+    Column, ForeignKey, Text, Integer, String, select,
     Float, Enum, Boolean, DateTime, func,
-    CheckConstraint, case
+    CheckConstraint, union, null, case, and_, not_, false, cast,
+    literal_column
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, joinedload, selectinload
+from sqlalchemy.dialects.postgresql import UUID, aggregate_order_by
+from sqlalchemy.orm import joinedload, selectinload, aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 from .ReviewVote import VoteTypeEnum
 from models import Discipline
-from database import Base
+from database import Base, relationship
+from service.pagination_service import (
+    paginate, build_pagination, with_total_count, fetch_total
+)
 import enum
+import json
 
 
 class ReviewStatusEnum(enum.Enum):
@@ -28,8 +33,13 @@ class ReviewDiscipline(Base):
     grade = Column(Integer, nullable=False)
     offensive_score = Column(Float, nullable=False)
     status = Column(Enum(ReviewStatusEnum), default=ReviewStatusEnum.pending)
+    # версия политики модерации (пороги, предфильтр, модель), по которой
+    # посчитаны offensive_score и status; NULL — до появления политик
+    policy_version = Column(String(32), nullable=True, index=True)
+    # статус выставлен модератором — пересчёт оценок его не трогает
+    status_by_moderator = Column(Boolean, nullable=False, default=False, server_default=false())
     is_anonymous = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     __table_args__ = (
         CheckConstraint("grade >= 1 AND grade <= 5", name="check_grade_range"),
@@ -40,12 +50,21 @@ class ReviewDiscipline(Base):
     lector_id = Column(
         UUID(as_uuid=True),
         ForeignKey("teachers.id", ondelete="SET NULL"),
-        nullable=True
+        nullable=True,
+        index=True
     )
     practic_id = Column(
         UUID(as_uuid=True),
         ForeignKey("teachers.id", ondelete="SET NULL"),
-        nullable=True
+        nullable=True,
+        index=True
+    )
+    # почти такой же недавний отзыв той же дисциплины (см. near_duplicates)
+    duplicate_of_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("reviews.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
     )
 
     author = relationship("User", back_populates="reviews")
@@ -68,36 +87,148 @@ class ReviewDiscipline(Base):
         return data
 
     @classmethod
-    def apply_sorting(cls, query, sort_by: str = "date", sort_order: str = "desc"):
-        from models import ReviewVote
+    def teacher_review_ids(cls, teacher_id: str):
+        # UNION двух индексных выборок вместо OR по lector_id/practic_id,
+        # чтобы стоимость зависела от числа отзывов преподавателя
+        return union(
+            select(cls.id).where(cls.lector_id == teacher_id),
+            select(cls.id).where(cls.practic_id == teacher_id)
+        )
 
-        if sort_by == "likes":
-            likes_count = func.sum(
-                case(
-                    (ReviewVote.vote == VoteTypeEnum.like, 1),
-                    else_=0
-                )
-            ).label("likes_count")
-            sort_expr = likes_count
-        else:
-            sort_expr = cls.created_at
+    @classmethod
+    def filter_by_teacher(cls, teacher_id: str):
+        return cls.id.in_(cls.teacher_review_ids(teacher_id))
+
+    @classmethod
+    def get_projection(cls, user_id: Optional[str] = None):
+        # Плоская выборка только нужных колонок: строки сразу
+        # превращаются в DTO без загрузки ORM-графа
+        from models import User, Teacher, Module, ReviewVote, Complaint
+
+        lector = aliased(Teacher, name="lector")
+        practic = aliased(Teacher, name="practic")
+
+        def votes_count(vote: VoteTypeEnum):
+            return (
+                select(func.count(ReviewVote.id))
+                .where(ReviewVote.review_id == cls.id, ReviewVote.vote == vote)
+                .correlate(cls)
+                .scalar_subquery()
+            )
+
+        complaints_count = (
+            select(func.count(Complaint.id))
+            .where(Complaint.review_id == cls.id, Complaint.resolved == False)
+            .correlate(cls)
+            .scalar_subquery()
+        )
+
+        user_vote = null()
+        if user_id:
+            user_vote = (
+                select(ReviewVote.vote)
+                .where(ReviewVote.review_id == cls.id, ReviewVote.user_id == user_id)
+                .limit(1)
+                .correlate(cls)
+                .scalar_subquery()
+            )
+
+        return (
+            select(
+                cls.id, cls.grade, cls.comment, cls.status,
+                cls.offensive_score, cls.is_anonymous, cls.created_at,
+                cls.user_id,
+                User.first_name.label("author_first_name"),
+                User.surname.label("author_surname"),
+                User.patronymic.label("author_patronymic"),
+                cls.discipline_id,
+                Discipline.name.label("discipline_name"),
+                Module.id.label("module_id"),
+                Module.name.label("module_name"),
+                cls.lector_id,
+                lector.first_name.label("lector_first_name"),
+                lector.surname.label("lector_surname"),
+                lector.patronymic.label("lector_patronymic"),
+                cls.practic_id,
+                practic.first_name.label("practic_first_name"),
+                practic.surname.label("practic_surname"),
+                practic.patronymic.label("practic_patronymic"),
+                votes_count(VoteTypeEnum.like).label("likes"),
+                votes_count(VoteTypeEnum.dislike).label("dislikes"),
+                complaints_count.label("complaints_count"),
+                user_vote.label("user_vote")
+            )
+            .select_from(cls)
+            .join(Discipline, Discipline.id == cls.discipline_id)
+            .join(Module, Module.id == Discipline.module_id)
+            .outerjoin(User, User.id == cls.user_id)
+            .outerjoin(lector, lector.id == cls.lector_id)
+            .outerjoin(practic, practic.id == cls.practic_id)
+        )
+
+    @staticmethod
+    def sort_expression(columns, sort_by: str = "date", sort_order: str = "desc"):
+        sort_expr = columns.likes if sort_by == "likes" else columns.created_at
 
         if sort_order.lower() == "desc":
-            return query.order_by(sort_expr.desc())
-        return query.order_by(sort_expr.asc())
+            return sort_expr.desc()
+        return sort_expr.asc()
 
     @classmethod
-    def add_likes_count(cls, query):
-        from models import ReviewVote
-        from sqlalchemy import case
+    def apply_sorting(cls, query, sort_by: str = "date", sort_order: str = "desc"):
+        return query.order_by(
+            cls.sort_expression(query.selected_columns, sort_by, sort_order)
+        )
 
-        return (
-            query.outerjoin(ReviewVote)
-            .add_columns(func.sum(case((
-                ReviewVote.vote == VoteTypeEnum.like, 1),
-                else_=0
-            )).label("likes_count"))
-            .group_by(cls.id)
+    @staticmethod
+    def json_object(columns):
+        # Тот же DTO, что и row_to_dto, но собранный в Postgres
+        def key(name: str):
+            return literal_column(f"'{name}'")
+
+        def person(prefix: str, id_column, condition=None):
+            return case(
+                (
+                    condition if condition is not None else id_column.isnot(None),
+                    func.json_build_object(
+                        key("id"), id_column,
+                        key("first_name"), columns[f"{prefix}_first_name"],
+                        key("surname"), columns[f"{prefix}_surname"],
+                        key("patronymic"), columns[f"{prefix}_patronymic"]
+                    )
+                ),
+                else_=null()
+            )
+
+        is_public_author = and_(
+            columns.user_id.isnot(None),
+            not_(func.coalesce(columns.is_anonymous, false()))
+        )
+
+        return func.json_build_object(
+            key("id"), columns.id,
+            key("grade"), columns.grade,
+            key("comment"), columns.comment,
+            key("status"), columns.status,
+            key("author"), person("author", columns.user_id, is_public_author),
+            key("discipline"), func.json_build_object(
+                key("id"), columns.discipline_id,
+                key("name"), columns.discipline_name,
+                key("module"), func.json_build_object(
+                    key("id"), columns.module_id,
+                    key("name"), columns.module_name
+                )
+            ),
+            key("lector"), person("lector", columns.lector_id),
+            key("practic"), person("practic", columns.practic_id),
+            key("offensive_score"), columns.offensive_score,
+            key("is_anonymous"), columns.is_anonymous,
+            key("likes"), columns.likes,
+            key("dislikes"), columns.dislikes,
+            key("total_rating"), columns.likes - columns.dislikes,
+            key("user_vote"), columns.user_vote,
+            key("complaints_count"), columns.complaints_count,
+            key("created_at"), columns.created_at
         )
 
     @classmethod
@@ -109,38 +240,92 @@ class ReviewDiscipline(Base):
             page: int = 1,
             page_size: int = 40,
             sort_by: str = "date",
-            sort_order: str = "desc"
+            sort_order: str = "desc",
+            teacher_id: Optional[str] = None,
+            with_total: bool = True
     ):
-        query = cls.get_joined_data()
-        query = cls.add_likes_count(query)
+        user_id = str(current_user["id"]) if current_user else None
+        query = cls.get_projection(user_id)
 
         if base_filters:
             query = query.where(*base_filters)
 
-        count_query = query.with_only_columns(func.count(cls.id.distinct()))
-        total_result = await db.execute(count_query)
-        total = total_result.unique().scalar_one_or_none() or 0
+        if teacher_id:
+            query = query.where(cls.filter_by_teacher(teacher_id))
 
         sorted_query = cls.apply_sorting(query, sort_by, sort_order)
 
-        paginated_query = sorted_query.limit(page_size).offset((page - 1) * page_size)
-
-        result = await db.execute(paginated_query)
-        reviews = result.unique().scalars().all()
-
-        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+        rows, pagination = await paginate(
+            db, sorted_query, page, page_size, with_total
+        )
 
-        user_id = str(current_user["id"]) if current_user else None
         return {
-            "data": [r.dto_with_user_vote_info(user_id) for r in reviews],
-            "pagination": {
-                "total": total,
-                "total_pages": total_pages,
-                "page": page,
-                "size": page_size
-            }
+            "data": [cls.row_to_dto(row) for row in rows],
+            "pagination": pagination
         }
 
+    @classmethod
+    async def paginated_json(
+            cls,
+            db: AsyncSession,
+            base_filters: list = None,
+            current_user: Optional[dict] = None,
+            page: int = 1,
+            page_size: int = 40,
+            sort_by: str = "date",
+            sort_order: str = "desc",
+            teacher_id: Optional[str] = None,
+            with_total: bool = True
+    ) -> bytes:
+        user_id = str(current_user["id"]) if current_user else None
+        query = cls.get_projection(user_id)
+
+        if base_filters:
+            query = query.where(*base_filters)
+
+        if teacher_id:
+            query = query.where(cls.filter_by_teacher(teacher_id))
+
+        limit = page_size if with_total else page_size + 1
+        page_rows = (
+            with_total_count(query)
+            .order_by(cls.sort_expression(query.selected_columns, sort_by, sort_order))
+            .limit(limit)
+            .offset((page - 1) * page_size)
+            .subquery("page")
+        )
+        page_order = cls.sort_expression(page_rows.c, sort_by, sort_order)
+        numbered = select(
+            page_rows,
+            func.row_number().over(order_by=page_order).label("position")
+        ).subquery("numbered")
+
+        # лишняя строка (page_size + 1) нужна только для has_next
+        data = func.json_agg(
+            aggregate_order_by(cls.json_object(numbered.c), numbered.c.position)
+        ).filter(numbered.c.position <= page_size)
+
+        result = await db.execute(
+            select(
+                cast(func.coalesce(data, literal_column("'[]'::json")), Text).label("data"),
+                func.max(numbered.c.total_count).label("total"),
+                func.count().label("fetched")
+            )
+        )
+        row = result.one()
+
+        if not with_total:
+            pagination = build_pagination(page, page_size, has_next=row.fetched > page_size)
+        elif row.total is None and page > 1:
+            pagination = build_pagination(page, page_size, await fetch_total(db, query))
+        else:
+            pagination = build_pagination(page, page_size, row.total or 0)
+
+        return (
+            b'{"data":' + row.data.encode()
+            + b',"pagination":' + json.dumps(pagination).encode() + b"}"
+        )
+
     def get_dto(self):
         likes = sum(1 for v in self.votes if v.vote == VoteTypeEnum.like)
         dislikes = sum(1 for v in self.votes if v.vote == VoteTypeEnum.dislike)
@@ -207,3 +392,53 @@ class ReviewDiscipline(Base):
             if str(vote.user_id) == user_id:
                 return vote.vote.value
         return None
+
+    @staticmethod
+    def row_to_dto(row):
+        likes = row.likes or 0
+        dislikes = row.dislikes or 0
+
+        author_info = None
+        if row.user_id and not row.is_anonymous:
+            author_info = {
+                "id": str(row.user_id),
+                "first_name": row.author_first_name,
+                "surname": row.author_surname,
+                "patronymic": row.author_patronymic
+            }
+
+        return {
+            "id": str(row.id),
+            "grade": row.grade,
+            "comment": row.comment,
+            "status": row.status.value,
+            "author": author_info,
+            "discipline": {
+                "id": str(row.discipline_id),
+                "name": row.discipline_name,
+                "module": {
+                    "id": str(row.module_id),
+                    "name": row.module_name
+                }
+            },
+            "lector": {
+                "id": str(row.lector_id),
+                "first_name": row.lector_first_name,
+                "surname": row.lector_surname,
+                "patronymic": row.lector_patronymic,
+            } if row.lector_id else None,
+            "practic": {
+                "id": str(row.practic_id),
+                "first_name": row.practic_first_name,
+                "surname": row.practic_surname,
+                "patronymic": row.practic_patronymic,
+            } if row.practic_id else None,
+            "offensive_score": row.offensive_score,
+            "is_anonymous": row.is_anonymous,
+            "likes": likes,
+            "dislikes": dislikes,
+            "total_rating": likes - dislikes,
+            "user_vote": row.user_vote.value if row.user_vote else None,
+            "complaints_count": row.complaints_count or 0,
+            "created_at": row.created_at.isoformat(),
+        }
@@ -1,9 +1,8 @@
 from uuid import uuid4
 from sqlalchemy import Column, ForeignKey, Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, relationship
 import enum
 
 
@@ -1,7 +1,6 @@
 from sqlalchemy import Column, Integer, Enum
-from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, relationship
 import enum
 
 
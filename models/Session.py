@@ -2,8 +2,7 @@ from uuid import uuid4
 
 from sqlalchemy import Column, ForeignKey, String
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-from database import Base
+from database import Base, relationship
 
 
 class Session(Base):
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, Float, String, func
+from database import Base
+
+
+class SwearScoreCache(Base):
+    __tablename__ = "swear_score_cache"
+
+    # sha256 от версии модели и нормализованного комментария
+    key = Column(String(64), primary_key=True)
+    model_version = Column(String(64), nullable=False, index=True)
+    offensive_score = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
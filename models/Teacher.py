@@ -2,10 +2,12 @@ from typing import Optional
 from uuid import uuid4
 from sqlalchemy import Column, String, select, or_
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, selectinload
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from .TeacherDiscipline import TeacherDiscipline
 from .Discipline import Discipline
-from database import Base
+from .Module import Module
+from database import Base, relationship
 
 
 class Teacher(Base):
@@ -30,6 +32,47 @@ class Teacher(Base):
             .joinedload(Discipline.module)
         ).outerjoin(TeacherDiscipline).outerjoin(Discipline).group_by(cls.id)
 
+    @classmethod
+    def get_projection(cls):
+        return select(cls.id, cls.first_name, cls.surname, cls.patronymic)
+
+    @classmethod
+    def filter_by_discipline(cls, discipline_id: str):
+        return cls.id.in_(
+            select(TeacherDiscipline.teacher_id)
+            .where(TeacherDiscipline.discipline_id == discipline_id)
+        )
+
+    @classmethod
+    async def get_disciplines_by_teacher(cls, db: AsyncSession, teacher_ids: list):
+        if not teacher_ids:
+            return {}
+
+        result = await db.execute(
+            select(
+                TeacherDiscipline.teacher_id,
+                Discipline.id,
+                Discipline.name,
+                Module.id.label("module_id"),
+                Module.name.label("module_name")
+            )
+            .join(Discipline, Discipline.id == TeacherDiscipline.discipline_id)
+            .join(Module, Module.id == Discipline.module_id)
+            .where(TeacherDiscipline.teacher_id.in_(teacher_ids))
+        )
+
+        disciplines = {}
+        for row in result:
+            disciplines.setdefault(row.teacher_id, []).append({
+                "id": str(row.id),
+                "name": row.name,
+                "module": {
+                    "id": str(row.module_id),
+                    "name": row.module_name
+                }
+            })
+        return disciplines
+
     @classmethod
     def apply_filters(cls, query, name_search: Optional[str] = None):
         if name_search:
@@ -78,3 +121,13 @@ class Teacher(Base):
             "patronymic": self.patronymic,
             "disciplines": disciplines
         }
+
+    @staticmethod
+    def row_to_dto(row, disciplines: Optional[list] = None):
+        return {
+            "id": str(row.id),
+            "first_name": row.first_name,
+            "surname": row.surname,
+            "patronymic": row.patronymic,
+            "disciplines": disciplines or []
+        }
@@ -2,9 +2,8 @@ from uuid import uuid4
 from sqlalchemy import Column, ForeignKey, select, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, relationship
 
 
 class TeacherDiscipline(Base):
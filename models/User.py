@@ -1,9 +1,9 @@
 from uuid import uuid4
-from sqlalchemy import Column, String, or_
+from sqlalchemy import Column, String, or_, select
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-from database import Base
+from database import Base, relationship
 from werkzeug.security import generate_password_hash, check_password_hash
+from monitoring.metrics import timed, password_hash_seconds
 
 
 class User(Base):
@@ -38,10 +38,28 @@ class User(Base):
     )
 
     def set_password(self, password: str):
-        self.password = generate_password_hash(password)
+        with timed(password_hash_seconds["generate"]):
+            self.password = generate_password_hash(password)
 
     def check_password(self, password: str):
-        return check_password_hash(self.password, password)
+        with timed(password_hash_seconds["check"]):
+            return check_password_hash(self.password, password)
+
+    @classmethod
+    def get_projection(cls):
+        from models import Role, UserRole
+
+        role = (
+            select(Role.name)
+            .join(UserRole, UserRole.role_id == Role.id)
+            .where(UserRole.user_id == cls.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        return select(
+            cls.id, cls.first_name, cls.surname,
+            cls.patronymic, cls.email, role.label("role")
+        )
 
     @classmethod
     def apply_search_filter(cls, query, search_term: str):
@@ -83,3 +101,13 @@ class User(Base):
             "role": role
         }
 
+    @staticmethod
+    def row_to_dto(row):
+        return {
+            "id": str(row.id),
+            "first_name": row.first_name,
+            "surname": row.surname,
+            "patronymic": row.patronymic,
+            "email": row.email,
+            "role": row.role.value if row.role else None
+        }
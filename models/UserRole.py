@@ -1,7 +1,6 @@
 from sqlalchemy import Column, Integer, ForeignKey
-from database import Base
+from database import Base, relationship
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
 from uuid import uuid4
 
 
@@ -15,3 +15,6 @@ from .ReviewDiscipline import ReviewDiscipline
 from .ReviewVote import VoteTypeEnum
 from .ReviewVote import ReviewVote
 from .Complaint import Complaint
+from .SwearScoreCache import SwearScoreCache
+from .ModerationPolicy import ModerationPolicy
+from .RateLimitBucket import RateLimitBucket
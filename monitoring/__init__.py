@@ -0,0 +1,10 @@
+from .metrics import Histogram, Gauge, timed, route_metrics
+from .request_metrics import (
+    RequestStats, RequestMetricsMiddleware, InstrumentedQueuePool,
+    current_request_stats, install_sql_instrumentation, QueryBudgetExceeded
+)
+from .query_budget import query_budget
+from .event_loop import monitor_event_loop_lag, blocking_detector
+from .prometheus import render_metrics
+from .profiler import sampling_profiler, ProfilerBusy
+from .slow_queries import slow_query_log, redact_parameters
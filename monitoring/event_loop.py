@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from .metrics import event_loop_lag_seconds, event_loop_lag_last, event_loop_blocked_seconds
+from .request_metrics import request_scopes_by_task, route_template
+
+logger = logging.getLogger(__name__)
+
+
+# Сэмплер задержки event loop: засыпаем на interval и смотрим, насколько
+# позже запланированного нас разбудили. Большой лаг — признак блокирующего
+# кода в корутинах (CPU-bound работа, синхронный I/O)
+async def monitor_event_loop_lag(interval: float = 0.5):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - started - interval, 0.0)
+        event_loop_lag_seconds.observe(lag)
+        event_loop_lag_last.set(lag)
+
+
+# Детектор блокировок: фоновый поток раз в interval ставит в loop пустой
+# callback и ждёт его выполнения. Если loop не отвечает дольше threshold,
+# снимается стек потока loop (там исполняется блокирующая корутина)
+# и маршрут запроса текущей задачи. Поток спит большую часть времени,
+# поэтому детектор можно держать включённым в production
+class BlockingDetector:
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05, max_reports: int = 100):
+        self.threshold = threshold
+        self.interval = interval
+        self.reports = deque(maxlen=max_reports)
+        self.blocks_total = 0
+        self._loop = None
+        self._loop_thread_id = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="event-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            answered = threading.Event()
+            sent = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return
+
+            if answered.wait(self.threshold):
+                continue
+
+            report = self._capture()
+            # дожидаемся разблокировки, чтобы записать полную длительность
+            while not answered.wait(0.5):
+                if self._stopped.is_set():
+                    return
+            self._record(report, time.perf_counter() - sent)
+
+    def _capture(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame is not None else []
+        task = asyncio.current_task(self._loop)
+        scope = request_scopes_by_task.get(task) if task is not None else None
+        return {
+            "route": route_template(scope) if scope else None,
+            "task": task.get_name() if task is not None else None,
+            "stack": [f"{item.filename}:{item.lineno} {item.name}" for item in stack]
+        }
+
+    def _record(self, report: dict, blocked: float):
+        report["blocked_ms"] = round(blocked * 1000, 1)
+        report["detected_at"] = datetime.now(timezone.utc).isoformat()
+        self.reports.append(report)
+        self.blocks_total += 1
+        event_loop_blocked_seconds.observe(blocked)
+        logger.warning(
+            "Event loop blocked for %.1f ms in %s\n%s",
+            report["blocked_ms"], report["route"] or "<background>",
+            "\n".join(report["stack"][-15:])
+        )
+
+    def snapshot(self):
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "blocks_total": self.blocks_total,
+            "reports": list(reversed(self.reports))
+        }
+
+
+blocking_detector = BlockingDetector()
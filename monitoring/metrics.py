@@ -0,0 +1,161 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LATENCY_BUCKETS_S = tuple(bound / 1000 for bound in LATENCY_BUCKETS_MS)
+FAST_LATENCY_BUCKETS_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# Гистограмма с фиксированными границами: значение попадает в первый бакет,
+# чья верхняя граница >= значения, последний бакет — +Inf
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float):
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1]
+            }
+        }
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+@contextmanager
+def timed(histogram: Histogram):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+# Агрегаты по шаблону маршрута в пределах одного воркера
+class RouteMetrics:
+    def __init__(self):
+        self._lock = Lock()
+        self._routes = {}
+
+    def _route(self, route: str):
+        histograms = self._routes.get(route)
+        if histograms is None:
+            histograms = self._routes[route] = {
+                "wall_ms": Histogram(LATENCY_BUCKETS_MS),
+                "sql_ms": Histogram(LATENCY_BUCKETS_MS),
+                "sql_statements": Histogram(COUNT_BUCKETS),
+                "pool_wait_ms": Histogram(LATENCY_BUCKETS_MS),
+                "response_bytes": Histogram(SIZE_BUCKETS)
+            }
+        return histograms
+
+    def observe(self, route: str, stats):
+        with self._lock:
+            histograms = self._route(route)
+            histograms["wall_ms"].observe(stats.wall_time * 1000)
+            histograms["sql_ms"].observe(stats.sql_time * 1000)
+            histograms["sql_statements"].observe(stats.sql_count)
+            histograms["pool_wait_ms"].observe(stats.pool_wait * 1000)
+            histograms["response_bytes"].observe(stats.response_bytes)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {name: histogram.snapshot() for name, histogram in histograms.items()}
+                for route, histograms in sorted(self._routes.items())
+            }
+
+    def histograms(self):
+        with self._lock:
+            return {route: dict(histograms) for route, histograms in sorted(self._routes.items())}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_metrics = RouteMetrics()
+
+
+# Глобальные метрики процесса (секунды, как принято в Prometheus)
+requests_in_flight = Gauge()
+pool_wait_seconds = Histogram(LATENCY_BUCKETS_S)
+swear_inference_seconds = Histogram(LATENCY_BUCKETS_S)
+swear_batch_size = Histogram(BATCH_BUCKETS)
+swear_model_load_seconds = Gauge()
+# вердикты предфильтра мата и, в режиме shadow, статус по модели для них
+swear_prefilter_total = {verdict: Gauge() for verdict in ("obscene", "ambiguous")}
+swear_prefilter_shadow = {
+    verdict: {status: Gauge() for status in ("published", "pending", "rejected")}
+    for verdict in ("obscene",)
+}
+# кеш оценок модели: hit — найдено в памяти (в т.ч. подгруженное из таблицы),
+# miss — ушло в модель, db — подгружено из таблицы swear_score_cache
+swear_cache_lookups = {result: Gauge() for result in ("hit", "miss", "db")}
+near_duplicate_check_seconds = Histogram(FAST_LATENCY_BUCKETS_S)
+near_duplicate_total = Gauge()
+# отказы token bucket (429) по политикам service/rate_limit.py
+rate_limited_total = defaultdict(Gauge)
+# неудачные входы и попытки, отклонённые до проверки пароля
+login_failures_total = Gauge()
+login_throttled_total = Gauge()
+# контроль допуска по классам маршрутов service/admission.py
+admission_in_flight = defaultdict(Gauge)
+admission_queued = defaultdict(Gauge)
+admission_rejected_total = defaultdict(Gauge)
+admission_wait_seconds = Histogram(LATENCY_BUCKETS_S)
+password_hash_seconds = {
+    "generate": Histogram(LATENCY_BUCKETS_S),
+    "check": Histogram(LATENCY_BUCKETS_S)
+}
+event_loop_lag_seconds = Histogram(LATENCY_BUCKETS_S)
+event_loop_lag_last = Gauge()
+event_loop_blocked_seconds = Histogram(LATENCY_BUCKETS_S)
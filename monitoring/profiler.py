@@ -0,0 +1,154 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from .request_metrics import request_scopes_by_task, route_template
+
+MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+# Сэмплирующий профилировщик: отдельный поток раз в interval снимает стеки
+# через sys._current_frames() и считает одинаковые стеки. Код приложения
+# не инструментируется, поэтому накладные расходы ограничены частотой
+# сэмплирования. Одновременно работает только один профиль
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+            self,
+            loop: asyncio.AbstractEventLoop,
+            loop_thread_id: int,
+            seconds: float,
+            interval: float = 0.01,
+            route: Optional[str] = None,
+            requests: Optional[int] = None
+    ):
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Profiler is already running")
+        try:
+            return self._sample(loop, loop_thread_id, seconds, interval, route, requests)
+        finally:
+            self._lock.release()
+
+    def _sample(self, loop, loop_thread_id, seconds, interval, route, requests):
+        own_thread_id = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = Counter()
+        matched_tasks = set()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            if route is None:
+                for thread_id, frame in frames.items():
+                    if thread_id != own_thread_id:
+                        stacks[(thread_names.get(thread_id, str(thread_id)),) + _stack(frame)] += 1
+                samples += 1
+            else:
+                task = asyncio.current_task(loop)
+                scope = request_scopes_by_task.get(task) if task is not None else None
+                if scope is not None and route_template(scope) == route:
+                    if requests is None or len(matched_tasks) < requests or task in matched_tasks:
+                        matched_tasks.add(task)
+                        frame = frames.get(loop_thread_id)
+                        if frame is not None:
+                            stacks[(route_template(scope),) + _stack(frame)] += 1
+                            samples += 1
+                # K запросов набрано и все завершились
+                if requests is not None and len(matched_tasks) >= requests and not any(
+                        task in request_scopes_by_task for task in matched_tasks
+                ):
+                    break
+            time.sleep(interval)
+
+        return Profile(
+            stacks, samples, interval,
+            time.perf_counter() - started, len(matched_tasks) if route else None
+        )
+
+
+def _stack(frame) -> tuple:
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _frame_name(frame) -> str:
+    if isinstance(frame, str):
+        return frame
+    filename, name, line = frame
+    return f"{name} ({filename}:{line})"
+
+
+class Profile:
+    def __init__(self, stacks: Counter, samples: int, interval: float, duration: float, requests: Optional[int]):
+        self.stacks = stacks
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+        self.requests = requests
+
+    # Формат collapsed stacks (flamegraph.pl, speedscope, inferno):
+    # "root;frame;frame count" по строке на уникальный стек
+    def collapsed(self) -> str:
+        lines = [
+            ";".join(_frame_name(frame).replace(";", ":") for frame in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "profile") -> str:
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, count in self.stacks.most_common():
+            sample = []
+            for frame in stack:
+                index = frame_index.get(frame)
+                if index is None:
+                    index = frame_index[frame] = len(frames)
+                    if isinstance(frame, str):
+                        frames.append({"name": frame})
+                    else:
+                        frames.append({"name": frame[1], "file": frame[0], "line": frame[2]})
+                sample.append(index)
+            samples.append(sample)
+            weights.append(count * self.interval)
+
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "monitoring.profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            }]
+        })
+
+
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,145 @@
+import os
+from .metrics import (
+    route_metrics, requests_in_flight, pool_wait_seconds,
+    swear_inference_seconds, swear_batch_size, swear_model_load_seconds,
+    swear_prefilter_total, swear_prefilter_shadow, swear_cache_lookups,
+    near_duplicate_check_seconds, near_duplicate_total, rate_limited_total,
+    login_failures_total, login_throttled_total, admission_in_flight, admission_queued,
+    admission_rejected_total, admission_wait_seconds,
+    password_hash_seconds, event_loop_lag_seconds, event_loop_lag_last, event_loop_blocked_seconds
+)
+
+# route_metrics хранит миллисекунды, в Prometheus отдаём секунды
+ROUTE_HISTOGRAMS = (
+    ("wall_ms", "http_request_duration_seconds", "Request wall time", 0.001),
+    ("sql_ms", "http_request_sql_duration_seconds", "SQL time per request", 0.001),
+    ("sql_statements", "http_request_sql_statements", "SQL statements per request", 1),
+    ("pool_wait_ms", "http_request_pool_wait_seconds", "Pool checkout wait per request", 0.001),
+    ("response_bytes", "http_response_size_bytes", "Serialized response size", 1),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _header(lines: list, name: str, help_text: str, metric_type: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+
+
+def _histogram(lines: list, name: str, histogram, labels: dict = None, scale: float = 1):
+    labels = labels or {}
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        bucket_labels = _labels({**labels, "le": _format(round(bound * scale, 9))})
+        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+    lines.append(f'{name}_bucket{_labels({**labels, "le": "+Inf"})} {histogram.count}')
+    lines.append(f"{name}_sum{_labels(labels)} {_format(histogram.sum * scale)}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+def _gauge(lines: list, name: str, help_text: str, value: float):
+    _header(lines, name, help_text, "gauge")
+    lines.append(f"{name} {_format(value)}")
+
+
+def _worker_label(line: str, worker: str) -> str:
+    if line.startswith("#"):
+        return line
+    label = f'worker="{_escape(worker)}"'
+    name_end = min(position for position in (line.find("{"), line.find(" ")) if position >= 0)
+    if line[name_end] == "{":
+        return f"{line[:name_end + 1]}{label},{line[name_end + 1:]}"
+    return f"{line[:name_end]}{{{label}}}{line[name_end:]}"
+
+
+def render_metrics(engine) -> str:
+    lines = []
+
+    routes = route_metrics.histograms()
+    for key, name, help_text, scale in ROUTE_HISTOGRAMS:
+        _header(lines, name, help_text, "histogram")
+        for route, histograms in routes.items():
+            _histogram(lines, name, histograms[key], {"route": route}, scale)
+
+    _gauge(lines, "http_requests_in_flight", "Requests being processed", requests_in_flight.value)
+
+    pool = engine.pool
+    _gauge(lines, "db_pool_size", "Configured pool size", pool.size())
+    _gauge(lines, "db_pool_checked_out", "Connections in use", pool.checkedout())
+    _gauge(lines, "db_pool_checked_in", "Idle connections in the pool", pool.checkedin())
+    _gauge(lines, "db_pool_overflow", "Connections opened above pool_size", max(pool.overflow(), 0))
+
+    _header(lines, "db_pool_wait_seconds", "Pool checkout wait", "histogram")
+    _histogram(lines, "db_pool_wait_seconds", pool_wait_seconds)
+
+    _header(lines, "swear_inference_seconds", "Swear model inference latency", "histogram")
+    _histogram(lines, "swear_inference_seconds", swear_inference_seconds)
+    _header(lines, "swear_inference_batch_size", "Texts per swear model call", "histogram")
+    _histogram(lines, "swear_inference_batch_size", swear_batch_size)
+    _gauge(
+        lines, "swear_model_load_seconds", "Swear model load time (0 — not loaded yet)",
+        swear_model_load_seconds.value
+    )
+    _header(lines, "swear_prefilter_total", "Prefilter verdicts (ambiguous texts go to the model)", "counter")
+    for verdict, counter in swear_prefilter_total.items():
+        lines.append(f"swear_prefilter_total{_labels({'verdict': verdict})} {_format(counter.value)}")
+    _header(lines, "swear_prefilter_shadow_total", "Model status for texts decided by the prefilter", "counter")
+    for verdict, statuses in swear_prefilter_shadow.items():
+        for status, counter in statuses.items():
+            labels = _labels({"verdict": verdict, "model_status": status})
+            lines.append(f"swear_prefilter_shadow_total{labels} {_format(counter.value)}")
+    _header(lines, "swear_cache_lookups_total", "Swear score cache lookups", "counter")
+    for result, counter in swear_cache_lookups.items():
+        lines.append(f"swear_cache_lookups_total{_labels({'result': result})} {_format(counter.value)}")
+    _header(lines, "near_duplicate_check_seconds", "Near-duplicate review check latency", "histogram")
+    _histogram(lines, "near_duplicate_check_seconds", near_duplicate_check_seconds)
+    _header(lines, "near_duplicate_reviews_total", "Reviews matched to a recent near-duplicate", "counter")
+    lines.append(f"near_duplicate_reviews_total {_format(near_duplicate_total.value)}")
+    _header(lines, "rate_limited_requests_total", "Requests rejected with 429 by rate limit policy", "counter")
+    for policy, counter in sorted(rate_limited_total.items()):
+        lines.append(f"rate_limited_requests_total{_labels({'policy': policy})} {_format(counter.value)}")
+    _header(lines, "login_failures_total", "Failed login attempts", "counter")
+    lines.append(f"login_failures_total {_format(login_failures_total.value)}")
+    _header(lines, "login_throttled_total", "Login attempts rejected before the password check", "counter")
+    lines.append(f"login_throttled_total {_format(login_throttled_total.value)}")
+    _header(lines, "admission_in_flight", "Admitted requests by lane", "gauge")
+    for lane, gauge in sorted(admission_in_flight.items()):
+        lines.append(f"admission_in_flight{_labels({'lane': lane})} {_format(gauge.value)}")
+    _header(lines, "admission_queued", "Requests waiting for admission by lane", "gauge")
+    for lane, gauge in sorted(admission_queued.items()):
+        lines.append(f"admission_queued{_labels({'lane': lane})} {_format(gauge.value)}")
+    _header(lines, "admission_rejected_total", "Requests shed with 503 by lane", "counter")
+    for lane, counter in sorted(admission_rejected_total.items()):
+        lines.append(f"admission_rejected_total{_labels({'lane': lane})} {_format(counter.value)}")
+    _header(lines, "admission_wait_seconds", "Wait before admission", "histogram")
+    _histogram(lines, "admission_wait_seconds", admission_wait_seconds)
+
+    _header(lines, "password_hash_seconds", "Password hashing latency", "histogram")
+    for operation, histogram in password_hash_seconds.items():
+        _histogram(lines, "password_hash_seconds", histogram, {"operation": operation})
+
+    _header(lines, "event_loop_lag_seconds", "Event loop scheduling lag", "histogram")
+    _histogram(lines, "event_loop_lag_seconds", event_loop_lag_seconds)
+    _gauge(lines, "event_loop_lag_last_seconds", "Last sampled event loop lag", event_loop_lag_last.value)
+    _header(lines, "event_loop_blocked_seconds", "Event loop blocks above threshold", "histogram")
+    _histogram(lines, "event_loop_blocked_seconds", event_loop_blocked_seconds)
+
+    # счётчики свои у каждого воркера, а запрос /metrics попадает в случайный:
+    # без метки воркера серии разных процессов выглядели бы как сбросы
+    worker = os.getenv("APP_WORKER_ID") or str(os.getpid())
+    return "\n".join(_worker_label(line, worker) for line in lines) + "\n"
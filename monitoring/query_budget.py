@@ -0,0 +1,15 @@
+from fastapi import Depends
+from .request_metrics import current_request_stats
+
+
+# Бюджет SQL-запросов эндпоинта, объявляется в декораторе роутера:
+#   @router.get("/path", dependencies=[query_budget(4)])
+# Зависимости декоратора выполняются раньше зависимостей параметров,
+# поэтому запросы get_current_user тоже входят в бюджет
+def query_budget(statements: int):
+    def declare_query_budget():
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.query_budget = statements
+
+    return Depends(declare_query_budget)
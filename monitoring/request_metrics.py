@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from .metrics import route_metrics, requests_in_flight, pool_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+# off — бюджеты не проверяются, log — предупреждение после запроса,
+# raise — QueryBudgetExceeded перед первым запросом сверх бюджета (dev/тесты)
+QUERY_BUDGET_MODES = ("off", "log", "raise")
+query_budget_mode = "off"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestStats:
+    __slots__ = (
+        "started", "wall_time", "sql_count",
+        "sql_time", "pool_wait", "response_bytes", "query_budget"
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.wall_time = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.pool_wait = 0.0
+        self.response_bytes = 0
+        self.query_budget = None
+
+    def over_budget(self, statements: int) -> bool:
+        return self.query_budget is not None and statements > self.query_budget
+
+    def server_timing(self) -> str:
+        elapsed = (time.perf_counter() - self.started) * 1000
+        return (
+            f'app;dur={elapsed:.1f}, '
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries", '
+            f'pool;dur={self.pool_wait * 1000:.1f}'
+        )
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+# scope запросов по задачам asyncio — контекстные переменные не видны из
+# других потоков, а детектору блокировок нужен маршрут текущей задачи
+request_scopes_by_task = {}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # Время внутри _do_get — ожидание свободного соединения в пуле
+    # (или открытие нового в пределах max_overflow)
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            pool_wait_seconds.observe(elapsed)
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.pool_wait += elapsed
+
+
+def install_sql_instrumentation(engine, budget_mode: str = "off"):
+    global query_budget_mode
+    if budget_mode not in QUERY_BUDGET_MODES:
+        raise ValueError(f"Unknown query budget mode: {budget_mode}")
+    query_budget_mode = budget_mode
+
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+        if query_budget_mode != "raise":
+            return
+        stats = current_request_stats.get()
+        if stats is not None and stats.over_budget(stats.sql_count + 1):
+            raise QueryBudgetExceeded(
+                f"Query budget of {stats.query_budget} statements exceeded by: {statement}"
+            )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request_stats.get()
+        started = getattr(context, "_metrics_started", None)
+        if stats is None or started is None:
+            return
+        stats.sql_count += 1
+        stats.sql_time += time.perf_counter() - started
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f'{scope.get("method", "")} {path}'
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        task = asyncio.current_task()
+        request_scopes_by_task[task] = scope
+        requests_in_flight.inc()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                if self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", stats.server_timing()
+                    )
+            elif message["type"] == "http.response.body":
+                stats.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            request_scopes_by_task.pop(task, None)
+            requests_in_flight.dec()
+            current_request_stats.reset(token)
+            stats.wall_time = time.perf_counter() - stats.started
+            route = route_template(scope)
+            route_metrics.observe(route, stats)
+            if query_budget_mode == "log" and stats.over_budget(stats.sql_count):
+                logger.warning(
+                    "%s: %d SQL statements, budget %d",
+                    route, stats.sql_count, stats.query_budget
+                )
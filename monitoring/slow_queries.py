@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from threading import Lock
+from sqlalchemy import event
+from .request_metrics import request_scopes_by_task, route_template
+
+logger = logging.getLogger(__name__)
+
+SAFE_PARAM_TYPES = (int, float, bool, type(None))
+
+
+def redact_parameters(parameters, executemany: bool = False):
+    if executemany:
+        return f"<executemany: {len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+
+# числа и флаги (limit/offset, оценки) оставляем, остальное — только тип
+def _redact(value):
+    if isinstance(value, SAFE_PARAM_TYPES):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _current_route():
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return None
+    scope = request_scopes_by_task.get(task) if task is not None else None
+    return route_template(scope) if scope else None
+
+
+# Журнал медленных запросов: последние max_recent записей и по одному
+# худшему плану на текст запроса (не больше max_plans). EXPLAIN ANALYZE
+# повторно выполняет запрос, поэтому он сэмплируется, выполняется только
+# для SELECT в read-only транзакции с statement_timeout и не более одного
+# одновременно
+class SlowQueryLog:
+    def __init__(
+            self,
+            threshold_ms: float = 200,
+            explain_sample_rate: float = 0.0,
+            explain_timeout_ms: int = 5000,
+            max_recent: int = 200,
+            max_plans: int = 20
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self.recent = deque(maxlen=max_recent)
+        self.max_plans = max_plans
+        self.plans = {}
+        self.slow_total = 0
+        self._lock = Lock()
+        self._engine = None
+        self._explaining = False
+
+    def install(self, engine):
+        self._engine = engine
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._slow_query_started = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "_slow_query_started", None)
+            if started is None:
+                return
+            duration = time.perf_counter() - started
+            if duration < self.threshold:
+                return
+            if conn.get_execution_options().get("slow_query_log") is False:
+                return
+            self._record(statement, parameters, executemany, duration)
+
+    def _record(self, statement, parameters, executemany, duration):
+        entry = {
+            "route": _current_route(),
+            "duration_ms": round(duration * 1000, 1),
+            "statement": statement,
+            "parameters": redact_parameters(parameters, executemany),
+            "recorded_at": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self.recent.append(entry)
+            self.slow_total += 1
+
+        logger.warning(
+            "Slow query %.1f ms in %s: %s parameters=%s",
+            entry["duration_ms"], entry["route"] or "<background>",
+            statement, entry["parameters"]
+        )
+
+        if (
+            executemany
+            or self._explaining
+            or random.random() >= self.explain_sample_rate
+            or statement.split(None, 1)[0].upper() not in ("SELECT", "WITH")
+        ):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._explaining = True
+        # пустой контекст: EXPLAIN не должен попадать в статистику
+        # и бюджет запроса, который его вызвал
+        loop.create_task(
+            self._explain(entry, statement, parameters),
+            context=contextvars.Context()
+        )
+
+    async def _explain(self, entry, statement, parameters):
+        try:
+            async with self._engine.connect() as conn:
+                conn = await conn.execution_options(
+                    postgresql_readonly=True, slow_query_log=False
+                )
+                # транзакция откатывается при закрытии соединения
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in result)
+        except Exception as e:
+            logger.info("EXPLAIN for slow query failed: %s", e)
+            return
+        finally:
+            self._explaining = False
+
+        with self._lock:
+            known = self.plans.get(statement)
+            if known is None or known["duration_ms"] < entry["duration_ms"]:
+                self.plans[statement] = {**entry, "plan": plan}
+            if len(self.plans) > self.max_plans:
+                fastest = min(self.plans, key=lambda key: self.plans[key]["duration_ms"])
+                del self.plans[fastest]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "explain_sample_rate": self.explain_sample_rate,
+                "slow_total": self.slow_total,
+                "worst_plans": sorted(
+                    self.plans.values(), key=lambda plan: plan["duration_ms"], reverse=True
+                ),
+                "recent": list(reversed(self.recent))
+            }
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,147 @@
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+# Многопроцессный запуск с pre-fork: мастер один раз загружает модель
+# проверки мата и прогревает кеш скомпилированных SQL-запросов, затем
+# форкает воркеры. Страницы с этим состоянием остаются общими (copy-on-write),
+# а uvicorn --workers запускает воркеры через spawn, и каждый грузит всё сам
+
+# воркер, упавший быстрее этого, перезапускается с паузой
+MIN_WORKER_LIFETIME = 5.0
+WARMUP_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+async def _warm_compiled_queries():
+    # прогоняем публичные запросы на чтение — SQLAlchemy кладёт их
+    # скомпилированный SQL в кеш движка, который наследуют воркеры
+    from database import AsyncSessionLocal, engine
+    from service import discipline_service, review_discipline_service, teacher_service, admin_service
+
+    calls = [
+        lambda db: discipline_service.get_disciplines(db),
+        lambda db: teacher_service.get_teachers(db),
+        lambda db: admin_service.get_modules(db),
+    ]
+    for sort_by in ("rating", "reviews", "latest"):
+        for sort_order in ("asc", "desc"):
+            for with_total in (True, False):
+                calls.append(lambda db, s=sort_by, o=sort_order, t=with_total: (
+                    discipline_service.search_disciplines(db, 1, 20, sort_by=s, sort_order=o, with_total=t)
+                ))
+    for sort_by in ("date", "likes"):
+        for discipline_id in (None, WARMUP_UUID):
+            calls.append(lambda db, s=sort_by, d=discipline_id: (
+                review_discipline_service.get_all_reviews(db, discipline_id=d, sort_by=s)
+            ))
+
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            for call in calls:
+                await call(db)
+        logger.info(
+            "Compiled %d queries in %.2fs", len(engine.sync_engine._compiled_cache),
+            time.perf_counter() - started
+        )
+    except Exception:
+        logger.warning("Query warm-up failed, workers will compile on demand", exc_info=True)
+    finally:
+        # соединения asyncpg нельзя делить между процессами
+        await engine.dispose()
+
+
+def warm_up():
+    from service.swear_model import get_swear_checker
+
+    get_swear_checker()
+    if os.getenv("PREFORK_WARM_QUERIES", "True").lower() == "true":
+        asyncio.run(_warm_compiled_queries())
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve_prefork(app, host: str, port: int, workers: int, log_level: str = "info"):
+    logging.basicConfig(level=log_level.upper())
+    started = time.perf_counter()
+    warm_up()
+    logger.info("Master warm-up took %.2fs", time.perf_counter() - started)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # всё загруженное уходит в постоянное поколение: сборщик мусора воркеров
+    # не обходит эти объекты и не пачкает их страницы
+    gc.collect()
+    gc.freeze()
+
+    # pid -> (номер воркера, время старта); перезапущенный воркер получает
+    # прежний номер — по нему /metrics различает серии воркеров
+    children: dict[int, tuple[int, float]] = {}
+    stopping = False
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            os.environ["APP_WORKER_ID"] = str(slot)
+            try:
+                _run_worker(app, sock, log_level)
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (slot, time.monotonic())
+        logger.info("Started worker %d (pid %d)", slot, pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("Listening on http://%s:%d with %d pre-forked workers", host, port, workers)
+    for slot in range(workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in children:
+            continue
+        slot, started_at = children.pop(pid)
+        if stopping:
+            continue
+        logger.warning(
+            "Worker %d (pid %d) exited with status %d, restarting",
+            slot, pid, os.waitstatus_to_exitcode(status)
+        )
+        if time.monotonic() - started_at < MIN_WORKER_LIFETIME:
+            time.sleep(1)
+        spawn(slot)
+
+    sock.close()
@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.exc import DBAPIError
+from database import AsyncSessionLocal, engine
+from models import ReviewDiscipline, ReviewStatusEnum
+from service import moderation_policy, swear_cache
+from service.review_discipline_service import predict_offensive_scores
+from service.swear_model import get_swear_checker
+
+logger = logging.getLogger("rescore_reviews")
+
+# Пересчёт offensive_score и статусов отзывов после обновления check-swear
+# или смены политики модерации. По умолчанию берутся только отзывы, у
+# которых policy_version отличается от текущей политики (--all — все):
+#
+#   python rescore_reviews.py --dry-run             # только отчёт о переходах
+#   python rescore_reviews.py --workers 4 --max-rate 2000
+#
+# Отзывы читаются пачками по id (keyset, без OFFSET), модель считает пачку
+# в пуле процессов, пока читается следующая, изменённые строки пишутся
+# одним executemany в короткой транзакции. После каждой пачки в файл
+# контрольной точки пишется последний id — повторный запуск продолжит с него
+
+CHECKPOINT = Path(".rescore_checkpoint.json")
+
+_select_batch = (
+    select(
+        ReviewDiscipline.id, ReviewDiscipline.comment,
+        ReviewDiscipline.offensive_score, ReviewDiscipline.status,
+        ReviewDiscipline.policy_version, ReviewDiscipline.status_by_moderator,
+        ReviewDiscipline.duplicate_of_id
+    )
+    .order_by(ReviewDiscipline.id)
+)
+
+# комментарий и статус в условии: если автор успел отредактировать отзыв
+# или модератор — сменить статус, пересчёт по прочитанной строке их не перезапишет
+_update_batch = (
+    update(ReviewDiscipline.__table__)
+    .where(
+        ReviewDiscipline.__table__.c.id == bindparam("review_id"),
+        ReviewDiscipline.__table__.c.comment.is_not_distinct_from(bindparam("old_comment")),
+        ReviewDiscipline.__table__.c.status.is_not_distinct_from(bindparam("old_status"))
+    )
+    .values(
+        offensive_score=bindparam("new_score"), status=bindparam("new_status"),
+        policy_version=bindparam("new_policy_version")
+    )
+)
+
+
+def _init_worker(policy: moderation_policy.Policy):
+    # при fork модель уже загружена в родителе, при spawn — грузится здесь;
+    # политика передаётся явно, чтобы воркеры не читали её из БД сами
+    moderation_policy.set_current(policy)
+    # у воркеров нет сессии для store_persistent: без этого оценки копились
+    # бы в swear_cache._unsaved до конца пересчёта
+    swear_cache.PERSISTENT = False
+    get_swear_checker()
+
+
+def _score(comments: list) -> list:
+    # пустой комментарий в create_review получает 0.0 без модели
+    texts = [comment for comment in comments if comment]
+    scores = iter(predict_offensive_scores(texts, moderation_policy.current()) if texts else [])
+    return [next(scores) if comment else 0.0 for comment in comments]
+
+
+def _chunks(items: list, parts: int) -> list:
+    size = max(1, -(-len(items) // parts))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+class Checkpoint:
+    def __init__(self, path: Path, enabled: bool, policy_version: str):
+        self.path = path
+        self.enabled = enabled
+        self.state = {
+            "policy_version": policy_version, "last_id": None,
+            "scanned": 0, "updated": 0, "transitions": {},
+        }
+
+    def load(self):
+        if not self.path.exists():
+            return
+        state = json.loads(self.path.read_text(encoding="utf-8"))
+        if state.get("policy_version") != self.state["policy_version"]:
+            logger.warning(
+                "Checkpoint was written for policy %s, current is %s — starting over",
+                state.get("policy_version"), self.state["policy_version"]
+            )
+            return
+        self.state = state
+        logger.info("Resuming after id %s (%d reviews scanned)", state["last_id"], state["scanned"])
+
+    def save(self):
+        if self.enabled:
+            self.path.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+
+    def finish(self):
+        if self.enabled and self.path.exists():
+            self.path.unlink()
+
+
+def _stale_filter(query, stale_version):
+    if stale_version is None:
+        return query
+    return query.where(ReviewDiscipline.policy_version.is_distinct_from(stale_version))
+
+
+async def fetch_batch(last_id, batch_size: int, stale_version) -> list:
+    query = _stale_filter(_select_batch.limit(batch_size), stale_version)
+    if last_id is not None:
+        query = query.where(ReviewDiscipline.id > last_id)
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(query)).all()
+
+
+async def write_batch(changes: list, lock_timeout_ms: int, retries: int = 3):
+    for attempt in range(1, retries + 1):
+        try:
+            async with AsyncSessionLocal() as db:
+                # под блокировкой живой записи пачка ждёт недолго и повторяется
+                await db.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+                await db.execute(_update_batch, changes)
+                await db.commit()
+                return
+        except DBAPIError:
+            if attempt == retries:
+                raise
+            logger.warning("Batch update failed (attempt %d), retrying", attempt, exc_info=True)
+            await asyncio.sleep(attempt)
+
+
+async def count_remaining(last_id, stale_version) -> int:
+    query = _stale_filter(select(func.count()).select_from(ReviewDiscipline), stale_version)
+    if last_id is not None:
+        query = query.where(ReviewDiscipline.id > last_id)
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(query)).scalar_one()
+
+
+async def rescore(args):
+    async with AsyncSessionLocal() as db:
+        await moderation_policy.refresh(db)
+    policy = moderation_policy.current()
+    stale_version = None if args.all else policy.version
+
+    checkpoint = Checkpoint(Path(args.checkpoint), enabled=not args.dry_run, policy_version=policy.version)
+    if not args.restart:
+        checkpoint.load()
+    state = checkpoint.state
+    transitions = Counter(state["transitions"])
+
+    total = await count_remaining(state["last_id"], stale_version)
+    logger.info(
+        "Policy %s (%s, model %s), %d reviews to scan%s", policy.version, policy.revision,
+        policy.model_version, total, " (dry run)" if args.dry_run else ""
+    )
+
+    # модель грузится до создания пула: при fork воркеры получат её готовой
+    get_swear_checker()
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    scanned_now = 0
+
+    with ProcessPoolExecutor(args.workers, mp_context=context, initializer=_init_worker, initargs=(policy,)) as pool:
+        batch = await fetch_batch(state["last_id"], args.batch_size, stale_version)
+        while batch:
+            batch_started = time.monotonic()
+            comments = [row.comment for row in batch]
+            scoring = [
+                loop.run_in_executor(pool, _score, chunk)
+                for chunk in _chunks(comments, args.workers)
+            ]
+            # следующая пачка читается, пока модель считает текущую
+            next_batch = asyncio.create_task(fetch_batch(batch[-1].id, args.batch_size, stale_version))
+            scores = [score for chunk in await asyncio.gather(*scoring) for score in chunk]
+
+            changes = []
+            for row, score in zip(batch, scores):
+                status = policy.status(score)
+                if row.status_by_moderator and not args.override_manual:
+                    status = row.status
+                elif (
+                        row.duplicate_of_id and row.status == ReviewStatusEnum.pending
+                        and status == ReviewStatusEnum.published
+                ):
+                    # отзыв придержан как почти дубликат (NEAR_DUPLICATE_ACTION=hold)
+                    status = row.status
+                if status != row.status:
+                    transitions[f"{row.status.value}->{status.value}"] += 1
+                if (
+                        status != row.status or row.policy_version != policy.version
+                        or abs(score - row.offensive_score) >= args.min_delta
+                ):
+                    changes.append({
+                        "review_id": row.id, "old_comment": row.comment, "old_status": row.status,
+                        "new_score": score, "new_status": status,
+                        "new_policy_version": policy.version,
+                    })
+
+            if changes and not args.dry_run:
+                await write_batch(changes, args.lock_timeout)
+            state["updated"] += len(changes)
+
+            state["scanned"] += len(batch)
+            state["last_id"] = str(batch[-1].id)
+            state["transitions"] = dict(transitions)
+            checkpoint.save()
+            scanned_now += len(batch)
+
+            elapsed = time.monotonic() - started
+            rate = scanned_now / elapsed if elapsed else 0
+            logger.info(
+                "%d/%d scanned, %d %s, %.0f reviews/s, ETA %.0fs",
+                scanned_now, total, state["updated"],
+                "would change" if args.dry_run else "updated",
+                rate, (total - scanned_now) / rate if rate else 0
+            )
+
+            # троттлинг: не быстрее --max-rate строк в секунду и пауза между пачками
+            if args.max_rate:
+                await asyncio.sleep(max(0.0, len(batch) / args.max_rate - (time.monotonic() - batch_started)))
+            if args.pause:
+                await asyncio.sleep(args.pause)
+            batch = await next_batch
+
+    await engine.dispose()
+    checkpoint.finish()
+    logger.info(
+        "Done: %d scanned, %d %s", state["scanned"], state["updated"],
+        "would change" if args.dry_run else "updated"
+    )
+    for transition, count in sorted(transitions.items(), key=lambda item: -item[1]):
+        logger.info("  %s: %d", transition, count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score reviews with the current swear model and thresholds")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    parser.add_argument("--all", action="store_true", help="scan every review, not only stale policy versions")
+    parser.add_argument("--max-rate", type=float, default=0, help="reviews per second, 0 — unlimited")
+    parser.add_argument("--pause", type=float, default=0, help="seconds to sleep between batches")
+    parser.add_argument("--lock-timeout", type=int, default=2000, help="ms to wait for row locks")
+    parser.add_argument("--min-delta", type=float, default=0.0001, help="smallest score change worth writing")
+    parser.add_argument(
+        "--override-manual", action="store_true",
+        help="re-derive statuses set by a moderator as well (they are kept by default)"
+    )
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT))
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(rescore(args))
+
+
+if __name__ == "__main__":
+    main()
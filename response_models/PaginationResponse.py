@@ -1,14 +1,15 @@
-from typing import Generic, TypeVar, List
+from typing import Generic, TypeVar, List, Optional
 from pydantic import BaseModel, Field
 
 T = TypeVar("T")
 
 
 class Pagination(BaseModel):
-    total: int = Field(...)
-    total_pages: int = Field(...)
+    total: Optional[int] = Field(None)
+    total_pages: Optional[int] = Field(None)
     page: int = Field(..., ge=1)
     size: int = Field(..., ge=1)
+    has_next: bool = Field(False)
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
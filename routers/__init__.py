@@ -3,6 +3,7 @@ from .admin import admin
 from .discipline import discipline
 from .teacher import teacher
 from .review_discipline import review_discipline
+from .metrics import metrics
 
 routes = [
     user.user_router,
@@ -11,3 +12,6 @@ routes = [
     teacher.teacher_router,
     review_discipline.review_router
 ]
+
+# /metrics отдаётся без префикса /api — путь, который ожидает Prometheus
+metrics_router = metrics.metrics_router
@@ -4,16 +4,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from response_models import UserResponse, ModuleResponse, PaginatedResponse
 from models import User
 from database import get_db
+from monitoring import query_budget
+from service.admission import admission
 from service import admin_service, user_service
 from .admin_scheme import (
     AddAdminModel, AddModuleModel, UpdateModuleModel,
-    DeleteModuleModel
+    DeleteModuleModel, ModerationPolicyModel
 )
 
 admin_router = APIRouter(prefix="/admin", tags=["admins"])
 
 
-@admin_router.patch("/add", response_model=UserResponse)
+@admin_router.patch("/add", response_model=UserResponse, dependencies=[query_budget(6)])
 async def appoint_admin(
     data: AddAdminModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -25,7 +27,7 @@ async def appoint_admin(
     return updated_user
 
 
-@admin_router.patch("/remove", response_model=UserResponse)
+@admin_router.patch("/remove", response_model=UserResponse, dependencies=[query_budget(6)])
 async def remove_admin(
     data: AddAdminModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -37,22 +39,27 @@ async def remove_admin(
     return updated_user
 
 
-@admin_router.get("/admins", response_model=PaginatedResponse[UserResponse])
+@admin_router.get(
+    "/admins",
+    response_model=PaginatedResponse[UserResponse],
+    dependencies=[query_budget(4), admission("heavy", limit=2)]
+)
 async def get_all_admins(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None, description="Поиск по имени или фамилии или отчеству"),
     sort_field: str = Query("surname", description="Поле для сортировки (surname, first_name)"),
     sort_order: str = Query("asc", description="Порядок сортировки (asc/desc)"),
+    with_total: bool = Query(True, description="Считать общее количество (false — только has_next)"),
     db: AsyncSession = Depends(get_db)
 ):
     return await admin_service.get_admins(
         db, page, size, search,
-        sort_field, sort_order
+        sort_field, sort_order, with_total
     )
 
 
-@admin_router.post("/module/add", response_model=ModuleResponse)
+@admin_router.post("/module/add", response_model=ModuleResponse, dependencies=[query_budget(5)])
 async def add_module(
     data: AddModuleModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -62,7 +69,11 @@ async def add_module(
     return module
 
 
-@admin_router.patch("/module/update", response_model=ModuleResponse)
+@admin_router.patch(
+    "/module/update",
+    response_model=ModuleResponse,
+    dependencies=[query_budget(6)]
+)
 async def update_module(
     data: UpdateModuleModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -77,7 +88,7 @@ async def update_module(
     return updated_module
 
 
-@admin_router.delete("/module/delete")
+@admin_router.delete("/module/delete", dependencies=[query_budget(6)])
 async def delete_module(
     data: DeleteModuleModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -91,7 +102,71 @@ async def delete_module(
     return result
 
 
-@admin_router.get("/public/modules/get", response_model=List[ModuleResponse])
+@admin_router.get(
+    "/public/modules/get",
+    response_model=List[ModuleResponse],
+    dependencies=[query_budget(1), admission("critical")]
+)
 async def get_modules(db: AsyncSession = Depends(get_db)):
     module = await admin_service.get_modules(db)
     return module
+
+
+@admin_router.get("/metrics/routes", dependencies=[query_budget(2), admission("critical")])
+async def get_route_metrics(
+    current_user: User = Depends(user_service.get_current_user)
+):
+    return await admin_service.get_route_metrics(current_user)
+
+
+@admin_router.get("/metrics/event-loop/blocks", dependencies=[query_budget(2), admission("critical")])
+async def get_event_loop_blocks(
+    current_user: User = Depends(user_service.get_current_user)
+):
+    return await admin_service.get_event_loop_blocks(current_user)
+
+
+@admin_router.get("/metrics/slow-queries", dependencies=[query_budget(2), admission("critical")])
+async def get_slow_queries(
+    current_user: User = Depends(user_service.get_current_user)
+):
+    return await admin_service.get_slow_queries(current_user)
+
+
+@admin_router.get("/metrics/swear-prefilter", dependencies=[query_budget(2), admission("critical")])
+async def get_swear_prefilter_stats(
+    current_user: User = Depends(user_service.get_current_user)
+):
+    return await admin_service.get_swear_prefilter_stats(current_user)
+
+
+@admin_router.get("/moderation-policy", dependencies=[query_budget(3)])
+async def get_moderation_policy(
+    current_user: User = Depends(user_service.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await admin_service.get_moderation_policy(current_user, db)
+
+
+@admin_router.put("/moderation-policy", dependencies=[query_budget(3)])
+async def update_moderation_policy(
+    data: ModerationPolicyModel,
+    current_user: User = Depends(user_service.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await admin_service.update_moderation_policy(data.model_dump(), current_user, db)
+
+
+@admin_router.get("/profile", dependencies=[query_budget(2)])
+async def profile_process(
+    current_user: User = Depends(user_service.get_current_user),
+    db: AsyncSession = Depends(get_db),
+    seconds: float = Query(10, gt=0, le=60, description="Длительность (или таймаут для requests)"),
+    interval_ms: int = Query(10, ge=1, le=100, description="Интервал сэмплирования, мс"),
+    route: Optional[str] = Query(None, description="Профилировать только запросы маршрута, шаблон целиком, например 'GET /api/reviews'"),
+    requests: Optional[int] = Query(None, ge=1, le=1000, description="Остановиться после K запросов маршрута"),
+    format: str = Query("collapsed", description="Формат (collapsed, speedscope)")
+):
+    return await admin_service.profile_process(
+        db, current_user, seconds, interval_ms, route, requests, format
+    )
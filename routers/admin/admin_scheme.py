@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import BaseModel, Field
 
 
@@ -20,3 +21,10 @@ class DeleteModuleModel(ModuleBaseModel):
 class UpdateModuleModel(ModuleBaseModel):
     id: str = Field(..., description="module_id")
     new_name: str = Field(...)
+
+
+class ModerationPolicyModel(BaseModel):
+    pending_threshold: float = Field(..., ge=0, le=1)
+    rejected_threshold: float = Field(..., ge=0, le=1)
+    prefilter_mode: Literal["on", "shadow", "off"] = Field("shadow")
+    prefilter_obscene_score: float = Field(0.95, ge=0, le=1)
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from service import discipline_service
 from models import User, DisciplineFormatEnum
 from database import get_db
+from monitoring import query_budget
+from service.admission import admission
 from response_models import DisciplineResponse, PaginatedResponse
 from .discipline_scheme import (
     CreateDisciplineModel, UpdateDisciplineModel,
@@ -15,7 +17,11 @@ from service import user_service
 discipline_router = APIRouter(prefix="/disciplines", tags=["disciplines"])
 
 
-@discipline_router.post("/admin/discipline/create", response_model=DisciplineResponse)
+@discipline_router.post(
+    "/admin/discipline/create",
+    response_model=DisciplineResponse,
+    dependencies=[query_budget(10)]
+)
 async def create_discipline(
         data: CreateDisciplineModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -29,7 +35,11 @@ async def create_discipline(
     return discipline
 
 
-@discipline_router.patch("/admin/discipline/update", response_model=DisciplineResponse)
+@discipline_router.patch(
+    "/admin/discipline/update",
+    response_model=DisciplineResponse,
+    dependencies=[query_budget(10)]
+)
 async def update_discipline(
         data: UpdateDisciplineModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -43,7 +53,7 @@ async def update_discipline(
     return discipline
 
 
-@discipline_router.delete("/admin/discipline/delete")
+@discipline_router.delete("/admin/discipline/delete", dependencies=[query_budget(15)])
 async def delete_discipline(
     data: DeleteDisciplineModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -53,7 +63,11 @@ async def delete_discipline(
     return result
 
 
-@discipline_router.get("/get", response_model=List[DisciplineResponse])
+@discipline_router.get(
+    "/get",
+    response_model=List[DisciplineResponse],
+    dependencies=[query_budget(3), admission("heavy", limit=8)]
+)
 async def get_disciplines(
         db: AsyncSession = Depends(get_db),
         current_user: Optional[User] = Depends(user_service.get_current_user_optional)
@@ -61,7 +75,11 @@ async def get_disciplines(
     return await discipline_service.get_disciplines(db, current_user)
 
 
-@discipline_router.get("/search", response_model=PaginatedResponse[DisciplineResponse])
+@discipline_router.get(
+    "/search",
+    response_model=PaginatedResponse[DisciplineResponse],
+    dependencies=[query_budget(4), admission("heavy", limit=8)]
+)
 async def search_disciplines(
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
@@ -86,16 +104,24 @@ async def search_disciplines(
         SortOrder.desc,
         description="Порядок сортировки"
     ),
+    with_total: bool = Query(
+        True,
+        description="Считать общее количество (false — только has_next)"
+    ),
     current_user: Optional[User] = Depends(user_service.get_current_user_optional)
 ):
     return await discipline_service.search_disciplines(
         db, page, size, name_search, module_search,
         format_filter.value if format_filter else None,
-        sort_by.value, sort_order.value, current_user
+        sort_by.value, sort_order.value, current_user, with_total
     )
 
 
-@discipline_router.get("/discipline/{id}", response_model=DisciplineResponse)
+@discipline_router.get(
+    "/discipline/{id}",
+    response_model=DisciplineResponse,
+    dependencies=[query_budget(6)]
+)
 async def get_discipline(
         id,
         db: AsyncSession = Depends(get_db),
@@ -104,7 +130,11 @@ async def get_discipline(
     return await discipline_service.get_discipline(db, id, current_user)
 
 
-@discipline_router.post("/favorite/add", response_model=DisciplineResponse)
+@discipline_router.post(
+    "/favorite/add",
+    response_model=DisciplineResponse,
+    dependencies=[query_budget(10)]
+)
 async def add_favorite(
     data: AddFavorite,
     current_user: User = Depends(user_service.get_current_user),
@@ -115,7 +145,11 @@ async def add_favorite(
     )
 
 
-@discipline_router.delete("/favorite/remove", response_model=DisciplineResponse)
+@discipline_router.delete(
+    "/favorite/remove",
+    response_model=DisciplineResponse,
+    dependencies=[query_budget(10)]
+)
 async def remove_from_favorites(
     data: AddFavorite,
     current_user: User = Depends(user_service.get_current_user),
@@ -126,7 +160,8 @@ async def remove_from_favorites(
 
 @discipline_router.get(
     "/favorite/my",
-    response_model=PaginatedResponse[DisciplineResponse]
+    response_model=PaginatedResponse[DisciplineResponse],
+    dependencies=[query_budget(4)]
 )
 async def get_my_favorites(
         db: AsyncSession = Depends(get_db),
@@ -138,10 +173,11 @@ async def get_my_favorites(
         format_filter: Optional[DisciplineFormatEnum] = Query(None),
         sort_by: SortBy = Query(SortBy.rating),
         sort_order: SortOrder = Query(SortOrder.desc),
+        with_total: bool = Query(True),
 ):
     return await discipline_service.get_user_favorites(
         db, str(current_user["id"]), page, size,
         name_search, module_search,
         format_filter.value if format_filter else None,
-        sort_by.value, sort_order.value
+        sort_by.value, sort_order.value, with_total
     )
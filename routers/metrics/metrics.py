@@ -0,0 +1,34 @@
+import os
+import secrets
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from database import engine
+from monitoring.prometheus import render_metrics
+from service.admission import admission
+
+load_dotenv()
+
+# Prometheus передаёт заголовок Authorization: Bearer <token>. Метрики
+# раскрывают трафик маршрутов, пул и счётчики модерации, поэтому без токена
+# /metrics открыт только при ENV=development, иначе отвечает 404
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_OPEN = not METRICS_TOKEN and os.getenv("ENV") == "development"
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False, dependencies=[admission("critical")])
+async def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    if not METRICS_TOKEN and not METRICS_OPEN:
+        raise HTTPException(404, "Not Found")
+    if METRICS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {METRICS_TOKEN}"
+    ):
+        raise HTTPException(401, "Invalid metrics token")
+
+    return PlainTextResponse(
+        render_metrics(engine.sync_engine),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -2,9 +2,12 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from service import review_discipline_service, user_service
+from service.rate_limit import rate_limit
 from models import User
 from models.ReviewDiscipline import ReviewStatusEnum
 from database import get_db
+from monitoring import query_budget
+from service.admission import admission
 from .review_discipline_scheme import (
     CreateReviewModel, UpdateReviewStatus, AddVoteModel,
     DeleteReviewModel, EditReviewModel, CreateComplaintModel,
@@ -16,7 +19,11 @@ from response_models import ReviewResponse, PaginatedResponse
 review_router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 
-@review_router.post("/add", response_model=ReviewResponse)
+@review_router.post(
+    "/add",
+    response_model=ReviewResponse,
+    dependencies=[query_budget(14), rate_limit("review_add")]
+)
 async def create_review(
     data: CreateReviewModel,
     db: AsyncSession = Depends(get_db),
@@ -29,7 +36,11 @@ async def create_review(
     return review
 
 
-@review_router.patch("/review/edit", response_model=ReviewResponse)
+@review_router.patch(
+    "/review/edit",
+    response_model=ReviewResponse,
+    dependencies=[query_budget(13)]
+)
 async def edit_review(
     data: EditReviewModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -41,7 +52,7 @@ async def edit_review(
     )
 
 
-@review_router.delete("/review/delete")
+@review_router.delete("/review/delete", dependencies=[query_budget(8)])
 async def delete_review(
     data: DeleteReviewModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -52,7 +63,11 @@ async def delete_review(
     )
 
 
-@review_router.get("", response_model=PaginatedResponse[ReviewResponse])
+@review_router.get(
+    "",
+    response_model=PaginatedResponse[ReviewResponse],
+    dependencies=[query_budget(4), admission("heavy", limit=8)]
+)
 async def get_reviews(
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(user_service.get_current_user_optional),
@@ -61,17 +76,19 @@ async def get_reviews(
     page: int = Query(1, ge=1),
     page_size: int = Query(40, ge=1, le=100),
     sort_by: str = Query("date", description="Сортировка по (date, likes)"),
-    sort_order: str = Query("desc", description="Порядок сортировки (asc, desc)")
+    sort_order: str = Query("desc", description="Порядок сортировки (asc, desc)"),
+    with_total: bool = Query(True, description="Считать общее количество (false — только has_next)")
 ):
     return await review_discipline_service.get_all_reviews(
         db, current_user, discipline_id, teacher_id, page,
-        page_size, sort_by, sort_order
+        page_size, sort_by, sort_order, with_total
     )
 
 
 @review_router.get(
     "/review/admin/moderation",
-    response_model=PaginatedResponse[ReviewResponse]
+    response_model=PaginatedResponse[ReviewResponse],
+    dependencies=[query_budget(4), admission("heavy", limit=2)]
 )
 async def get_moderation_reviews(
     db: AsyncSession = Depends(get_db),
@@ -82,15 +99,20 @@ async def get_moderation_reviews(
     discipline_id: Optional[str] = Query(None),
     teacher_id: Optional[str] = Query(None),
     sort_by: str = Query("date", description="Сортировка по (date, likes)"),
-    sort_order: str = Query("desc", description="Порядок сортировки (asc/desc)")
+    sort_order: str = Query("desc", description="Порядок сортировки (asc/desc)"),
+    with_total: bool = Query(True, description="Считать общее количество (false — только has_next)")
 ):
     return await review_discipline_service.get_reviews_by_status(
         db, current_user, status, page, page_size,
-        discipline_id, teacher_id, sort_by, sort_order
+        discipline_id, teacher_id, sort_by, sort_order, with_total
     )
 
 
-@review_router.patch("/review/admin/status/edit", response_model=ReviewResponse)
+@review_router.patch(
+    "/review/admin/status/edit",
+    response_model=ReviewResponse,
+    dependencies=[query_budget(9)]
+)
 async def change_review_status(
     data: UpdateReviewStatus,
     db: AsyncSession = Depends(get_db),
@@ -101,7 +123,11 @@ async def change_review_status(
     )
 
 
-@review_router.post("/review/vote", response_model=ReviewResponse)
+@review_router.post(
+    "/review/vote",
+    response_model=ReviewResponse,
+    dependencies=[query_budget(9), rate_limit("vote")]
+)
 async def add_vote(
         data: AddVoteModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -112,7 +138,11 @@ async def add_vote(
     )
 
 
-@review_router.get("/my", response_model=PaginatedResponse[ReviewResponse])
+@review_router.get(
+    "/my",
+    response_model=PaginatedResponse[ReviewResponse],
+    dependencies=[query_budget(4)]
+)
 async def get_my_reviews(
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(user_service.get_current_user),
@@ -121,15 +151,20 @@ async def get_my_reviews(
         page: int = Query(1, ge=1),
         page_size: int = Query(40, ge=1, le=100),
         sort_by: str = Query("date", description="Поле сортировки (date, likes)"),
-        sort_order: str = Query("desc", description="Порядок сортировки (asc/desc)")
+        sort_order: str = Query("desc", description="Порядок сортировки (asc/desc)"),
+        with_total: bool = Query(True, description="Считать общее количество (false — только has_next)")
 ):
     return await review_discipline_service.get_my_reviews(
         db, current_user, discipline_id, teacher_id,
-        page, page_size, sort_by, sort_order
+        page, page_size, sort_by, sort_order, with_total
     )
 
 
-@review_router.post("/review/complaint/add", status_code=201)
+@review_router.post(
+    "/review/complaint/add",
+    status_code=201,
+    dependencies=[query_budget(5), rate_limit("complaint")]
+)
 async def add_complaint(
     data: CreateComplaintModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -142,7 +177,8 @@ async def add_complaint(
 
 @review_router.get(
     "/admin/complaints/get",
-    response_model=PaginatedResponse[ReviewResponse]
+    response_model=PaginatedResponse[ReviewResponse],
+    dependencies=[query_budget(4), admission("heavy", limit=2)]
 )
 async def get_complaints(
     current_user: User = Depends(user_service.get_current_user),
@@ -152,15 +188,20 @@ async def get_complaints(
     page: int = Query(1, ge=1),
     page_size: int = Query(40, ge=1, le=100),
     sort_by: str = Query("date", description="Сортировка по (date, likes)"),
-    sort_order: str = Query("desc", description="Порядок сортировки (asc, desc)")
+    sort_order: str = Query("desc", description="Порядок сортировки (asc, desc)"),
+    with_total: bool = Query(True, description="Считать общее количество (false — только has_next)")
 ):
     return await review_discipline_service.get_pending_complaints(
         db, current_user, discipline_id, teacher_id,
-        page, page_size, sort_by, sort_order
+        page, page_size, sort_by, sort_order, with_total
     )
 
 
-@review_router.post("/admin/complaints/complaint/review/resolve", status_code=201)
+@review_router.post(
+    "/admin/complaints/complaint/review/resolve",
+    status_code=201,
+    dependencies=[query_budget(9)]
+)
 async def resolve_complaint(
     data: ResolveComplaintModel,
     current_user: User = Depends(user_service.get_current_user),
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from service import teacher_service
 from models import User
 from database import get_db
+from monitoring import query_budget
+from service.admission import admission
 from service import user_service
 from response_models import TeacherResponse, PaginatedResponse
 from .teacher_scheme import (
@@ -14,7 +16,11 @@ from .teacher_scheme import (
 teacher_router = APIRouter(prefix="/teachers", tags=["teachers"])
 
 
-@teacher_router.post("/admin/teacher/create", response_model=TeacherResponse)
+@teacher_router.post(
+    "/admin/teacher/create",
+    response_model=TeacherResponse,
+    dependencies=[query_budget(6)]
+)
 async def create_teacher(
         data: CreateTeacherModel,
         current_user: dict = Depends(user_service.get_current_user),
@@ -27,7 +33,11 @@ async def create_teacher(
     return teacher
 
 
-@teacher_router.patch("/admin/teacher/update", response_model=TeacherResponse)
+@teacher_router.patch(
+    "/admin/teacher/update",
+    response_model=TeacherResponse,
+    dependencies=[query_budget(7)]
+)
 async def update_teacher(
         data: UpdateTeacherModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -40,7 +50,7 @@ async def update_teacher(
     return updated_teacher
 
 
-@teacher_router.delete("/admin/teacher/delete")
+@teacher_router.delete("/admin/teacher/delete", dependencies=[query_budget(8)])
 async def delete_teacher(
         data: DeleteTeacherModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -50,7 +60,11 @@ async def delete_teacher(
     return result
 
 
-@teacher_router.get("/get", response_model=PaginatedResponse[TeacherResponse])
+@teacher_router.get(
+    "/get",
+    response_model=PaginatedResponse[TeacherResponse],
+    dependencies=[query_budget(3), admission("heavy", limit=8)]
+)
 async def get_teachers(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
@@ -60,17 +74,22 @@ async def get_teachers(
         description="Поле для сортировки (surname, first_name)"
     ),
     sort_order: str = Query("asc"),
+    with_total: bool = Query(
+        True,
+        description="Считать общее количество (false — только has_next)"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     return await teacher_service.get_teachers(
         db, page, size, name_search,
-        sort_field, sort_order
+        sort_field, sort_order, with_total
     )
 
 
 @teacher_router.get(
     "/discipline/{id}/get-by-discipline",
-    response_model=PaginatedResponse[TeacherResponse]
+    response_model=PaginatedResponse[TeacherResponse],
+    dependencies=[query_budget(4)]
 )
 async def get_teachers_by_discipline(
     id: str,
@@ -79,16 +98,24 @@ async def get_teachers_by_discipline(
     name_search: Optional[str] = Query(None),
     sort_field: str = Query("surname", description="Поле для сортировки"),
     sort_order: str = Query("asc", description="Порядок сортировки"),
+    with_total: bool = Query(
+        True,
+        description="Считать общее количество (false — только has_next)"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     return await teacher_service.get_teachers_by_discipline(
         db=db, discipline_id=id, page=page, size=size,
         name_search=name_search, sort_field=sort_field,
-        sort_order=sort_order
+        sort_order=sort_order, with_total=with_total
     )
 
 
-@teacher_router.post("/admin/teacher/discipline/appoint", response_model=TeacherResponse)
+@teacher_router.post(
+    "/admin/teacher/discipline/appoint",
+    response_model=TeacherResponse,
+    dependencies=[query_budget(8)]
+)
 async def appoint_teacher_discipline(
         data: AppointTeacherDisciplines,
         current_user: User = Depends(user_service.get_current_user),
@@ -101,7 +128,11 @@ async def appoint_teacher_discipline(
     return teacher
 
 
-@teacher_router.delete("/admin/teacher/discipline/remove", response_model=TeacherResponse)
+@teacher_router.delete(
+    "/admin/teacher/discipline/remove",
+    response_model=TeacherResponse,
+    dependencies=[query_budget(7)]
+)
 async def remove_teacher_discipline(
         data: RemoveTeacherDiscipline,
         current_user: User = Depends(user_service.get_current_user),
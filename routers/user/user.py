@@ -7,7 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 from models import User
 from database import get_db
+from monitoring import query_budget
+from service.admission import admission
 from service import user_service, mail_service
+from service.rate_limit import rate_limit, client_ip
 from .user_scheme import (
     RegisterModel, Authorization, ChangePasswordModel, ChangeModel,
     ForgotPasswordRequest, ResetPasswordRequest
@@ -17,7 +20,7 @@ from response_models import UserResponse, PaginatedResponse
 user_router = APIRouter(prefix="/users", tags=["users"])
 
 
-@user_router.post("/registration", response_model=UserResponse)
+@user_router.post("/registration", response_model=UserResponse, dependencies=[query_budget(6)])
 async def registration(user: RegisterModel, db: AsyncSession = Depends(get_db)):
     user_data = await user_service.registration(
         user.email,
@@ -30,15 +33,25 @@ async def registration(user: RegisterModel, db: AsyncSession = Depends(get_db)):
     return user_data
 
 
-@user_router.post("/authorization", response_model=UserResponse)
-async def authorization(user: Authorization, db: AsyncSession = Depends(get_db)):
-    user_data, session = await user_service.authorization(user.email, user.password, db)
+@user_router.post(
+    "/authorization",
+    response_model=UserResponse,
+    dependencies=[query_budget(5), rate_limit("login"), admission("critical")]
+)
+async def authorization(user: Authorization, request: Request, db: AsyncSession = Depends(get_db)):
+    user_data, session = await user_service.authorization(
+        user.email, user.password, db, client_ip=client_ip(request)
+    )
     response = JSONResponse(content=user_data)
     response.set_cookie('session', session, httponly=True)
     return response
 
 
-@user_router.get("/authorization/check", response_model=UserResponse)
+@user_router.get(
+    "/authorization/check",
+    response_model=UserResponse,
+    dependencies=[query_budget(2), admission("critical")]
+)
 async def authorization_check(request: Request, db: AsyncSession = Depends(get_db)):
     session = request.cookies.get('session')
     if not session:
@@ -48,14 +61,14 @@ async def authorization_check(request: Request, db: AsyncSession = Depends(get_d
     return user
 
 
-@user_router.post("/user/logout")
+@user_router.post("/user/logout", dependencies=[query_budget(0)])
 async def logout():
     response = Response(status_code=200)
     response.set_cookie(key="session", value="", httponly=True)
     return response
 
 
-@user_router.patch("/user/edit", response_model=UserResponse)
+@user_router.patch("/user/edit", response_model=UserResponse, dependencies=[query_budget(6)])
 async def edit_user(
         user: ChangeModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -69,7 +82,11 @@ async def edit_user(
     return user_data
 
 
-@user_router.patch("/user/edit/password", response_model=UserResponse)
+@user_router.patch(
+    "/user/edit/password",
+    response_model=UserResponse,
+    dependencies=[query_budget(5)]
+)
 async def edit_password(
         user: ChangePasswordModel,
         current_user: User = Depends(user_service.get_current_user),
@@ -83,7 +100,11 @@ async def edit_password(
     )
 
 
-@user_router.get("/", response_model=PaginatedResponse[UserResponse])
+@user_router.get(
+    "/",
+    response_model=PaginatedResponse[UserResponse],
+    dependencies=[query_budget(4), admission("heavy", limit=2)]
+)
 async def get_all_users(
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
@@ -100,21 +121,25 @@ async def get_all_users(
         "asc",
         description="Порядок сортировки (asc/desc)"
     ),
+    with_total: bool = Query(
+        True,
+        description="Считать общее количество (false — только has_next)"
+    ),
     current_user: User = Depends(user_service.get_current_user)
 ):
     return await user_service.get_users(
         db, current_user, page, size, search,
-        sort_field, sort_order
+        sort_field, sort_order, with_total
     )
 
 
-@user_router.get("/user/{id}", response_model=UserResponse)
+@user_router.get("/user/{id}", response_model=UserResponse, dependencies=[query_budget(1), admission("critical")])
 async def get_user(id, db: AsyncSession = Depends(get_db)):
     user_data = await user_service.get_user(id, db)
     return user_data
 
 
-@user_router.delete("/admin/user/{id}/delete")
+@user_router.delete("/admin/user/{id}/delete", dependencies=[query_budget(18)])
 async def delete_user(
     id: str,
     current_user: User = Depends(user_service.get_current_user),
@@ -123,7 +148,7 @@ async def delete_user(
     return await user_service.delete_user(db, id, current_user)
 
 
-@user_router.post("/forgot-password")
+@user_router.post("/forgot-password", dependencies=[query_budget(3), rate_limit("forgot_password")])
 async def forgot_password(
     data: ForgotPasswordRequest,
     db: AsyncSession = Depends(get_db)
@@ -132,7 +157,7 @@ async def forgot_password(
     return {"detail": "If the email exists, a reset link will be sent"}
 
 
-@user_router.post("/reset-password")
+@user_router.post("/reset-password", dependencies=[query_budget(5)])
 async def reset_password(
     data: ResetPasswordRequest,
     db: AsyncSession = Depends(get_db)
@@ -1,11 +1,19 @@
+import asyncio
+import threading
 from typing import Optional
 from fastapi import HTTPException, Response
-from sqlalchemy import select
-from sqlalchemy import or_, func
+from sqlalchemy import select, func
+from sqlalchemy import or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import joinedload
 from models import (
-    User, Role, RoleEnum, UserRole, Module, Discipline
+    User, Role, RoleEnum, UserRole, Module, Discipline, ReviewDiscipline
+)
+from service import swear_prefilter, moderation_policy
+from service.pagination_service import paginate
+from monitoring import (
+    route_metrics, blocking_detector, slow_query_log,
+    sampling_profiler, ProfilerBusy
 )
 
 
@@ -77,41 +85,29 @@ async def remove_admin(target_user_id: str, current_user: User, db: AsyncSession
 async def get_admins(
         db: AsyncSession, page: int = 1,
         size: int = 20, search: Optional[str] = None,
-        sort_field: str = "surname", sort_order: str = "asc"
+        sort_field: str = "surname", sort_order: str = "asc",
+        with_total: bool = True
 ):
     data = (
-        select(User).options(selectinload(
-            User.user_roles).joinedload(UserRole.role)
-        ).join(UserRole).join(Role).where(
-            or_(
+        User.get_projection().where(User.user_roles.any(
+            UserRole.role.has(or_(
                 Role.name == RoleEnum.admin,
                 Role.name == RoleEnum.super_admin
-            )
-        ).distinct()
+            ))
+        ))
     )
     if search:
         data = User.apply_search_filter(data, search)
 
-    total_query = data.with_only_columns(func.count(User.id))
-    total_result = await db.execute(total_query)
-    total = total_result.scalar_one()
-
     data = User.apply_sorting(data, sort_field, sort_order)
 
-    total_pages = (total + size - 1) // size
-    paginated_query = data.limit(size).offset((page - 1) * size)
-
-    result = await db.execute(paginated_query)
-    users = result.unique().scalars().all()
+    rows, pagination = await paginate(
+        db, data, page, size, with_total
+    )
 
     return {
-        "data": [user.get_dto() for user in users],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": size
-        }
+        "data": [User.row_to_dto(row) for row in rows],
+        "pagination": pagination
     }
 
 
@@ -182,3 +178,110 @@ async def get_modules(db: AsyncSession):
     result = await db.execute(select(Module))
     modules = result.unique().scalars().all()
     return [module.get_dto() for module in modules]
+
+
+async def get_route_metrics(current_user: User):
+    if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
+        raise HTTPException(status_code=403, detail="Only super-admin or admin can view metrics")
+
+    return route_metrics.snapshot()
+
+
+async def get_event_loop_blocks(current_user: User):
+    if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
+        raise HTTPException(status_code=403, detail="Only super-admin or admin can view metrics")
+
+    return blocking_detector.snapshot()
+
+
+async def get_slow_queries(current_user: User):
+    if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
+        raise HTTPException(status_code=403, detail="Only super-admin or admin can view metrics")
+
+    return slow_query_log.snapshot()
+
+
+async def get_swear_prefilter_stats(current_user: User):
+    if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
+        raise HTTPException(status_code=403, detail="Only super-admin or admin can view metrics")
+
+    return swear_prefilter.stats_snapshot()
+
+
+async def get_moderation_policy(current_user: User, db: AsyncSession):
+    if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
+        raise HTTPException(status_code=403, detail="Only super-admin or admin can view moderation policy")
+
+    policy = moderation_policy.current()
+    # отзывы, посчитанные другой политикой, — работа для rescore_reviews.py
+    stale_reviews = (await db.execute(
+        select(func.count()).select_from(ReviewDiscipline)
+        .where(ReviewDiscipline.policy_version.is_distinct_from(policy.version))
+    )).scalar_one()
+    return {
+        **policy.to_dict(),
+        "source": "file" if moderation_policy.POLICY_FILE else "database",
+        "stale_reviews": stale_reviews,
+    }
+
+
+async def update_moderation_policy(values: dict, current_user: User, db: AsyncSession):
+    if current_user["role"] != RoleEnum.super_admin.value:
+        raise HTTPException(status_code=403, detail="Only super-admin can change moderation policy")
+
+    try:
+        policy = await moderation_policy.publish(db, values, current_user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return policy.to_dict()
+
+
+async def profile_process(
+        db: AsyncSession,
+        current_user: User,
+        seconds: float = 10,
+        interval_ms: int = 10,
+        route: Optional[str] = None,
+        requests: Optional[int] = None,
+        output_format: str = "collapsed"
+):
+    if current_user["role"] != RoleEnum.super_admin.value:
+        raise HTTPException(status_code=403, detail="Only super-admin can run the profiler")
+
+    if output_format not in ("collapsed", "speedscope"):
+        raise HTTPException(400, "Invalid format. Allowed: 'collapsed' or 'speedscope'")
+    if requests is not None and not route:
+        raise HTTPException(400, "Route is required when profiling requests")
+    if sampling_profiler.running:
+        raise HTTPException(409, "Profiler is already running")
+
+    # профиль может идти до минуты — соединение из пула на это время не держим
+    await db.close()
+
+    try:
+        profile = await asyncio.to_thread(
+            sampling_profiler.profile,
+            asyncio.get_running_loop(), threading.get_ident(),
+            seconds, interval_ms / 1000, route, requests
+        )
+    except ProfilerBusy:
+        raise HTTPException(409, "Profiler is already running")
+
+    headers = {
+        "X-Profile-Samples": str(profile.samples),
+        "X-Profile-Duration": f"{profile.duration:.2f}"
+    }
+    if profile.requests is not None:
+        headers["X-Profile-Requests"] = str(profile.requests)
+
+    if output_format == "speedscope":
+        headers["Content-Disposition"] = 'attachment; filename="profile.speedscope.json"'
+        return Response(
+            content=profile.speedscope(route or "process"),
+            media_type="application/json",
+            headers=headers
+        )
+
+    return Response(content=profile.collapsed(), media_type="text/plain", headers=headers)
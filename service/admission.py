@@ -0,0 +1,187 @@
+import asyncio
+import math
+import os
+import time
+from collections import defaultdict, deque
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import Depends
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from monitoring.metrics import (
+    admission_in_flight, admission_queued, admission_rejected_total, admission_wait_seconds
+)
+
+load_dotenv()
+
+# Контроль допуска: когда пул соединений исчерпан, запросы копятся в get_db
+# до таймаута и тормозят всех. AdmissionMiddleware пускает в приложение не
+# больше ADMISSION_CAPACITY запросов воркера, остальные ждут в ограниченной
+# очереди своего класса, а при полной очереди или по таймауту сразу
+# получают 503 — до разбора тела, сессии и соединения с БД
+#
+# Класс и лимит маршрута объявляются в декораторе рядом с бюджетом запросов:
+#   @router.get("/search", dependencies=[query_budget(4), admission("heavy", limit=8)])
+# Маршруты без объявления относятся к normal
+#
+# Приоритет — через долю ёмкости: heavy стартует, только пока занято меньше
+# 40% мест, normal — меньше 80%, critical (вход, дешёвые чтения, метрики)
+# может занять всё. Под перегрузкой первыми отбрасываются тяжёлые списки,
+# а освободившееся место получает ожидающий из класса повыше
+ENABLED = os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+# пул у каждого воркера свой: pool_size + max_overflow из database.py
+CAPACITY = int(os.getenv("ADMISSION_CAPACITY", "30"))
+
+# класс -> приоритет, доля ёмкости, мест в очереди, секунд ожидания
+LANES = {
+    "critical": {"priority": 0, "share": 1.0, "queue": 200, "timeout": 5.0},
+    "normal": {"priority": 1, "share": 0.8, "queue": 100, "timeout": 2.0},
+    "heavy": {"priority": 2, "share": 0.4, "queue": 20, "timeout": 0.5},
+}
+DEFAULT_LANE = "normal"
+
+
+def admission(lane: str, limit: Optional[int] = None):
+    if lane not in LANES:
+        raise ValueError(f"Unknown admission lane: {lane}")
+
+    # сама зависимость ничего не делает: middleware находит её в маршруте
+    def declare_admission():
+        pass
+
+    declare_admission.admission = (lane, limit)
+    return Depends(declare_admission)
+
+
+class AdmissionController:
+    def __init__(self, capacity: int):
+        self.in_use = 0
+        self.lane_limits = {
+            lane: max(1, math.floor(policy["share"] * capacity)) for lane, policy in LANES.items()
+        }
+        self.route_in_use = defaultdict(int)
+        self.route_waiting = defaultdict(int)
+        self.waiters = {lane: deque() for lane in LANES}
+        self.order = sorted(LANES, key=lambda lane: LANES[lane]["priority"])
+
+    def _can_start(self, lane: str, route, limit: Optional[int]) -> bool:
+        return self.in_use < self.lane_limits[lane] and (limit is None or self.route_in_use[route] < limit)
+
+    def _take(self, lane: str, route):
+        self.in_use += 1
+        self.route_in_use[route] += 1
+        admission_in_flight[lane].inc()
+
+    def _dequeue(self, lane: str, waiter: tuple):
+        self.waiters[lane].remove(waiter)
+        route = waiter[1]
+        self.route_waiting[route] -= 1
+        if not self.route_waiting[route]:
+            del self.route_waiting[route]
+
+    async def acquire(self, lane: str, route, limit: Optional[int]) -> bool:
+        queue = self.waiters[lane]
+        # очередь проверяется по маршруту: ожидающий, которого держит только
+        # limit своего маршрута, не должен задерживать остальные маршруты класса
+        if not self.route_waiting.get(route) and self._can_start(lane, route, limit):
+            self._take(lane, route)
+            return True
+        if len(queue) >= LANES[lane]["queue"]:
+            return False
+
+        waiter = (asyncio.get_running_loop().create_future(), route, limit)
+        queue.append(waiter)
+        self.route_waiting[route] += 1
+        admission_queued[lane].inc()
+        try:
+            await asyncio.wait((waiter[0],), timeout=LANES[lane]["timeout"])
+        except asyncio.CancelledError:
+            # клиент ушёл: место, выданное в последний момент, возвращается
+            if waiter[0].done():
+                self.release(lane, route)
+            else:
+                self._dequeue(lane, waiter)
+            raise
+        finally:
+            admission_queued[lane].dec()
+        if waiter[0].done():
+            return True
+        self._dequeue(lane, waiter)
+        return False
+
+    def release(self, lane: str, route):
+        self.in_use -= 1
+        self.route_in_use[route] -= 1
+        if not self.route_in_use[route]:
+            del self.route_in_use[route]
+        admission_in_flight[lane].dec()
+        self._wake()
+
+    def _wake(self):
+        for lane in self.order:
+            queue = self.waiters[lane]
+            for waiter in list(queue):
+                if self.in_use >= self.lane_limits[lane]:
+                    break
+                future, route, limit = waiter
+                if self._can_start(lane, route, limit):
+                    self._dequeue(lane, waiter)
+                    self._take(lane, route)
+                    future.set_result(None)
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, router, capacity: int = CAPACITY):
+        self.app = app
+        # маршрутизация ещё не прошла — маршрут ищется по таблице роутера
+        self.router = router
+        self.controller = AdmissionController(capacity)
+        self.lanes = {}
+
+    def _lane(self, route) -> tuple[str, Optional[int]]:
+        # APIRoute не хешируется, маршруты живут всё время работы приложения
+        lane = self.lanes.get(id(route))
+        if lane is None:
+            lane = (DEFAULT_LANE, None)
+            for dependency in getattr(route, "dependencies", ()):
+                declared = getattr(dependency.dependency, "admission", None)
+                if declared:
+                    lane = declared
+            self.lanes[id(route)] = lane
+        return lane
+
+    def _route(self, scope):
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+        route = self._route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        lane, limit = self._lane(route)
+        started = time.perf_counter()
+        if not await self.controller.acquire(lane, id(route), limit):
+            admission_rejected_total[lane].inc()
+            # метрики маршрута видят отказ под его шаблоном
+            scope["route"] = route
+            response = JSONResponse(
+                {"detail": "Server is overloaded, try again later"},
+                status_code=503,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+        admission_wait_seconds.observe(time.perf_counter() - started)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane, id(route))
@@ -1,45 +1,37 @@
-from typing import Optional, List
+from typing import Optional
 from fastapi import HTTPException, Response
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
-from datetime import datetime, timezone
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import (
     DisciplineFormatEnum, Module,
-    Discipline, User, Favorite, RoleEnum
+    Discipline, User, Favorite, RoleEnum, ReviewDiscipline
 )
+from service.pagination_service import paginate
 
 
-def sort_disciplines(disciplines: List[Discipline], sort_by: str, sort_order: str):
+def sort_disciplines(query, sort_by: str, sort_order: str):
     if sort_by not in ("rating", "reviews", "latest"):
         raise HTTPException(400, detail="Invalid sort_by parameter")
 
     if sort_order not in ("asc", "desc"):
         raise HTTPException(400, detail="Invalid sort_order parameter")
 
-    reverse = (sort_order == "desc")
-
-    def get_rating(d: Discipline):
-        grades = [r.grade for r in d.reviews if r.grade is not None]
-        return sum(grades) / len(grades) if grades else 0.0
-
-    def get_reviews_count(d: Discipline):
-        return len(d.reviews)
-
-    def get_latest_date(d: Discipline):
-        dates = [r.created_at for r in d.reviews]
-        if dates:
-            return max(dates)
-        return datetime.min.replace(tzinfo=timezone.utc)
-
-    sort_key = {
-        "rating": get_rating,
-        "reviews": get_reviews_count,
-        "latest": get_latest_date
+    columns = query.selected_columns
+    sort_column = {
+        "rating": columns.avg_rating,
+        "reviews": columns.review_count,
+        "latest": columns.latest_review_at
     }[sort_by]
 
-    return sorted(disciplines, key=sort_key, reverse=reverse)
+    # дисциплины без отзывов (latest = NULL) считаются самыми старыми
+    if sort_order == "desc":
+        sort_column = sort_column.desc().nulls_last()
+    else:
+        sort_column = sort_column.asc().nulls_first()
+
+    return query.order_by(sort_column, Discipline.id)
 
 
 async def create_discipline(
@@ -210,7 +202,18 @@ async def delete_discipline(
             detail="Only super-admin or admin can delete discipline"
         )
 
-    result = await db.execute(select(Discipline).where(Discipline.id == discipline_id))
+    # каскадное удаление проходит по отзывам, их голосам и жалобам —
+    # без eager-загрузки flush догружал бы их отдельным запросом на отзыв
+    result = await db.execute(
+        select(Discipline)
+        .options(
+            selectinload(Discipline.reviews).selectinload(ReviewDiscipline.votes),
+            selectinload(Discipline.reviews).selectinload(ReviewDiscipline.complaints),
+            selectinload(Discipline.favorites),
+            selectinload(Discipline.teacher_disciplines)
+        )
+        .where(Discipline.id == discipline_id)
+    )
     discipline = result.scalars().first()
     if not discipline:
         raise HTTPException(status_code=404, detail="Discipline not found")
@@ -222,10 +225,9 @@ async def delete_discipline(
 
 
 async def get_disciplines(db: AsyncSession, current_user: Optional[dict] = None):
-    result = await db.execute(Discipline.get_joined_data())
-    disciplines = result.scalars().all()
     user_id = str(current_user["id"]) if current_user else None
-    return [discipline.get_dto(user_id) for discipline in disciplines]
+    result = await db.execute(Discipline.get_projection(user_id))
+    return [Discipline.row_to_dto(row) for row in result]
 
 
 async def get_discipline(
@@ -254,36 +256,26 @@ async def search_disciplines(
         format_filter: Optional[str] = None,
         sort_by: Optional[str] = "rating",  # "rating", "reviews", "latest"
         sort_order: Optional[str] = "desc",  # "asc" или "desc"
-        current_user: Optional[dict] = None
+        current_user: Optional[dict] = None,
+        with_total: bool = True
 ):
-    data = Discipline.get_joined_data()
+    user_id = str(current_user["id"]) if current_user else None
+    data = Discipline.get_projection(user_id)
     query = Discipline.apply_filters(
         data,
         name_search=name_search,
         module_search=module_search,
         format_filter=format_filter
     )
+    query = sort_disciplines(query, sort_by, sort_order)
 
-    total_query = query.with_only_columns(func.count(Discipline.id))
-    total_result = await db.execute(total_query)
-    total = total_result.scalar_one()
-
-    total_pages = (total + size - 1) // size
-    paginated_query = query.limit(size).offset((page - 1) * size)
-
-    result = await db.execute(paginated_query)
-    disciplines = result.unique().scalars().all()
+    rows, pagination = await paginate(
+        db, query, page, size, with_total
+    )
 
-    sorted_disciplines = sort_disciplines(disciplines, sort_by, sort_order)
-    user_id = str(current_user["id"]) if current_user else None
     return {
-        "data": [discipline.get_dto(user_id) for discipline in sorted_disciplines],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": size
-        }
+        "data": [Discipline.row_to_dto(row) for row in rows],
+        "pagination": pagination
     }
 
 
@@ -363,7 +355,8 @@ async def get_user_favorites(
         module_search: Optional[str] = None,
         format_filter: Optional[str] = None,
         sort_by: Optional[str] = "rating",
-        sort_order: Optional[str] = "desc"
+        sort_order: Optional[str] = "desc",
+        with_total: bool = True
 ):
     data = Discipline.get_favorites(user_id)
     query = Discipline.apply_filters(
@@ -372,24 +365,13 @@ async def get_user_favorites(
         module_search=module_search,
         format_filter=format_filter
     )
+    query = sort_disciplines(query, sort_by, sort_order)
 
-    total_query = query.with_only_columns(func.count(Discipline.id))
-    total_result = await db.execute(total_query)
-    total = total_result.scalar_one()
-    total_pages = (total + size - 1) // size
-    paginated_query = query.limit(size).offset((page - 1) * size)
-
-    result = await db.execute(paginated_query)
-    disciplines = result.unique().scalars().all()
-
-    sorted_disciplines = sort_disciplines(disciplines, sort_by, sort_order)
+    rows, pagination = await paginate(
+        db, query, page, size, with_total
+    )
 
     return {
-        "data": [discipline.get_dto(user_id) for discipline in sorted_disciplines],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": size
-        }
+        "data": [Discipline.row_to_dto(row) for row in rows],
+        "pagination": pagination
     }
@@ -0,0 +1,177 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+import numpy as np
+from dotenv import load_dotenv
+from monitoring.metrics import login_failures_total, login_throttled_total
+
+load_dotenv()
+
+# Счётчики неудачных входов по email, по IP источника и по паре (email, IP).
+# Попытка, которой ещё рано, отклоняется до загрузки пользователя и
+# check_password_hash — подбор паролей не тратит CPU на хеши
+#
+# Первые free неудач бесплатны, дальше пауза растёт вдвое до cap, после
+# lockout_after неудач ключ блокируется на lockout секунд. Без неудач в
+# течение WINDOW счётчик начинается заново, успешный вход сбрасывает ключи
+# email. Email-ключ набирают с любого адреса, поэтому он не блокирует
+# адрес, у которого с этим email своих неудач нет, — иначе любой мог бы
+# запереть чужой аккаунт, раз в cap секунд ошибаясь с новых IP. Жёстко
+# блокируют только ключи пары (email, IP) и IP
+#
+# Таблица — массив фиксированных слотов (хеш ключа, число неудач, время
+# последней неудачи, блокировка до) в mmap-файле LOGIN_THROTTLE_PATH: все
+# воркеры машины видят одни счётчики, запись — под flock. Без пути таблица
+# своя у каждого процесса
+ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "True").lower() == "true"
+PATH = os.getenv("LOGIN_THROTTLE_PATH", "/dev/shm/subject_rating_login_throttle")
+SLOTS = int(os.getenv("LOGIN_THROTTLE_SLOTS", "65536"))
+WINDOW = 15 * 60
+PROBES = 8
+
+POLICIES = {
+    # распределённый подбор одного аккаунта
+    "email": {"free": 5, "base": 1.0, "cap": 30.0, "lockout_after": None, "lockout": 0.0},
+    "email_ip": {"free": 3, "base": 1.0, "cap": 300.0, "lockout_after": 10, "lockout": 900.0},
+    # с одного адреса перебирают много email — порог выше, но и он конечен
+    "ip": {"free": 10, "base": 1.0, "cap": 60.0, "lockout_after": 50, "lockout": 900.0},
+}
+
+SLOT = np.dtype([("key", "<u8"), ("failures", "<u4"), ("last", "<f8"), ("blocked", "<f8")])
+
+
+class FailureTable:
+    def __init__(self, path: Optional[str], slots: int):
+        size = slots * SLOT.itemsize
+        self.fd = None
+        if path:
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self.fd).st_size != size:
+                with self._locked():
+                    os.ftruncate(self.fd, size)
+            self.buffer = mmap.mmap(self.fd, size)
+        else:
+            self.buffer = mmap.mmap(-1, size)
+        self.slots = np.frombuffer(self.buffer, dtype=SLOT)
+
+    @contextmanager
+    def _locked(self):
+        if self.fd is None:
+            yield
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 — пустой слот
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _find(self, key_hash: int, now: float, insert: bool) -> Optional[int]:
+        start = key_hash % len(self.slots)
+        victim, oldest = None, None
+        for probe in range(PROBES):
+            index = (start + probe) % len(self.slots)
+            slot = self.slots[index]
+            if slot["key"] == key_hash:
+                return index
+            # пустой или протухший слот занимаем в первую очередь, иначе — самый давний
+            age = -1.0 if slot["key"] == 0 or now - slot["last"] > WINDOW else float(slot["last"])
+            if victim is None or age < oldest:
+                victim, oldest = index, age
+        if not insert:
+            return None
+        self.slots[victim] = (key_hash, 0, now, 0.0)
+        return victim
+
+    def retry_after(self, key: str, now: float) -> float:
+        index = self._find(self._hash(key), now, insert=False)
+        if index is None:
+            return 0.0
+        return max(0.0, float(self.slots[index]["blocked"]) - now)
+
+    def failures(self, key: str, now: float) -> int:
+        index = self._find(self._hash(key), now, insert=False)
+        if index is None or now - self.slots[index]["last"] > WINDOW:
+            return 0
+        return int(self.slots[index]["failures"])
+
+    def failure(self, key: str, policy: dict, now: float):
+        with self._locked():
+            index = self._find(self._hash(key), now, insert=True)
+            slot = self.slots[index]
+            failures = 1 if now - slot["last"] > WINDOW else int(slot["failures"]) + 1
+            delay = 0.0
+            if failures > policy["free"]:
+                delay = min(policy["cap"], policy["base"] * 2 ** (failures - policy["free"] - 1))
+            if policy["lockout_after"] and failures >= policy["lockout_after"]:
+                delay = max(delay, policy["lockout"])
+            slot["failures"] = failures
+            slot["last"] = now
+            slot["blocked"] = max(float(slot["blocked"]), now + delay)
+
+    def reset(self, key: str, now: float):
+        with self._locked():
+            index = self._find(self._hash(key), now, insert=False)
+            if index is not None:
+                self.slots[index] = (0, 0, 0.0, 0.0)
+
+
+_table: Optional[FailureTable] = None
+
+
+def _get_table() -> FailureTable:
+    global _table
+    if _table is None:
+        _table = FailureTable(PATH or None, SLOTS)
+    return _table
+
+
+def _keys(email: str, client_ip: Optional[str]) -> list:
+    email = email.strip().lower()
+    keys = [("email", f"email:{email}")]
+    if client_ip:
+        keys.append(("email_ip", f"email_ip:{email}:{client_ip}"))
+        keys.append(("ip", f"ip:{client_ip}"))
+    return keys
+
+
+def check(email: str, client_ip: Optional[str]) -> float:
+    if not ENABLED:
+        return 0.0
+    now = time.time()
+    table = _get_table()
+    keys = dict(_keys(email, client_ip))
+    retry_after = max(table.retry_after(key, now) for kind, key in keys.items() if kind != "email")
+    if "email_ip" in keys and table.failures(keys["email_ip"], now):
+        retry_after = max(retry_after, table.retry_after(keys["email"], now))
+    if retry_after > 0:
+        login_throttled_total.inc()
+    return retry_after
+
+
+def failure(email: str, client_ip: Optional[str]):
+    if not ENABLED:
+        return
+    login_failures_total.inc()
+    now = time.time()
+    table = _get_table()
+    for kind, key in _keys(email, client_ip):
+        table.failure(key, POLICIES[kind], now)
+
+
+def success(email: str, client_ip: Optional[str]):
+    if not ENABLED:
+        return
+    now = time.time()
+    table = _get_table()
+    for kind, key in _keys(email, client_ip):
+        if kind != "ip":
+            table.reset(key, now)
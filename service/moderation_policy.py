@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import ModerationPolicy, ReviewStatusEnum
+from service.swear_model import model_version
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Политика модерации: пороги статусов, режим предфильтра и версия модели в
+# одном месте. Источник — файл MODERATION_POLICY_FILE (JSON с полями
+# политики) или, если он не задан, последняя строка moderation_policies.
+# Пока ни того ни другого нет, действуют значения из окружения
+#
+# Каждый воркер перечитывает источник раз в MODERATION_POLICY_REFRESH секунд,
+# так что новая политика доходит до всех без рестарта. version — хеш
+# значимых полей вместе с версией модели: он пишется в reviews.policy_version,
+# и rescore_reviews.py пересчитывает только отзывы с другой версией
+POLICY_FILE = os.getenv("MODERATION_POLICY_FILE")
+REFRESH_SECONDS = float(os.getenv("MODERATION_POLICY_REFRESH", "5"))
+PREFILTER_MODES = ("on", "shadow", "off")
+
+
+class Policy:
+    __slots__ = (
+        "revision", "pending_threshold", "rejected_threshold",
+        "prefilter_mode", "prefilter_obscene_score", "model_version", "version"
+    )
+
+    def __init__(
+            self, revision: str, pending_threshold: float, rejected_threshold: float,
+            prefilter_mode: str, prefilter_obscene_score: float
+    ):
+        if not 0 <= pending_threshold <= rejected_threshold <= 1:
+            raise ValueError("Thresholds must satisfy 0 <= pending <= rejected <= 1")
+        if prefilter_mode not in PREFILTER_MODES:
+            raise ValueError(f"Prefilter mode must be one of {', '.join(PREFILTER_MODES)}")
+
+        self.revision = revision
+        self.pending_threshold = float(pending_threshold)
+        self.rejected_threshold = float(rejected_threshold)
+        self.prefilter_mode = prefilter_mode
+        self.prefilter_obscene_score = float(prefilter_obscene_score)
+        self.model_version = model_version()
+        fingerprint = json.dumps([
+            self.pending_threshold, self.rejected_threshold, self.prefilter_mode,
+            self.prefilter_obscene_score, self.model_version
+        ])
+        self.version = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+    def status(self, offensive_score: float) -> ReviewStatusEnum:
+        if offensive_score >= self.rejected_threshold:
+            return ReviewStatusEnum.rejected
+        if offensive_score >= self.pending_threshold:
+            return ReviewStatusEnum.pending
+        return ReviewStatusEnum.published
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _from_env() -> Policy:
+    return Policy(
+        revision="env",
+        pending_threshold=float(os.getenv("MODERATION_PENDING_THRESHOLD", "0.30")),
+        rejected_threshold=float(os.getenv("MODERATION_REJECTED_THRESHOLD", "0.80")),
+        prefilter_mode=os.getenv("SWEAR_PREFILTER", "shadow").lower(),
+        prefilter_obscene_score=float(os.getenv("SWEAR_PREFILTER_OBSCENE_SCORE", "0.95")),
+    )
+
+
+def _from_row(row: ModerationPolicy) -> Policy:
+    return Policy(
+        revision=f"db:{row.id}",
+        pending_threshold=row.pending_threshold,
+        rejected_threshold=row.rejected_threshold,
+        prefilter_mode=row.prefilter_mode,
+        prefilter_obscene_score=row.prefilter_obscene_score,
+    )
+
+
+_current = _from_env()
+_file_mtime = None
+
+
+def current() -> Policy:
+    return _current
+
+
+def set_current(policy: Policy):
+    global _current
+    if policy.version != _current.version:
+        logger.info("Moderation policy %s (%s) is active", policy.version, policy.revision)
+    _current = policy
+
+
+def _load_file() -> Optional[Policy]:
+    global _file_mtime
+    path = Path(POLICY_FILE)
+    mtime = path.stat().st_mtime
+    if mtime == _file_mtime:
+        return None
+    values = json.loads(path.read_text(encoding="utf-8"))
+    defaults = _from_env()
+    policy = Policy(
+        revision=f"file:{path.name}",
+        pending_threshold=values.get("pending_threshold", defaults.pending_threshold),
+        rejected_threshold=values.get("rejected_threshold", defaults.rejected_threshold),
+        prefilter_mode=values.get("prefilter_mode", defaults.prefilter_mode),
+        prefilter_obscene_score=values.get("prefilter_obscene_score", defaults.prefilter_obscene_score),
+    )
+    _file_mtime = mtime
+    return policy
+
+
+async def refresh(db: AsyncSession):
+    if POLICY_FILE:
+        policy = _load_file()
+    else:
+        row = (await db.execute(
+            select(ModerationPolicy).order_by(ModerationPolicy.id.desc()).limit(1)
+        )).scalar_one_or_none()
+        policy = _from_row(row) if row else None
+    if policy:
+        set_current(policy)
+
+
+async def watch(session_factory, interval: float = REFRESH_SECONDS):
+    while True:
+        try:
+            async with session_factory() as db:
+                await refresh(db)
+        except Exception:
+            # ошибка источника не должна ронять воркер: остаётся прежняя политика
+            logger.warning("Moderation policy refresh failed", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+async def publish(db: AsyncSession, values: dict, user_id: Optional[str]) -> Policy:
+    if POLICY_FILE:
+        raise RuntimeError("Moderation policy is managed by MODERATION_POLICY_FILE")
+    # проверка до записи: CHECK в таблице не знает про режимы предфильтра
+    Policy(revision="new", **values)
+    row = ModerationPolicy(**values, created_by=user_id)
+    db.add(row)
+    await db.commit()
+    policy = _from_row(row)
+    # этот воркер переключается сразу, остальные — на следующем refresh
+    set_current(policy)
+    return policy
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import select, tuple_
+from models import ReviewDiscipline
+from monitoring.metrics import near_duplicate_total, near_duplicate_check_seconds, timed
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Поиск почти одинаковых отзывов во время накруток: MinHash-подписи
+# недавних комментариев каждой дисциплины лежат в LSH-индексе (полосы
+# подписи как ключи корзин), поэтому проверка нового отзыва — один
+# векторный MinHash и несколько словарных поисков, без перебора отзывов
+#
+# Индекс свой в каждом воркере; отзывы, созданные другими воркерами,
+# подтягиваются из БД раз в NEAR_DUPLICATE_SYNC секунд
+#
+# off — выключено, flag — отзыв получает duplicate_of_id, hold — ещё и
+# уходит на модерацию (pending), если модель его пропустила
+ACTION = os.getenv("NEAR_DUPLICATE_ACTION", "flag").lower()
+THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+WINDOW = timedelta(hours=float(os.getenv("NEAR_DUPLICATE_WINDOW_HOURS", "24")))
+PER_DISCIPLINE = int(os.getenv("NEAR_DUPLICATE_PER_DISCIPLINE", "1000"))
+# короткие типовые отзывы («Отличный курс!») совпадают честно
+MIN_LENGTH = int(os.getenv("NEAR_DUPLICATE_MIN_LENGTH", "40"))
+SYNC_SECONDS = float(os.getenv("NEAR_DUPLICATE_SYNC", "5"))
+
+SHINGLE = 5
+# после normalize в тексте только а-я, a-z и пробел: коды < 2^11, и пять
+# символов без потерь упаковываются в одно 55-битное число
+CODE_BITS = 11
+# 16 полос по 4 строки: пара с Jaccard 0.8 становится кандидатом почти
+# наверняка, с 0.5 — примерно в половине случаев и отсеивается по оценке
+BANDS, ROWS = 16, 4
+PERMUTATIONS = BANDS * ROWS
+_random = np.random.RandomState(20240517)
+# multiply-shift хеширование: переполнение uint64 — это и есть mod 2^64;
+# коэффициенты одинаковые во всех воркерах — подписи из БД и из памяти сравнимы
+HASH_A = _random.randint(0, 1 << 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+HASH_B = _random.randint(0, 1 << 63, PERMUTATIONS, dtype=np.uint64)
+SHIFT = np.uint64(32)
+
+TOKENS = re.compile(r"[a-zа-яё]+")
+
+
+@lru_cache(maxsize=1)
+def _stemming():
+    # nltk уже есть в зависимостях через check-swear; грузим при первой проверке
+    from nltk.corpus import stopwords
+    from nltk.stem.snowball import SnowballStemmer
+
+    try:
+        stop_words = frozenset(stopwords.words("russian"))
+    except LookupError:
+        stop_words = frozenset()
+    return SnowballStemmer("russian"), stop_words
+
+
+@lru_cache(maxsize=50000)
+def _stem(word: str) -> str:
+    return _stemming()[0].stem(word)
+
+
+def normalize(comment: str) -> str:
+    # стемминг и стоп-слова сглаживают мелкие правки: окончания, «и»/«а»
+    stop_words = _stemming()[1]
+    words = TOKENS.findall(comment.lower().replace("ё", "е"))
+    return " ".join(_stem(word) for word in words if word not in stop_words)
+
+
+def signature(comment: str) -> Optional[np.ndarray]:
+    text = normalize(comment)
+    if len(text) < MIN_LENGTH:
+        return None
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    count = len(codes) - SHINGLE + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE):
+        shingles |= codes[offset:offset + count] << np.uint64(offset * CODE_BITS)
+    # все перестановки сразу: матрица shingles × PERMUTATIONS, минимум по столбцам
+    hashes = np.outer(np.unique(shingles), HASH_A)
+    hashes += HASH_B
+    hashes >>= SHIFT
+    return hashes.min(axis=0).astype(np.uint32)
+
+
+class LshIndex:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buckets = [{} for _ in range(BANDS)]
+        # review_id -> (created_at, подпись), от старых к новым
+        self.signatures: "OrderedDict[str, tuple[datetime, np.ndarray]]" = OrderedDict()
+
+    @staticmethod
+    def _bands(sig: np.ndarray):
+        for band in range(BANDS):
+            yield band, sig[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def add(self, review_id: str, created_at: datetime, sig: np.ndarray):
+        if review_id in self.signatures:
+            return
+        self.signatures[review_id] = (created_at, sig)
+        for band, key in self._bands(sig):
+            self.buckets[band].setdefault(key, set()).add(review_id)
+        while len(self.signatures) > self.capacity:
+            self._remove(*self.signatures.popitem(last=False))
+
+    def _remove(self, review_id: str, entry: tuple):
+        for band, key in self._bands(entry[1]):
+            bucket = self.buckets[band].get(key)
+            if bucket:
+                bucket.discard(review_id)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def expire(self, before: datetime):
+        while self.signatures:
+            review_id, entry = next(iter(self.signatures.items()))
+            if entry[0] >= before:
+                break
+            del self.signatures[review_id]
+            self._remove(review_id, entry)
+
+    def query(self, sig: np.ndarray) -> Optional[tuple[str, float]]:
+        candidates = set()
+        for band, key in self._bands(sig):
+            candidates.update(self.buckets[band].get(key, ()))
+        if not candidates:
+            return None
+        candidates = list(candidates)
+        # доля совпавших минимумов — оценка сходства Жаккара, для всех кандидатов сразу
+        matrix = np.stack([self.signatures[review_id][1] for review_id in candidates])
+        similarities = np.count_nonzero(matrix == sig, axis=1) / PERMUTATIONS
+        best = int(similarities.argmax())
+        if similarities[best] < THRESHOLD:
+            return None
+        return candidates[best], float(similarities[best])
+
+
+_indexes: dict[str, LshIndex] = {}
+# (created_at, id) последнего подтянутого отзыва
+_synced_until: Optional[tuple] = None
+
+
+def _index(discipline_id: str) -> LshIndex:
+    index = _indexes.get(discipline_id)
+    if index is None:
+        index = _indexes[discipline_id] = LshIndex(PER_DISCIPLINE)
+    return index
+
+
+def find(discipline_id: str, comment: Optional[str]) -> Optional[str]:
+    if ACTION == "off" or not comment:
+        return None
+    with timed(near_duplicate_check_seconds):
+        sig = signature(comment)
+        index = _indexes.get(str(discipline_id))
+        match = index.query(sig) if sig is not None and index else None
+    if match is None:
+        return None
+    near_duplicate_total.inc()
+    logger.info(
+        "Review in discipline %s matches review %s (similarity %.2f)",
+        discipline_id, match[0], match[1]
+    )
+    return match[0]
+
+
+def add(discipline_id: str, review_id: str, comment: Optional[str], created_at: Optional[datetime] = None):
+    if ACTION == "off" or not comment:
+        return
+    sig = signature(comment)
+    if sig is not None:
+        _index(str(discipline_id)).add(str(review_id), created_at or datetime.now(timezone.utc), sig)
+
+
+async def sync(db, batch_size: int = 500):
+    # отзывы из других воркеров (и при старте — за всё окно) попадают в индекс;
+    # у строк одной транзакции одинаковый created_at (now()), поэтому пачки
+    # идут по ключу (created_at, id), иначе пачка таких строк не сдвинет границу
+    global _synced_until
+    now = datetime.now(timezone.utc)
+    after = _synced_until if _synced_until and _synced_until[0] >= now - WINDOW else None
+    while True:
+        query = (
+            select(
+                ReviewDiscipline.id, ReviewDiscipline.discipline_id,
+                ReviewDiscipline.comment, ReviewDiscipline.created_at
+            )
+            .where(ReviewDiscipline.comment.is_not(None))
+            .order_by(ReviewDiscipline.created_at, ReviewDiscipline.id)
+            .limit(batch_size)
+        )
+        if after:
+            query = query.where(tuple_(ReviewDiscipline.created_at, ReviewDiscipline.id) > after)
+        else:
+            query = query.where(ReviewDiscipline.created_at >= now - WINDOW)
+        rows = (await db.execute(query)).all()
+        for row in rows:
+            add(row.discipline_id, row.id, row.comment, row.created_at)
+        if rows:
+            after = (rows[-1].created_at, rows[-1].id)
+        _synced_until = after
+        if len(rows) < batch_size:
+            break
+        # подписи считаются в event loop — отдаём его запросам между пачками
+        await asyncio.sleep(0)
+
+    for index in _indexes.values():
+        index.expire(now - WINDOW)
+
+
+async def watch(session_factory, interval: float = SYNC_SECONDS):
+    if ACTION == "off":
+        return
+    while True:
+        started = time.perf_counter()
+        try:
+            async with session_factory() as db:
+                await sync(db)
+        except Exception:
+            logger.warning("Near-duplicate index sync failed", exc_info=True)
+        await asyncio.sleep(max(interval - (time.perf_counter() - started), 0))
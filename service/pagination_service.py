@@ -0,0 +1,111 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+# 0 — всегда точный total; > 0 — total кешируется на указанное число секунд
+# для каждого набора фильтров и может немного отставать от реального
+COUNT_CACHE_TTL = float(os.getenv("PAGINATION_COUNT_CACHE_TTL", "0"))
+COUNT_CACHE_SIZE = int(os.getenv("PAGINATION_COUNT_CACHE_SIZE", "1024"))
+
+_count_cache: "OrderedDict[str, tuple[float, int]]" = OrderedDict()
+
+
+def _count_cache_key(query) -> str:
+    compiled = query.compile(dialect=postgresql.dialect())
+    return f"{compiled}|{sorted(compiled.params.items())!r}"
+
+
+def _get_cached_total(key: str) -> Optional[int]:
+    cached = _count_cache.get(key)
+    if cached and time.monotonic() - cached[0] < COUNT_CACHE_TTL:
+        _count_cache.move_to_end(key)
+        return cached[1]
+    return None
+
+
+def _set_cached_total(key: str, total: int):
+    _count_cache[key] = (time.monotonic(), total)
+    _count_cache.move_to_end(key)
+    if len(_count_cache) > COUNT_CACHE_SIZE:
+        _count_cache.popitem(last=False)
+
+
+def with_total_count(query):
+    # total_count добавляется последней колонкой строки. Окно считается
+    # после WHERE/GROUP BY, но до LIMIT, поэтому для запросов с group_by
+    # по id это число сгруппированных строк. DISTINCT применяется уже
+    # после окна — такие запросы нужно переписывать через EXISTS
+    return query.add_columns(func.count().over().label("total_count"))
+
+
+def build_pagination(
+        page: int,
+        size: int,
+        total: Optional[int] = None,
+        has_next: Optional[bool] = None
+):
+    total_pages = None
+    if total is not None:
+        total_pages = (total + size - 1) // size if total > 0 else 0
+        has_next = page < total_pages
+
+    return {
+        "total": total,
+        "total_pages": total_pages,
+        "page": page,
+        "size": size,
+        "has_next": bool(has_next)
+    }
+
+
+async def fetch_total(db: AsyncSession, query) -> int:
+    # для страниц за пределами выборки — total берём с первой строки
+    rows = await _fetch_rows(db, with_total_count(query).limit(1))
+    return rows[0].total_count if rows else 0
+
+
+async def _fetch_rows(db: AsyncSession, query):
+    result = await db.execute(query)
+    return result.all()
+
+
+async def paginate(
+        db: AsyncSession,
+        query,
+        page: int = 1,
+        size: int = 20,
+        with_total: bool = True
+):
+    offset = (page - 1) * size
+
+    if not with_total:
+        # без total: берём на одну строку больше, чтобы узнать has_next
+        rows = await _fetch_rows(db, query.limit(size + 1).offset(offset))
+        return rows[:size], build_pagination(page, size, has_next=len(rows) > size)
+
+    cache_key = _count_cache_key(query) if COUNT_CACHE_TTL > 0 else None
+    total = _get_cached_total(cache_key) if cache_key else None
+
+    if total is not None:
+        rows = await _fetch_rows(db, query.limit(size).offset(offset))
+        return rows, build_pagination(page, size, total)
+
+    rows = await _fetch_rows(db, with_total_count(query).limit(size).offset(offset))
+    if rows:
+        total = rows[0].total_count
+    elif offset:
+        total = await fetch_total(db, query)
+    else:
+        total = 0
+
+    if cache_key:
+        _set_cached_total(cache_key, total)
+
+    return rows, build_pagination(page, size, total)
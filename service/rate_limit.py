@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import Float, bindparam, text
+from monitoring import current_request_stats
+from monitoring.metrics import rate_limited_total
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Token bucket перед дорогими эндпоинтами: модель мата, хеширование
+# пароля, SMTP. Объявляется в декораторе роутера рядом с бюджетом запросов
+# и срабатывает до зависимостей параметров — до get_db и get_current_user:
+#   @router.post("/path", dependencies=[query_budget(5), rate_limit("login")])
+#
+# Ведро заводится на IP и, если есть cookie session, на сессию. Поддельные
+# cookie не помогают обойти лимит: ведро IP проверяется всегда
+#
+# memory — ведра в памяти воркера (лимит фактически умножается на число
+# воркеров), postgres — общая UNLOGGED-таблица rate_limit_buckets
+ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+# за обратными прокси адрес клиента берётся из X-Forwarded-For: каждый
+# прокси дописывает в конец адрес, с которого к нему пришли, а всё левее —
+# то, что прислал сам клиент. Поэтому берётся запись на TRUSTED_HOPS-й
+# позиции справа, 0 — заголовок не учитывается
+TRUSTED_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "0"))
+
+# политика: ключ -> (токенов в секунду, ёмкость ведра)
+POLICIES = {
+    "review_add": {"ip": (10 / 60, 10), "session": (4 / 60, 4)},
+    "login": {"ip": (20 / 60, 10)},
+    "forgot_password": {"ip": (5 / 600, 3)},
+    "vote": {"ip": (120 / 60, 60), "session": (30 / 60, 20)},
+    "complaint": {"ip": (20 / 60, 10), "session": (5 / 60, 5)},
+}
+
+
+class MemoryBucketStore:
+    # ведро — [токены, время обновления]; давно не тронутые вытесняются
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [burst, now]
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / rate
+
+
+class PostgresBucketStore:
+    # пополнение и списание — один UPSERT, строка блокируется на время
+    # оператора, поэтому воркеры не списывают один токен дважды
+    REFILL = "LEAST(:burst, bucket.tokens + EXTRACT(EPOCH FROM now() - bucket.updated_at) * :rate)"
+    # выражения в SET видят старую строку, поэтому REFILL везде одинаковый
+    TAKE = text(f"""
+        INSERT INTO rate_limit_buckets AS bucket (key, tokens, allowed, updated_at)
+        VALUES (:key, :burst - :cost, true, now())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = CASE WHEN {REFILL} >= :cost THEN {REFILL} - :cost ELSE {REFILL} END,
+            allowed = {REFILL} >= :cost,
+            updated_at = now()
+        RETURNING bucket.tokens, bucket.allowed
+    """).bindparams(
+        bindparam("rate", type_=Float), bindparam("burst", type_=Float), bindparam("cost", type_=Float)
+    )
+
+    def __init__(self, session_factory, cleanup_every: int = 1000):
+        self.session_factory = session_factory
+        self.cleanup_every = cleanup_every
+        self.calls = 0
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        # запросы лимитера не относятся к бюджету эндпоинта
+        token = current_request_stats.set(None)
+        try:
+            async with self.session_factory() as db:
+                tokens, allowed = (await db.execute(
+                    self.TAKE, {"key": key, "rate": rate, "burst": burst, "cost": cost}
+                )).one()
+                self.calls += 1
+                if self.calls % self.cleanup_every == 0:
+                    # полное ведро ничем не отличается от отсутствующего
+                    await db.execute(text(
+                        "DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '1 hour'"
+                    ))
+                await db.commit()
+        finally:
+            current_request_stats.reset(token)
+        return 0.0 if allowed else (cost - tokens) / rate
+
+
+def _create_store():
+    if BACKEND == "postgres":
+        from database import AsyncSessionLocal
+        return PostgresBucketStore(AsyncSessionLocal)
+    return MemoryBucketStore()
+
+
+store = _create_store()
+
+
+def client_ip(request: Request) -> str:
+    if TRUSTED_HOPS > 0:
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        if forwarded:
+            # записей меньше, чем прокси, — все они дописаны прокси, берём первую
+            return forwarded[-min(TRUSTED_HOPS, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+def _keys(request: Request, name: str, policy: dict) -> list:
+    keys = []
+    if "ip" in policy:
+        keys.append((f"{name}:ip:{client_ip(request)}", *policy["ip"]))
+    session = request.cookies.get("session")
+    if session and "session" in policy:
+        digest = hashlib.sha256(session.encode()).hexdigest()[:32]
+        keys.append((f"{name}:session:{digest}", *policy["session"]))
+    return keys
+
+
+def rate_limit(name: str):
+    policy = POLICIES[name]
+
+    async def check_rate_limit(request: Request):
+        if not ENABLED:
+            return
+        retry_after = 0.0
+        try:
+            for key, rate, burst in _keys(request, name, policy):
+                retry_after = max(retry_after, await store.take(key, rate, burst))
+        except Exception:
+            # недоступное общее хранилище не должно закрывать эндпоинт
+            logger.warning("Rate limit store failed, request allowed", exc_info=True)
+            return
+        if retry_after > 0:
+            rate_limited_total[name].inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    return Depends(check_rate_limit)
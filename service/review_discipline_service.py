@@ -1,23 +1,76 @@
+import os
 from typing import Optional
+from dotenv import load_dotenv
 from fastapi import HTTPException, Response
-from sqlalchemy import or_, func
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from check_swear import SwearingCheck
 from models import (
     Discipline, ReviewDiscipline, ReviewVote, ReviewStatusEnum,
     Complaint, User, Teacher, TeacherDiscipline, VoteTypeEnum, RoleEnum
 )
-
-swear_checker = SwearingCheck()
-
-
-def get_review_status(offensive_score: float) -> ReviewStatusEnum:
-    if offensive_score >= 0.80:
-        return ReviewStatusEnum.rejected
-    if offensive_score >= 0.30:
-        return ReviewStatusEnum.pending
-    return ReviewStatusEnum.published
+from service.pagination_service import paginate
+from service import swear_prefilter, swear_cache, moderation_policy, near_duplicates
+from service.moderation_policy import Policy
+from service.swear_model import get_swear_checker
+from monitoring.metrics import timed, swear_inference_seconds, swear_batch_size
+
+load_dotenv()
+
+# Лента отзывов по дисциплине собирается в JSON прямо в Postgres
+REVIEWS_JSON_AGG = os.getenv("REVIEWS_JSON_AGG", "False").lower() == "true"
+
+
+def _predict_with_model(comments: list[str]) -> list[float]:
+    keys, scores = swear_cache.lookup(comments)
+    missing = [index for index in range(len(comments)) if index not in scores]
+    if missing:
+        swear_checker = get_swear_checker()
+        swear_batch_size.observe(len(missing))
+        with timed(swear_inference_seconds):
+            raw_scores = swear_checker.predict_proba([comments[index] for index in missing])
+        for index, raw_score in zip(missing, raw_scores):
+            scores[index] = round(float(raw_score), 4)
+            swear_cache.put(keys[index], scores[index])
+    return [scores[index] for index in range(len(comments))]
+
+
+def predict_offensive_scores(comments: list[str], policy: Optional[Policy] = None) -> list[float]:
+    # Предфильтр мата: on — явный мат оценивается без модели, остальное моделью,
+    # shadow — модель для всех, вердикты предфильтра лишь сверяются с ней, off — выключен
+    policy = policy or moderation_policy.current()
+    if policy.prefilter_mode == "off":
+        return _predict_with_model(comments)
+
+    verdicts = [swear_prefilter.classify(comment) for comment in comments]
+    for verdict in verdicts:
+        swear_prefilter.record(verdict)
+
+    scores = [
+        policy.prefilter_obscene_score if verdict == swear_prefilter.OBSCENE else None
+        for verdict in verdicts
+    ]
+    to_model = [
+        index for index, verdict in enumerate(verdicts)
+        if policy.prefilter_mode == "shadow" or verdict == swear_prefilter.AMBIGUOUS
+    ]
+    if to_model:
+        model_scores = _predict_with_model([comments[index] for index in to_model])
+        for index, score in zip(to_model, model_scores):
+            if verdicts[index] != swear_prefilter.AMBIGUOUS:
+                swear_prefilter.record_shadow(verdicts[index], policy.status(score).value)
+            scores[index] = score
+    return scores
+
+
+async def predict_offensive_score(db: AsyncSession, comment: str, policy: Policy) -> float:
+    await swear_cache.load_persistent(db, [comment])
+    offensive_score = predict_offensive_scores([comment], policy)[0]
+    await swear_cache.store_persistent(db)
+    return offensive_score
+
+
+def get_review_status(offensive_score: float, policy: Optional[Policy] = None) -> ReviewStatusEnum:
+    return (policy or moderation_policy.current()).status(offensive_score)
 
 
 async def create_review(
@@ -46,18 +99,23 @@ async def create_review(
             detail="Practic teacher is not assigned to this discipline"
         )
 
+    # одна политика на весь отзыв, даже если она сменится во время запроса
+    policy = moderation_policy.current()
     offensive_score = 0.0
     if comment:
         try:
-            raw_score = swear_checker.predict_proba([comment])[0]
+            offensive_score = await predict_offensive_score(db, comment, policy)
         except Exception:
             raise HTTPException(
                 status_code=500,
                 detail="Content analysis failed"
             )
-        offensive_score = round(raw_score, 4)
 
-    status = get_review_status(offensive_score)
+    status = get_review_status(offensive_score, policy)
+
+    duplicate_of_id = near_duplicates.find(discipline_id, comment)
+    if duplicate_of_id and near_duplicates.ACTION == "hold" and status == ReviewStatusEnum.published:
+        status = ReviewStatusEnum.pending
 
     user_id = None
     final_anonymous = True
@@ -74,6 +132,8 @@ async def create_review(
         comment=comment,
         offensive_score=offensive_score,
         status=status,
+        policy_version=policy.version,
+        duplicate_of_id=duplicate_of_id,
         is_anonymous=final_anonymous
     )
 
@@ -85,6 +145,8 @@ async def create_review(
         await db.rollback()
         raise HTTPException(400, "Invalid data format")
 
+    near_duplicates.add(discipline_id, new_review.id, comment, new_review.created_at)
+
     result = await db.execute(
         ReviewDiscipline.get_joined_data()
         .where(ReviewDiscipline.id == new_review.id)
@@ -145,12 +207,15 @@ async def edit_review(
         review.is_anonymous = new_is_anonymous
 
     if new_comment is not None:
+        policy = moderation_policy.current()
         try:
-            raw_score = swear_checker.predict_proba([new_comment])[0]
+            review.offensive_score = await predict_offensive_score(db, new_comment, policy)
         except Exception:
             raise HTTPException(500, "Content analysis failed")
-        review.offensive_score = round(raw_score, 4)
-        review.status = get_review_status(review.offensive_score)
+        review.status = get_review_status(review.offensive_score, policy)
+        review.policy_version = policy.version
+        # решение модератора относилось к прежнему тексту
+        review.status_by_moderator = False
 
     try:
         await db.commit()
@@ -198,22 +263,24 @@ async def get_all_reviews(
         page: int = 1,
         page_size: int = 40,
         sort_by: str = "date",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        with_total: bool = True
 ):
     base_filters = [ReviewDiscipline.status == ReviewStatusEnum.published]
 
     if discipline_id:
         base_filters.append(ReviewDiscipline.discipline_id == discipline_id)
 
-    if teacher_id:
-        base_filters.append(or_(
-            ReviewDiscipline.lector_id == teacher_id,
-            ReviewDiscipline.practic_id == teacher_id
-        ))
+    if REVIEWS_JSON_AGG and discipline_id:
+        content = await ReviewDiscipline.paginated_json(
+            db, base_filters, current_user, page,
+            page_size, sort_by, sort_order, teacher_id, with_total
+        )
+        return Response(content=content, media_type="application/json")
 
     return await ReviewDiscipline.paginated_query(
         db, base_filters, current_user, page,
-        page_size, sort_by, sort_order
+        page_size, sort_by, sort_order, teacher_id, with_total
     )
 
 
@@ -226,7 +293,8 @@ async def get_reviews_by_status(
         discipline_id: Optional[str] = None,
         teacher_id: Optional[str] = None,
         sort_by: str = "date",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        with_total: bool = True
 ):
     if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
         raise HTTPException(403, "Only admins can access this endpoint")
@@ -236,15 +304,9 @@ async def get_reviews_by_status(
     if discipline_id:
         base_filters.append(ReviewDiscipline.discipline_id == discipline_id)
 
-    if teacher_id:
-        base_filters.append(or_(
-            ReviewDiscipline.lector_id == teacher_id,
-            ReviewDiscipline.practic_id == teacher_id
-        ))
-
     return await ReviewDiscipline.paginated_query(
         db, base_filters, current_user,
-        page, page_size, sort_by, sort_order
+        page, page_size, sort_by, sort_order, teacher_id, with_total
     )
 
 
@@ -269,6 +331,7 @@ async def update_review_status(
         raise HTTPException(404, "Review not found")
 
     review.status = new_status
+    review.status_by_moderator = True
     try:
         await db.commit()
         await db.refresh(review)
@@ -332,22 +395,17 @@ async def get_my_reviews(
         page: int = 1,
         page_size: int = 40,
         sort_by: str = "date",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        with_total: bool = True
 ):
     base_filters = [ReviewDiscipline.user_id == current_user["id"]]
 
     if discipline_id:
         base_filters.append(ReviewDiscipline.discipline_id == discipline_id)
 
-    if teacher_id:
-        base_filters.append(or_(
-            ReviewDiscipline.lector_id == teacher_id,
-            ReviewDiscipline.practic_id == teacher_id
-        ))
-
     return await ReviewDiscipline.paginated_query(
         db, base_filters, current_user,
-        page, page_size, sort_by, sort_order
+        page, page_size, sort_by, sort_order, teacher_id, with_total
     )
 
 
@@ -392,45 +450,32 @@ async def get_pending_complaints(
         page: int = 1,
         page_size: int = 40,
         sort_by: str = "date",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        with_total: bool = True
 ):
     if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
         raise HTTPException(status_code=403, detail="Only admins can access this endpoint")
 
-    base_query = Complaint.get_reviews_with_pending_complaints()
+    base_query = Complaint.get_reviews_with_pending_complaints(current_user["id"])
 
     if discipline_id:
         base_query = base_query.where(ReviewDiscipline.discipline_id == discipline_id)
 
     if teacher_id:
-        base_query = base_query.where(or_(
-            ReviewDiscipline.lector_id == teacher_id,
-            ReviewDiscipline.practic_id == teacher_id
-        ))
-
-    query_with_likes = ReviewDiscipline.add_likes_count(base_query)
+        base_query = base_query.where(
+            ReviewDiscipline.filter_by_teacher(teacher_id)
+        )
 
     sorted_query = ReviewDiscipline.apply_sorting(
-        query_with_likes, sort_by, sort_order
+        base_query, sort_by, sort_order
+    )
+    rows, pagination = await paginate(
+        db, sorted_query, page, page_size, with_total
     )
-    count_query = base_query.with_only_columns(func.count(ReviewDiscipline.id.distinct()))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
-    total_pages = (total + page_size - 1) // page_size
-    paginated_query = sorted_query.limit(page_size).offset((page - 1) * page_size)
-
-    result = await db.execute(paginated_query)
-    reviews = result.unique().scalars().all()
 
     return {
-        "data": [review.dto_with_user_vote_info(current_user["id"]) for review in reviews],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": page_size
-        }
+        "data": [ReviewDiscipline.row_to_dto(row) for row in rows],
+        "pagination": pagination
     }
 
 
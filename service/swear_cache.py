@@ -0,0 +1,114 @@
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import SwearScoreCache
+from service.swear_model import model_version
+from monitoring.metrics import swear_cache_lookups
+
+load_dotenv()
+
+# Кеш оценок модели мата по хешу нормализованного комментария: копипаста,
+# «Отличный курс!» и повторное сохранение при edit_review не гоняют модель
+# заново. Версия модели входит в ключ, поэтому после обновления check-swear
+# старые записи просто перестают находиться
+#
+# Первый уровень — LRU в памяти воркера, второй (SWEAR_CACHE_PERSISTENT) —
+# таблица swear_score_cache, общая для всех воркеров и переживающая рестарт.
+# Кешируются только оценки модели: вердикты предфильтра зависят от настроек
+CACHE_SIZE = int(os.getenv("SWEAR_CACHE_SIZE", "10000"))
+PERSISTENT = os.getenv("SWEAR_CACHE_PERSISTENT", "False").lower() == "true"
+
+_memory: "OrderedDict[str, float]" = OrderedDict()
+# посчитанные моделью, но ещё не записанные в таблицу
+_unsaved: dict[str, float] = {}
+
+WHITESPACE = re.compile(r"\s+")
+# токенизатор модели оставляет только буквы, поэтому «!!!» и «!» для неё одно и то же
+REPEATED_PUNCTUATION = re.compile(r"([^\w\s])\1+")
+
+
+def normalize(comment: str) -> str:
+    comment = REPEATED_PUNCTUATION.sub(r"\1", comment.lower())
+    return WHITESPACE.sub(" ", comment).strip()
+
+
+def cache_key(comment: str) -> str:
+    return hashlib.sha256(f"{model_version()}\n{normalize(comment)}".encode()).hexdigest()
+
+
+def get(key: str):
+    score = _memory.get(key)
+    if score is not None:
+        _memory.move_to_end(key)
+    return score
+
+
+def put(key: str, score: float, fresh: bool = True):
+    if CACHE_SIZE <= 0:
+        return
+    _memory[key] = score
+    _memory.move_to_end(key)
+    if len(_memory) > CACHE_SIZE:
+        _memory.popitem(last=False)
+    if fresh and PERSISTENT:
+        _unsaved[key] = score
+
+
+def lookup(comments: list[str]) -> tuple[list[str], dict[int, float]]:
+    keys = [cache_key(comment) for comment in comments]
+    found = {}
+    for index, key in enumerate(keys):
+        score = get(key)
+        if score is not None:
+            found[index] = score
+    swear_cache_lookups["hit"].inc(len(found))
+    swear_cache_lookups["miss"].inc(len(keys) - len(found))
+    return keys, found
+
+
+async def load_persistent(db: AsyncSession, comments: list[str]):
+    # подтягивает в память оценки из таблицы, чтобы predict_offensive_scores
+    # нашёл их в первом уровне
+    if not PERSISTENT or CACHE_SIZE <= 0:
+        return
+    keys = {cache_key(comment) for comment in comments}
+    keys = [key for key in keys if key not in _memory]
+    if not keys:
+        return
+    rows = await db.execute(
+        select(SwearScoreCache.key, SwearScoreCache.offensive_score)
+        .where(SwearScoreCache.key.in_(keys))
+    )
+    for key, score in rows:
+        put(key, score, fresh=False)
+        swear_cache_lookups["db"].inc()
+
+
+async def store_persistent(db: AsyncSession):
+    # запись попадает в транзакцию запроса и фиксируется вместе с отзывом
+    if not _unsaved:
+        return
+    items = list(_unsaved.items())
+    _unsaved.clear()
+    version = model_version()
+    await db.execute(
+        insert(SwearScoreCache)
+        .values([
+            {"key": key, "model_version": version, "offensive_score": score}
+            for key, score in items
+        ])
+        .on_conflict_do_nothing(index_elements=[SwearScoreCache.key])
+    )
+
+
+async def purge_stale(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(SwearScoreCache).where(SwearScoreCache.model_version != model_version())
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,62 @@
+import hashlib
+import logging
+import threading
+import time
+from importlib import metadata
+from monitoring.metrics import swear_model_load_seconds
+
+logger = logging.getLogger(__name__)
+
+# check_swear тянет nltk и scikit-learn (~1 с на импорт), поэтому модель
+# создаётся при первом использовании или прогревом в lifespan — воркеры и
+# CLI, которые не проверяют тексты, её не грузят
+_lock = threading.Lock()
+_checker = None
+_version = None
+
+
+def _load():
+    started = time.perf_counter()
+    from check_swear import SwearingCheck
+    from check_swear.swear_core import core
+
+    # библиотека читает vectorizer.joblib и model.joblib с диска на каждый
+    # predict_proba (~0.3 с) — загружаем один раз и подставляем готовые
+    vectorizer, model = core.vectorizer_load(), core.model_load()
+    core.vectorizer_load = lambda: vectorizer
+    core.model_load = lambda: model
+
+    checker = SwearingCheck()
+    # первый вызов догружает стоп-слова nltk и ленивые модули sklearn
+    checker.predict_proba(["проверка"])
+
+    swear_model_load_seconds.set(time.perf_counter() - started)
+    logger.info("Swear model loaded in %.2fs", swear_model_load_seconds.value)
+    return checker
+
+
+def get_swear_checker():
+    global _checker
+    if _checker is None:
+        with _lock:
+            if _checker is None:
+                _checker = _load()
+    return _checker
+
+
+def is_loaded() -> bool:
+    return _checker is not None
+
+
+def model_version() -> str:
+    # версия пакета и хеш файлов модели; библиотеку не импортирует, поэтому
+    # подходит для ключей кеша до загрузки модели
+    global _version
+    if _version is None:
+        distribution = metadata.distribution("check-swear")
+        digest = hashlib.sha256()
+        for file in sorted(distribution.files or [], key=str):
+            if file.suffix == ".joblib":
+                digest.update(file.locate().read_bytes())
+        _version = f"{distribution.version}-{digest.hexdigest()[:12]}"
+    return _version
@@ -0,0 +1,148 @@
+import re
+from collections import deque
+from monitoring.metrics import swear_prefilter_total, swear_prefilter_shadow
+
+# Быстрый первый этап перед моделью: автомат Ахо-Корасик по
+# нормализованному тексту. Явный мат получает оценку без модели, всё
+# остальное — к модели. Отсутствие корня из списка ничего не доказывает
+# (у модели словарь шире: «заебись», «дохуя», «схуяли»), поэтому «чистого»
+# вердикта без модели нет
+#
+# Пробел в шаблоне — граница слова: " бля" не найдётся в «употребляют»,
+# " хуй" — в «застрахуйте». Шаблоны проходят ту же нормализацию, что и
+# текст, поэтому латиница, цифры и повторы букв ловятся одинаково
+
+OBSCENE, AMBIGUOUS = "obscene", "ambiguous"
+
+OBSCENE_PATTERNS = (
+    " бля", "пизд", " хуй", " хуе", " хуя", " хую", " хуи",
+    " нахуй", " нахуя", " похуй", " похую", " охуе", " охуит", " нихуя", " захуя",
+    " еба", " ебу", " ебл", " ебн", " еби", " ебет", " ебись",
+    "уеба", "уебо", "уебк", "долбое", "заеба", "ъеб", "ьеб", "выеб", "проеб", "отъеб",
+    " муда", " мудил", " мудозв", " пидор", " пидар", " пидр", " педик ", " педики ",
+    " гандон", " гондон", " залуп", " шлюх", " сука ", " суки ", " суку ", " сукой ",
+    " сучк", " сучар", " манда ", " мандав",
+    " fuck", " motherfuck", " shit", " bitch", " cunt",
+)
+
+# латиница и цифры, похожие на кириллицу; «ё» и «й» сводятся к «е» и «и».
+# Заменяются только в словах с кириллицей: «хyй» или «6ля» — маскировка,
+# а чисто латинские слова («eBay») остаются латиницей
+HOMOGLYPHS = str.maketrans({
+    "a": "а", "b": "б", "c": "с", "e": "е", "h": "н", "k": "к", "m": "м", "n": "п",
+    "o": "о", "p": "р", "t": "т", "x": "х", "y": "у", "u": "и",
+    "0": "о", "3": "з", "4": "ч", "6": "б", "@": "а", "$": "с",
+    "ё": "е", "й": "и",
+})
+# символы, которыми маскируют буквы внутри слова: «х*й», «б#я»
+MASK_CHARS = re.compile(r"(?<=\w)[*#%]+(?=\w)")
+# разделители внутри слова: «п.и.з.д», «б-л-я»
+INNER_SEPARATORS = re.compile(r"(?<=\w)[.\-_'`\"|]+(?=\w)")
+NON_WORD = re.compile(r"[^\w]+")
+TOKEN = re.compile(r"[\w@$]+")
+CYRILLIC = re.compile(r"[а-яё]")
+REPEATS = re.compile(r"(\w)\1+")
+# мягкие эвфемизмы, которые иначе совпали бы с корнем мата: «бляха муха»
+EUPHEMISMS = re.compile(r" блях\w*")
+SPACED_LETTERS = re.compile(r"(?:\b\w ){2,}\w\b")
+
+
+def _homoglyphs(match: re.Match) -> str:
+    token = match.group()
+    return token.translate(HOMOGLYPHS) if CYRILLIC.search(token) else token
+
+
+def normalize(text: str) -> str:
+    text = INNER_SEPARATORS.sub("", text.lower())
+    text = TOKEN.sub(_homoglyphs, text)
+    text = NON_WORD.sub(" ", text)
+    # «х у й» и «б л я» — одиночные буквы через пробел склеиваются
+    text = SPACED_LETTERS.sub(lambda match: match.group().replace(" ", ""), text)
+    text = REPEATS.sub(r"\1", text)
+    return f" {text.strip()} "
+
+
+class Automaton:
+    # классический Ахо-Корасик: бор шаблонов, суффиксные ссылки, выходы
+    def __init__(self, patterns: dict):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern, label in patterns.items():
+            node = 0
+            for char in pattern:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].append(label)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def labels(self, text: str) -> set:
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            if self.output[node]:
+                found.update(self.output[node])
+        return found
+
+
+def _build_automaton() -> Automaton:
+    patterns = {}
+    for pattern in OBSCENE_PATTERNS:
+        # пробелы по краям шаблона сохраняются как границы слова
+        core = normalize(pattern).strip()
+        patterns[(" " if pattern.startswith(" ") else "") + core + (" " if pattern.endswith(" ") else "")] = OBSCENE
+    return Automaton(patterns)
+
+
+_automaton = _build_automaton()
+
+
+def classify(text: str) -> str:
+    if not text or not text.strip():
+        return AMBIGUOUS
+    if MASK_CHARS.search(text):
+        # замаскированное слово без модели не разобрать
+        return AMBIGUOUS
+    if OBSCENE in _automaton.labels(EUPHEMISMS.sub(" ", normalize(text))):
+        return OBSCENE
+    return AMBIGUOUS
+
+
+def record(verdict: str):
+    swear_prefilter_total[verdict].inc()
+
+
+def record_shadow(verdict: str, model_status: str):
+    swear_prefilter_shadow[verdict][model_status].inc()
+
+
+def stats_snapshot():
+    total = sum(counter.value for counter in swear_prefilter_total.values())
+    decided = total - swear_prefilter_total[AMBIGUOUS].value
+    return {
+        "total": int(total),
+        "verdicts": {verdict: int(counter.value) for verdict, counter in swear_prefilter_total.items()},
+        # доля текстов, которым не понадобилась модель (в режиме on)
+        "model_calls_saved": round(decided / total, 4) if total else None,
+        "shadow": {
+            verdict: {status: int(counter.value) for status, counter in statuses.items()}
+            for verdict, statuses in swear_prefilter_shadow.items()
+        },
+    }
@@ -1,8 +1,9 @@
 from typing import Optional
 from fastapi import HTTPException, Response
-from sqlalchemy import select, func, update
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import Teacher, TeacherDiscipline, Discipline, User, RoleEnum, ReviewDiscipline
+from service.pagination_service import paginate
 
 
 async def create_teacher(
@@ -108,31 +109,23 @@ async def get_teachers(
         size: int = 20,
         name_search: Optional[str] = None,
         sort_field: str = "surname",
-        sort_order: str = "asc"
+        sort_order: str = "asc",
+        with_total: bool = True
 ):
-    data = Teacher.get_joined_data()
+    data = Teacher.get_projection()
     filtered_query = Teacher.apply_filters(data, name_search)
     sorted_query = Teacher.apply_sorting(filtered_query, sort_field, sort_order)
 
-    count_query = select(func.count(Teacher.id.distinct())).select_from(Teacher)
-    count_query = Teacher.apply_filters(count_query, name_search)
-
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-    total_pages = (total + size - 1) // size
-    paginated_query = sorted_query.limit(size).offset((page - 1) * size)
-
-    result = await db.execute(paginated_query)
-    teachers = result.unique().scalars().all()
+    rows, pagination = await paginate(
+        db, sorted_query, page, size, with_total
+    )
+    disciplines = await Teacher.get_disciplines_by_teacher(
+        db, [row.id for row in rows]
+    )
 
     return {
-        "data": [teacher.get_dto() for teacher in teachers],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": size
-        }
+        "data": [Teacher.row_to_dto(row, disciplines.get(row.id)) for row in rows],
+        "pagination": pagination
     }
 
 
@@ -143,7 +136,8 @@ async def get_teachers_by_discipline(
     size: int = 20,
     name_search: Optional[str] = None,
     sort_field: str = "surname",
-    sort_order: str = "asc"
+    sort_order: str = "asc",
+    with_total: bool = True
 ):
     discipline_exists = await db.execute(
         select(Discipline.id).where(Discipline.id == discipline_id)
@@ -152,40 +146,25 @@ async def get_teachers_by_discipline(
         raise HTTPException(404, "Discipline not found")
 
     data = (
-        Teacher.get_joined_data()
-        .where(TeacherDiscipline.discipline_id == discipline_id)
+        Teacher.get_projection()
+        .where(Teacher.filter_by_discipline(discipline_id))
     )
 
     if name_search:
         data = Teacher.apply_filters(data, name_search)
 
-    count_query = (
-        select(func.count(Teacher.id.distinct()))
-        .select_from(Teacher).join(TeacherDiscipline)
-        .where(TeacherDiscipline.discipline_id == discipline_id)
-    )
-    if name_search:
-        count_query = Teacher.apply_filters(count_query, name_search)
-
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
     sorted_query = Teacher.apply_sorting(data, sort_field, sort_order)
 
-    total_pages = (total + size - 1) // size
-    paginated_query = sorted_query.limit(size).offset((page - 1) * size)
-
-    result = await db.execute(paginated_query)
-    teachers = result.unique().scalars().all()
+    rows, pagination = await paginate(
+        db, sorted_query, page, size, with_total
+    )
+    disciplines = await Teacher.get_disciplines_by_teacher(
+        db, [row.id for row in rows]
+    )
 
     return {
-        "data": [teacher.get_dto() for teacher in teachers],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": size
-        }
+        "data": [Teacher.row_to_dto(row, disciplines.get(row.id)) for row in rows],
+        "pagination": pagination
     }
 
 
@@ -222,7 +201,10 @@ async def appoint_teacher_disciplines(
     existing = existing_links.scalars().all()
 
     if existing:
-        existing_name = {str(link.discipline.name) for link in existing}
+        # имена берём из уже загруженных дисциплин — link.discipline
+        # не подгружен и в asyncio потребовал бы отдельного запроса
+        discipline_names = {d.id: d.name for d in found_disciplines}
+        existing_name = {str(discipline_names[link.discipline_id]) for link in existing}
         raise HTTPException(
             400,
             f"Teacher already assigned to: {', '.join(existing_name)}"
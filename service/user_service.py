@@ -1,13 +1,16 @@
 from typing import Optional
 from uuid import uuid4
+import math
 import re
 from sqlalchemy.exc import SQLAlchemyError
 from database import get_db
 from fastapi import HTTPException, Request, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from models import User, Session, Role, RoleEnum, UserRole
 from sqlalchemy.orm import selectinload, joinedload
+from service.pagination_service import paginate
+from service import login_throttle
 
 
 def validate_password(password: str):
@@ -59,7 +62,15 @@ async def registration(
     return new_user.get_dto()
 
 
-async def authorization(email: str, password: str, db: AsyncSession):
+async def authorization(email: str, password: str, db: AsyncSession, client_ip: Optional[str] = None):
+    retry_after = login_throttle.check(email, client_ip)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
     result = await db.execute(
         select(User)
         .options(
@@ -69,10 +80,13 @@ async def authorization(email: str, password: str, db: AsyncSession):
     )
     user = result.scalars().first()
     if not user:
+        login_throttle.failure(email, client_ip)
         raise HTTPException(status_code=400, detail="Wrong login")
 
     if not user.check_password(password):
+        login_throttle.failure(email, client_ip)
         raise HTTPException(status_code=400, detail="Wrong password")
+    login_throttle.success(email, client_ip)
 
     res = await db.execute(select(Session).where(Session.user_id == user.id))
     user_sessions = res.scalars().all()
@@ -235,37 +249,25 @@ async def get_users(
         size: int,
         search: Optional[str] = None,
         sort_field: str = "surname",
-        sort_order: str = "asc"
+        sort_order: str = "asc",
+        with_total: bool = True
 ):
     if current_user["role"] not in {RoleEnum.admin.value, RoleEnum.super_admin.value}:
         raise HTTPException(status_code=403, detail="Only super-admin or admin can view users")
 
-    data = select(User).options(
-        selectinload(User.user_roles).joinedload(UserRole.role)
-    )
+    data = User.get_projection()
     if search:
         data = User.apply_search_filter(data, search)
 
-    count_query = data.with_only_columns(func.count(User.id))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
     sorted_query = User.apply_sorting(data, sort_field, sort_order)
 
-    total_pages = (total + size - 1) // size
-    paginated_query = sorted_query.limit(size).offset((page - 1) * size)
-
-    result = await db.execute(paginated_query)
-    users = result.unique().scalars().all()
+    rows, pagination = await paginate(
+        db, sorted_query, page, size, with_total
+    )
 
     return {
-        "data": [user.get_dto() for user in users],
-        "pagination": {
-            "total": total,
-            "total_pages": total_pages,
-            "page": page,
-            "size": size
-        }
+        "data": [User.row_to_dto(row) for row in rows],
+        "pagination": pagination
     }
 
 